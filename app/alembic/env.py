@@ -102,6 +102,11 @@ def include_object(object, name, type_, reflected, compare_to):
             if excluded_table in name.lower():
                 return False
     
+    # Job geometry is maintained by a database trigger (see the add_job_definitions_geometry
+    # migration) and queried through SQL functions, so it is not mapped on the model
+    if type_ in ("column", "index") and reflected and compare_to is None and name in ("geom", "ix_job_definitions_geom"):
+        return False
+    
     # Include everything else (your new models)
     return True
 
@@ -0,0 +1,40 @@
+"""add_job_run_logs
+
+Revision ID: 3c1f2a9b7d40
+Revises: 917d8268efda
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1f2a9b7d40'
+down_revision: Union[str, None] = '917d8268efda'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('job_run_logs',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('run_id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('level', sa.Text(), nullable=False),
+    sa.Column('message', sa.Text(), nullable=True),
+    sa.Column('details', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.ForeignKeyConstraint(['run_id'], ['carbonleap.job_runs.id'], name=op.f('fk_job_run_logs_run_id_job_runs'), ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_job_run_logs')),
+    schema='carbonleap'
+    )
+    op.create_index('ix_job_run_logs_run_id_id', 'job_run_logs', ['run_id', 'id'], unique=False, schema='carbonleap')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_job_run_logs_run_id_id', table_name='job_run_logs', schema='carbonleap')
+    op.drop_table('job_run_logs', schema='carbonleap')
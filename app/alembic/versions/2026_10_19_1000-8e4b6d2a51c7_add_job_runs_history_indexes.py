@@ -0,0 +1,30 @@
+"""add_job_runs_history_indexes
+
+Revision ID: 8e4b6d2a51c7
+Revises: 3c1f2a9b7d40
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e4b6d2a51c7'
+down_revision: Union[str, None] = '3c1f2a9b7d40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_job_runs_job_id_start_time_id', 'job_runs', ['job_id', 'start_time', 'id'], unique=False, schema='carbonleap')
+    op.create_index('ix_job_runs_job_id_status_start_time_id', 'job_runs', ['job_id', 'status', 'start_time', 'id'], unique=False, schema='carbonleap')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_job_runs_job_id_status_start_time_id', table_name='job_runs', schema='carbonleap')
+    op.drop_index('ix_job_runs_job_id_start_time_id', table_name='job_runs', schema='carbonleap')
@@ -0,0 +1,87 @@
+"""add_job_definitions_geometry
+
+Revision ID: 5d2e8c4f7a19
+Revises: 8e4b6d2a51c7
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2e8c4f7a19'
+down_revision: Union[str, None] = '8e4b6d2a51c7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Job payload coordinates ([lon, lat] pairs) as a valid SRID 4326 geometry. Like the
+# workers, fewer than three points stand for an area around them; unusable
+# coordinates give NULL instead of failing the write.
+JOB_PAYLOAD_GEOMETRY = """
+CREATE OR REPLACE FUNCTION carbonleap.job_payload_geometry(payload jsonb) RETURNS geometry AS $$
+DECLARE
+    points geometry[];
+BEGIN
+    IF jsonb_typeof(payload->'coordinates') IS DISTINCT FROM 'array' THEN
+        RETURN NULL;
+    END IF;
+    SELECT array_agg(ST_MakePoint((point->>0)::float8, (point->>1)::float8) ORDER BY position)
+      INTO points
+      FROM jsonb_array_elements(payload->'coordinates') WITH ORDINALITY AS coordinates(point, position);
+    IF points IS NULL THEN
+        RETURN NULL;
+    ELSIF array_length(points, 1) < 3 THEN
+        RETURN ST_SetSRID(ST_Expand(ST_Envelope(ST_MakeLine(points)), 0.0005), 4326);
+    END IF;
+    RETURN ST_SetSRID(ST_MakeValid(ST_MakePolygon(ST_MakeLine(points || points[1]))), 4326);
+EXCEPTION WHEN OTHERS THEN
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql IMMUTABLE
+"""
+
+SET_GEOMETRY = """
+CREATE OR REPLACE FUNCTION carbonleap.job_definitions_set_geom() RETURNS trigger AS $$
+BEGIN
+    NEW.geom := carbonleap.job_payload_geometry(NEW.payload);
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The geometry column needs PostGIS on the server. Without it this revision adds
+    # nothing and JobDefinitionRepository.find_intersecting uses its in-process index.
+    postgis_available = op.get_bind().execute(
+        sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'postgis'")
+    ).scalar()
+    if not postgis_available:
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS postgis")
+    op.execute("ALTER TABLE carbonleap.job_definitions ADD COLUMN IF NOT EXISTS geom geometry(Geometry, 4326)")
+    op.execute(JOB_PAYLOAD_GEOMETRY)
+    op.execute(SET_GEOMETRY)
+    # Kept in sync by the database on every write path, including bulk and raw SQL writes
+    op.execute("DROP TRIGGER IF EXISTS job_definitions_set_geom ON carbonleap.job_definitions")
+    op.execute(
+        "CREATE TRIGGER job_definitions_set_geom BEFORE INSERT OR UPDATE OF payload "
+        "ON carbonleap.job_definitions FOR EACH ROW EXECUTE FUNCTION carbonleap.job_definitions_set_geom()"
+    )
+    op.execute("UPDATE carbonleap.job_definitions SET geom = carbonleap.job_payload_geometry(payload)")
+    op.create_index('ix_job_definitions_geom', 'job_definitions', ['geom'], unique=False, schema='carbonleap', postgresql_using='gist', if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_job_definitions_geom', table_name='job_definitions', schema='carbonleap', postgresql_using='gist', if_exists=True)
+    op.execute("DROP TRIGGER IF EXISTS job_definitions_set_geom ON carbonleap.job_definitions")
+    op.execute("DROP FUNCTION IF EXISTS carbonleap.job_definitions_set_geom()")
+    op.execute("DROP FUNCTION IF EXISTS carbonleap.job_payload_geometry(jsonb)")
+    op.execute("ALTER TABLE carbonleap.job_definitions DROP COLUMN IF EXISTS geom")
@@ -0,0 +1,125 @@
+"""add_job_definitions_geometry_metrics
+
+Revision ID: a7c3e91d5b28
+Revises: 5d2e8c4f7a19
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+import math
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c3e91d5b28'
+down_revision: Union[str, None] = '5d2e8c4f7a19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+GEOMETRY_COLUMNS = ('bbox_min_lon', 'bbox_min_lat', 'bbox_max_lon', 'bbox_max_lat', 'area_ha', 'vertex_count')
+
+# Geometry constants as of this revision, kept here so the migration does not
+# change when application code does
+WGS84_F = 1 / 298.257223563
+WGS84_E2 = WGS84_F * (2 - WGS84_F)
+AUTHALIC_RADIUS = 6371007.180918475
+POINT_HALF_SIZE = 0.0005
+
+
+def _authalic_latitude(lat: float) -> float:
+    e = math.sqrt(WGS84_E2)
+
+    def q(sine):
+        return (1 - WGS84_E2) * (sine / (1 - WGS84_E2 * sine ** 2) - math.log((1 - e * sine) / (1 + e * sine)) / (2 * e))
+
+    return math.asin(max(-1.0, min(1.0, q(math.sin(lat)) / q(1.0))))
+
+
+def _area_m2(ring) -> float:
+    """Area on the authalic sphere of an open ring of (lon, lat) degrees."""
+    points = [(math.radians(lon), _authalic_latitude(math.radians(lat))) for lon, lat in ring]
+    excess = 0.0
+    for (lon, lat), (lon_next, lat_next) in zip(points, points[1:] + points[:1]):
+        delta = math.remainder(lon_next - lon, 2 * math.pi)
+        t1, t2 = math.tan(lat / 2), math.tan(lat_next / 2)
+        excess += 2 * math.atan2(math.tan(delta / 2) * (t1 + t2), 1 + t1 * t2)
+    return abs(excess) * AUTHALIC_RADIUS ** 2
+
+
+def _geometry_columns(payload) -> dict:
+    """
+    Bbox, area and vertex count of a job's coordinates, all None when they do
+    not describe a usable geometry. Rings the application would repair (spikes,
+    self-intersections) are measured as stored; their metrics are corrected
+    when the job is next written.
+    """
+    try:
+        points = [(float(point[0]), float(point[1])) for point in payload['coordinates']]
+        if not points or not all(math.isfinite(value) for point in points for value in point):
+            raise ValueError('no usable coordinates')
+    except (KeyError, IndexError, TypeError, ValueError):
+        return dict.fromkeys(GEOMETRY_COLUMNS)
+    if len(points) > 1 and points[0] == points[-1]:
+        points = points[:-1]
+    vertex_count = len(points)
+    ring = points
+    lons = [lon for lon, _ in ring]
+    lats = [lat for _, lat in ring]
+    min_lon, min_lat, max_lon, max_lat = min(lons), min(lats), max(lons), max(lats)
+    if len(ring) < 3:
+        if max_lon - min_lon < 1e-6:
+            min_lon, max_lon = min_lon - POINT_HALF_SIZE, max_lon + POINT_HALF_SIZE
+        if max_lat - min_lat < 1e-6:
+            min_lat, max_lat = min_lat - POINT_HALF_SIZE, max_lat + POINT_HALF_SIZE
+        ring = [(min_lon, min_lat), (max_lon, min_lat), (max_lon, max_lat), (min_lon, max_lat)]
+    return {
+        'bbox_min_lon': min_lon,
+        'bbox_min_lat': min_lat,
+        'bbox_max_lon': max_lon,
+        'bbox_max_lat': max_lat,
+        'area_ha': round(_area_m2(ring) / 10000, 4),
+        'vertex_count': vertex_count
+    }
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('job_definitions', sa.Column('bbox_min_lon', sa.Float(), nullable=True), schema='carbonleap')
+    op.add_column('job_definitions', sa.Column('bbox_min_lat', sa.Float(), nullable=True), schema='carbonleap')
+    op.add_column('job_definitions', sa.Column('bbox_max_lon', sa.Float(), nullable=True), schema='carbonleap')
+    op.add_column('job_definitions', sa.Column('bbox_max_lat', sa.Float(), nullable=True), schema='carbonleap')
+    op.add_column('job_definitions', sa.Column('area_ha', sa.Float(), nullable=True), schema='carbonleap')
+    op.add_column('job_definitions', sa.Column('vertex_count', sa.Integer(), nullable=True), schema='carbonleap')
+
+    # Existing jobs get the metrics new writes store
+    jobs = sa.table(
+        'job_definitions',
+        sa.column('id'),
+        sa.column('payload', sa.JSON()),
+        *[sa.column(column) for column in GEOMETRY_COLUMNS],
+        schema='carbonleap'
+    )
+    connection = op.get_bind()
+    statement = (
+        sa.update(jobs)
+        .where(jobs.c.id == sa.bindparam('job_id'))
+        .values({column: sa.bindparam(column) for column in GEOMETRY_COLUMNS})
+    )
+    batch = []
+    for job_id, payload in connection.execute(sa.select(jobs.c.id, jobs.c.payload)):
+        batch.append({'job_id': job_id, **_geometry_columns(payload)})
+        if len(batch) >= BACKFILL_BATCH_SIZE:
+            connection.execute(statement, batch)
+            batch = []
+    if batch:
+        connection.execute(statement, batch)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for column in reversed(GEOMETRY_COLUMNS):
+        op.drop_column('job_definitions', column, schema='carbonleap')
@@ -0,0 +1,28 @@
+"""add_job_definitions_version
+
+Revision ID: c41f6a8e2d73
+Revises: a7c3e91d5b28
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41f6a8e2d73'
+down_revision: Union[str, None] = 'a7c3e91d5b28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('job_definitions', sa.Column('version', sa.Integer(), server_default='1', nullable=False), schema='carbonleap')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('job_definitions', 'version', schema='carbonleap')
@@ -1,7 +1,8 @@
-from typing import Generator
-from fastapi import Depends, HTTPException, status
+from typing import Generator, List, Optional
+from fastapi import Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from database import get_async_db, AsyncRepositoryFactory
+from api.job_schema import JobDefinitionResponse
 
 async def get_repository_factory(
     session: AsyncSession = Depends(get_async_db)
@@ -61,6 +62,26 @@ async def validate_alert_exists(
         )
     return alert
 
+def job_response_fields(
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated job fields to return, e.g. id,job_name,next_run_at; defaults to all"
+    )
+) -> List[str]:
+    """Parse a ``fields`` projection into job columns, in response field order."""
+    all_fields = list(JobDefinitionResponse.model_fields)
+    if not fields:
+        return all_fields
+    
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested - set(all_fields)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown job fields: {', '.join(sorted(unknown))}"
+        )
+    return [field for field in all_fields if field in requested]
+
 # Common query parameters
 class CommonQueryParams:
     def __init__(
@@ -3,6 +3,7 @@ from typing import Optional, Dict, Any, List
 from uuid import UUID
 from pydantic import BaseModel, Field, validator
 from enum import Enum
+from utils.validators import validate_coordinates
 
 class JobType(str, Enum):
     FETCH_DATA = "fetch_data"
@@ -64,6 +65,7 @@ class JobDefinitionCreate(BaseModel):
         for field in required_fields:
             if field not in v:
                 raise ValueError(f'Payload must contain {field}')
+        validate_coordinates(v['coordinates'])
         return v
 
 class JobDefinitionUpdate(BaseModel):
@@ -78,6 +80,12 @@ class JobDefinitionUpdate(BaseModel):
     target_function: Optional[str] = None
     retry_policy: Optional[Dict[str, Any]] = None
 
+    @validator('payload')
+    def validate_payload_coordinates(cls, v):
+        if v is not None and 'coordinates' in v:
+            validate_coordinates(v['coordinates'])
+        return v
+
 class JobDefinitionResponse(BaseModel):
     id: UUID
     job_name: str
@@ -91,6 +99,12 @@ class JobDefinitionResponse(BaseModel):
     payload: Dict[str, Any]
     target_function: str
     retry_policy: Optional[Dict[str, Any]]
+    bbox_min_lon: Optional[float] = None
+    bbox_min_lat: Optional[float] = None
+    bbox_max_lon: Optional[float] = None
+    bbox_max_lat: Optional[float] = None
+    area_ha: Optional[float] = None
+    vertex_count: Optional[int] = None
     created_at: datetime
     updated_at: datetime
 
@@ -123,6 +137,17 @@ class JobRunResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class JobRunLogResponse(BaseModel):
+    id: int
+    run_id: UUID
+    created_at: datetime
+    level: str
+    message: Optional[str]
+    details: Optional[Dict[str, Any]]
+
+    class Config:
+        from_attributes = True
+
 # Job Statistics
 class JobStatistics(BaseModel):
     total_jobs: int
@@ -148,8 +173,46 @@ class JobListResponse(BaseModel):
     skip: int
     limit: int
 
+class JobRunSummary(BaseModel):
+    total_runs: int
+    status_counts: Dict[str, int]
+    success_rate: Optional[float] = Field(None, description="Percentage of finished runs that succeeded")
+    p50_duration_seconds: Optional[float] = None
+    p95_duration_seconds: Optional[float] = None
+
 class JobRunListResponse(BaseModel):
     runs: List[JobRunResponse]
     total: int
     skip: int
-    limit: int
\ No newline at end of file
+    limit: int
+    next_cursor: Optional[str] = Field(None, description="Pass as cursor to fetch the next page")
+    summary: Optional[JobRunSummary] = None
+
+class JobRunLogListResponse(BaseModel):
+    logs: List[JobRunLogResponse]
+    next_after_id: Optional[int]
+    limit: int
+
+# Batch Operations
+class JobBatchItemResult(BaseModel):
+    index: int
+    success: bool
+    job_id: Optional[UUID] = None
+    run_id: Optional[UUID] = None
+    task_id: Optional[str] = None
+    error: Optional[str] = None
+
+class JobBatchResponse(BaseModel):
+    total: int
+    succeeded: int
+    failed: int
+    results: List[JobBatchItemResult]
+
+class JobBatchTriggerItem(BaseModel):
+    job_id: UUID
+    execution_host: Optional[str] = Field(None, description="Host identifier for execution")
+    override_payload: Optional[Dict[str, Any]] = Field(None, description="Override job payload for this execution")
+
+class JobBatchEnableItem(BaseModel):
+    job_id: UUID
+    enabled: bool = Field(..., description="Whether the job should be active")
@@ -0,0 +1,313 @@
+"""
+API middleware: request tracing, response compression and admission control.
+
+Tracing gives every request an ``X-Request-ID`` (taken from the request when
+present), times database queries, Celery publishes and response encoding, and
+reports the breakdown in a ``Server-Timing`` header and on ``/metrics``.
+
+Compression encodes JSON and text responses with Brotli or gzip, whichever the
+client prefers and is available; small bodies are left alone.
+
+Admission control makes requests pass three gates before reaching a route:
+1. Load shedding: 503 while database pool checkouts wait longer than the threshold.
+2. Token-bucket rate limit per client and route: 429 when the bucket is empty.
+3. Concurrency cap for expensive routes: 503 when no slot frees up in time.
+Rejections carry ``Retry-After`` so well-behaved clients back off.
+"""
+import asyncio
+import ipaddress
+import math
+import zlib
+from typing import Dict, List, Optional
+from uuid import uuid4
+from prometheus_client import Counter
+from starlette.datastructures import MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from config.service_config import AdmissionConfig, CompressionConfig, TracingConfig
+from database.pool import POOL_PRESSURE
+from utils.rate_limit import TokenBucketLimiter, get_rate_limiter
+from utils.tracing import RequestTrace, end_trace, install_tracing, record_request, span, start_trace
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+REQUESTS_REJECTED = Counter(
+    "http_requests_rejected_total",
+    "Requests rejected by admission control",
+    ["reason", "route"]
+)
+
+def parse_networks(addresses: str) -> List[ipaddress._BaseNetwork]:
+    """Parse comma-separated addresses and networks (``10.0.0.0/8``)."""
+    return [ipaddress.ip_network(address.strip(), strict=False) for address in addresses.split(",") if address.strip()]
+
+class AdmissionControlMiddleware:
+    """ASGI middleware applying rate limits, concurrency caps and load shedding."""
+
+    def __init__(self, app: ASGIApp, config: AdmissionConfig, limiter: Optional[TokenBucketLimiter] = None, trusted_proxies: str = ""):
+        self.app = app
+        self.config = config
+        self.limiter = limiter
+        self.trusted_proxies = parse_networks(trusted_proxies)
+        self.exempt_paths = config.exempt_path_set
+        self.expensive_prefixes = config.expensive_route_prefixes
+        self._slots: Dict[str, asyncio.Semaphore] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        path = scope.get("path", "")
+        if scope["type"] != "http" or not self.config.enabled or path in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        route = self._route_template(scope)
+        expensive = self._expensive_prefix(path)
+
+        if POOL_PRESSURE.wait_seconds() > self.config.pool_wait_threshold:
+            await self._reject(scope, receive, send, 503, "overloaded", route, self.config.retry_after_seconds)
+            return
+
+        if expensive:
+            rate, burst = self.config.expensive_rate_limit_per_second, self.config.expensive_rate_limit_burst
+        else:
+            rate, burst = self.config.rate_limit_per_second, self.config.rate_limit_burst
+        limiter = self.limiter or get_rate_limiter()
+        allowed, retry_after = await limiter.hit(f"{self._client_id(scope)}:{scope['method']} {route}", rate, burst)
+        if not allowed:
+            await self._reject(scope, receive, send, 429, "rate_limited", route, retry_after)
+            return
+
+        if not expensive:
+            await self.app(scope, receive, send)
+            return
+
+        slots = self._slots.setdefault(expensive, asyncio.Semaphore(self.config.expensive_concurrency))
+        try:
+            await asyncio.wait_for(slots.acquire(), timeout=self.config.expensive_queue_timeout)
+        except asyncio.TimeoutError:
+            await self._reject(scope, receive, send, 503, "concurrency", route, self.config.retry_after_seconds)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            slots.release()
+
+    def _route_template(self, scope: Scope) -> str:
+        """Path template of the matching route, so limits apply per route rather than per URL."""
+        app = scope.get("app")
+        for route in getattr(getattr(app, "router", None), "routes", ()):
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return getattr(route, "path", scope["path"])
+        # Unknown URLs share one bucket and metric label
+        return "unmatched"
+
+    def _expensive_prefix(self, path: str) -> Optional[str]:
+        for prefix in self.expensive_prefixes:
+            if path.startswith(prefix):
+                return prefix
+        return None
+
+    def _client_id(self, scope: Scope) -> str:
+        """
+        Address of the client a request counts against. ``X-Forwarded-For`` is
+        only honoured when the connection comes from a trusted proxy, and then
+        its rightmost untrusted hop is used: anything left of it is client-supplied.
+        """
+        client = scope.get("client")
+        peer = client[0] if client else "unknown"
+        if not self._trusted(peer):
+            return peer
+        for name, value in scope.get("headers", ()):
+            if name == b"x-forwarded-for":
+                hops = [hop.strip() for hop in value.decode("latin-1").split(",") if hop.strip()]
+                for hop in reversed(hops):
+                    if not self._trusted(hop):
+                        return hop
+                return hops[0] if hops else peer
+        return peer
+
+    def _trusted(self, address: str) -> bool:
+        try:
+            ip = ipaddress.ip_address(address)
+        except ValueError:
+            return False
+        return any(ip in network for network in self.trusted_proxies)
+
+    async def _reject(self, scope: Scope, receive: Receive, send: Send, status_code: int, reason: str, route: str, retry_after: float) -> None:
+        REQUESTS_REJECTED.labels(reason=reason, route=route).inc()
+        response = JSONResponse(
+            {"detail": "Too many requests" if status_code == 429 else "Service overloaded, retry later"},
+            status_code=status_code,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+        )
+        await response(scope, receive, send)
+
+class TracingMiddleware:
+    """ASGI middleware recording a latency breakdown for every request."""
+
+    def __init__(self, app: ASGIApp, config: TracingConfig):
+        self.app = app
+        self.config = config
+        if config.enabled:
+            install_tracing()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.config.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope.get("headers", ()):
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")[:128]
+                break
+        trace = RequestTrace(request_id or uuid4().hex, scope["method"], scope["path"], self.config.max_spans_per_request)
+        status_code = 500
+
+        async def send_with_trace_headers(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("X-Request-ID", trace.request_id)
+                headers.append("Server-Timing", trace.server_timing())
+            await send(message)
+
+        token = start_trace(trace)
+        try:
+            await self.app(scope, receive, send_with_trace_headers)
+        finally:
+            end_trace(token)
+            # The router stores the matched route in the scope
+            route = getattr(scope.get("route"), "path", "unmatched")
+            record_request(trace, route, status_code, self.config)
+
+class _GzipEncoder:
+    name = "gzip"
+
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        if final:
+            return self._compressor.compress(data) + self._compressor.flush()
+        # Sync flush so each streamed chunk can be decoded on arrival
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+class _BrotliEncoder:
+    name = "br"
+
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        if final:
+            return self._compressor.process(data) + self._compressor.finish()
+        return self._compressor.process(data) + self._compressor.flush()
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing responses with Brotli or gzip.
+
+    Only compressible content types are encoded. Complete bodies below
+    ``minimum_size`` are sent unchanged; streamed bodies are compressed chunk by
+    chunk. A strong ``ETag`` becomes weak, so conditional requests keep working
+    with the identity ETag the response cache computes.
+    """
+
+    def __init__(self, app: ASGIApp, config: CompressionConfig):
+        self.app = app
+        self.config = config
+        self.content_type_prefixes = config.content_type_prefixes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        encoding = self._negotiate(scope) if scope["type"] == "http" and self.config.enabled else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+        encoder = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, encoder, passthrough
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(raw=message["headers"])
+                if "content-encoding" in headers or not self._compressible(headers.get("content-type", "")):
+                    passthrough = True
+                    await send(message)
+                else:
+                    # Hold the headers until the first body chunk shows whether to compress
+                    start_message = message
+                return
+
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if encoder is None:
+                headers = MutableHeaders(raw=start_message["headers"])
+                if not more_body and len(body) < self.config.minimum_size:
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+
+                encoder = self._encoder(encoding)
+                headers["Content-Encoding"] = encoder.name
+                headers.add_vary_header("Accept-Encoding")
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    headers["ETag"] = f"W/{etag}"
+                with span("response.compress", "compress", encoding=encoder.name):
+                    compressed = encoder.compress(body, final=not more_body)
+                if more_body:
+                    del headers["Content-Length"]
+                else:
+                    headers["Content-Length"] = str(len(compressed))
+                await send(start_message)
+                await send({"type": "http.response.body", "body": compressed, "more_body": more_body})
+                return
+
+            with span("response.compress", "compress", encoding=encoder.name):
+                compressed = encoder.compress(body, final=not more_body)
+            await send({"type": "http.response.body", "body": compressed, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
+
+    def _negotiate(self, scope: Scope) -> Optional[str]:
+        """Pick br or gzip from Accept-Encoding, honouring q=0 and preferring br."""
+        accepted: List[str] = []
+        for name, value in scope.get("headers", ()):
+            if name == b"accept-encoding":
+                for item in value.decode("latin-1").split(","):
+                    coding, _, params = item.partition(";")
+                    param, _, quality = params.strip().partition("=")
+                    try:
+                        if param.strip() == "q" and float(quality) == 0:
+                            continue
+                    except ValueError:
+                        continue
+                    accepted.append(coding.strip().lower())
+        if brotli is not None and "br" in accepted:
+            return "br"
+        if "gzip" in accepted or "*" in accepted:
+            return "gzip"
+        return None
+
+    def _compressible(self, content_type: str) -> bool:
+        media_type = content_type.split(";")[0].strip().lower()
+        return any(media_type.startswith(prefix) for prefix in self.content_type_prefixes)
+
+    def _encoder(self, encoding: str):
+        if encoding == "br":
+            return _BrotliEncoder(self.config.brotli_quality)
+        return _GzipEncoder(self.config.gzip_level)
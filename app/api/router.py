@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from api.routers import job, pipeline
+from api.routers import job, job_batch, pipeline
 
 """
 Main API Router
@@ -11,7 +11,8 @@ Each functional area has its own router module for better organization.
 # Create main API router
 api_router = APIRouter(prefix="/api/v1")
 
-# Include all sub-routers
+# Include all sub-routers (batch routes first so /jobs/batch/* is not captured by /jobs/{job_id}/*)
+api_router.include_router(job_batch.router)
 api_router.include_router(job.router)
 api_router.include_router(pipeline.router)
 
@@ -1,17 +1,23 @@
-from typing import List, Optional
+import base64
+from datetime import datetime, UTC
+from typing import List, Optional, Tuple
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
 from database import AsyncRepositoryFactory
+from database.replica import pin_primary
 from database.repositories.job_repository import JobDefinitionCreate as DBJobCreate, JobDefinitionUpdate as DBJobUpdate
-from database.repositories.job_run_repository import JobRunCreate as DBJobRunCreate
-from api.dependencies import get_repository_factory, validate_job_exists
+from api.dependencies import get_repository_factory, job_response_fields
 from api.job_schema import (
     JobDefinitionCreate, JobDefinitionUpdate, JobDefinitionResponse,
-    JobRunResponse, JobListResponse, JobRunListResponse,
+    JobRunResponse, JobListResponse, JobRunListResponse, JobRunSummary,
+    JobRunLogResponse, JobRunLogListResponse,
     JobTriggerRequest, JobStatistics, JobRunStatistics,
-    JobType, ScheduleType, JobStatus
+    JobType, ScheduleType, JobStatus, TriggerType
 )
 from config.celery_config import celery_app
+from utils.cache import ResponseCache, cached_response, get_response_cache, JOBS_TAG, job_tag, job_runs_tag
+from utils.serialization import json_response
+from utils.task_serialization import offload_payload
 
 router = APIRouter(prefix="/jobs", tags=["jobs"])
 
@@ -25,10 +31,45 @@ class APIEndpointConstant:
     TRIGGER_JOB = "/{job_id}/trigger"
     GET_JOB_RUNS = "/{job_id}/runs"
     GET_JOB_RUN = "/{job_id}/runs/{run_id}"
+    GET_JOB_RUN_LOGS = "/{job_id}/runs/{run_id}/logs"
     ENABLE_JOB = "/{job_id}/enable"
     DISABLE_JOB = "/{job_id}/disable"
     JOB_STATISTICS_OVERVIEW = "/statistics/overview"
 
+def _parse_bbox(bbox: str) -> Tuple[float, float, float, float]:
+    """Parse a ``min_lon,min_lat,max_lon,max_lat`` query value."""
+    try:
+        min_lon, min_lat, max_lon, max_lat = (float(value) for value in bbox.split(","))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="bbox must be min_lon,min_lat,max_lon,max_lat"
+        )
+    if min_lon > max_lon or min_lat > max_lat:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="bbox minimums must not exceed maximums"
+        )
+    return min_lon, min_lat, max_lon, max_lat
+
+def _encode_run_cursor(job_run) -> str:
+    """Opaque keyset cursor pointing after the given run."""
+    raw = f"{job_run.start_time.isoformat()}|{job_run.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def _decode_run_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    try:
+        start_time, run_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(start_time), UUID(run_id)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Run timestamps are stored as naive UTC."""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(UTC).replace(tzinfo=None)
+    return value
+
 
 @router.post(APIEndpointConstant.CREATE_JOB, response_model=JobDefinitionResponse, status_code=status.HTTP_201_CREATED)
 async def create_job(
@@ -38,18 +79,24 @@ async def create_job(
     """Create a new geospatial processing job."""
     db_job_data = DBJobCreate(**job_data.model_dump())
     job = await repo_factory.job_definition.create(db_job_data)
-    return JobDefinitionResponse.model_validate(job)
+    await get_response_cache().invalidate(JOBS_TAG)
+    return json_response(JobDefinitionResponse.model_validate(job), status_code=status.HTTP_201_CREATED)
 
 @router.get(APIEndpointConstant.LIST_JOBS, response_model=JobListResponse)
 async def list_jobs(
+    request: Request,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
     job_type: Optional[JobType] = Query(None, description="Filter by job type"),
     schedule_type: Optional[ScheduleType] = Query(None, description="Filter by schedule type"),
     enabled: Optional[bool] = Query(None, description="Filter by enabled status"),
+    bbox: Optional[str] = Query(None, description="Only jobs whose bbox intersects min_lon,min_lat,max_lon,max_lat"),
+    min_area_ha: Optional[float] = Query(None, ge=0, description="Minimum job area in hectares"),
+    max_area_ha: Optional[float] = Query(None, ge=0, description="Maximum job area in hectares"),
+    fields: List[str] = Depends(job_response_fields),
     repo_factory: AsyncRepositoryFactory = Depends(get_repository_factory)
 ):
-    """List all jobs with optional filtering."""
+    """List all jobs with optional filtering and field projection."""
     filters = {}
     if job_type:
         filters["job_type"] = job_type.value
@@ -57,78 +104,118 @@ async def list_jobs(
         filters["schedule_type"] = schedule_type.value
     if enabled is not None:
         filters["enabled"] = enabled
+    if bbox:
+        # Box overlap on the stored job bbox columns
+        min_lon, min_lat, max_lon, max_lat = _parse_bbox(bbox)
+        filters.update({
+            "bbox_max_lon__gte": min_lon,
+            "bbox_min_lon__lte": max_lon,
+            "bbox_max_lat__gte": min_lat,
+            "bbox_min_lat__lte": max_lat
+        })
+    if min_area_ha is not None:
+        filters["area_ha__gte"] = min_area_ha
+    if max_area_ha is not None:
+        filters["area_ha__lte"] = max_area_ha
 
-    jobs = await repo_factory.job_definition.get_multi(
-        skip=skip,
-        limit=limit,
-        filters=filters
-    )
-    total = await repo_factory.job_definition.count(filters)
+    async def load():
+        pin_primary(repo_factory.session)
+        # Only the requested columns are selected; rows were validated on write,
+        # so they are serialised as-is instead of going through JobDefinitionResponse
+        jobs = await repo_factory.job_definition.get_multi_rows(
+            fields,
+            skip=skip,
+            limit=limit,
+            filters=filters
+        )
+        total = await repo_factory.job_definition.count(filters)
+        
+        return {
+            "jobs": jobs,
+            "total": total,
+            "skip": skip,
+            "limit": limit
+        }
     
-    return JobListResponse(
-        jobs=[JobDefinitionResponse.model_validate(job) for job in jobs],
-        total=total,
-        skip=skip,
-        limit=limit
-    )
+    key = ResponseCache.make_key("list_jobs", skip=skip, limit=limit, fields=",".join(fields), **filters)
+    return await cached_response(request, key, load, tags=[JOBS_TAG])
 
 @router.get(APIEndpointConstant.GET_JOB, response_model=JobDefinitionResponse)
 async def get_job(
+    request: Request,
     job_id: UUID,
     repo_factory: AsyncRepositoryFactory = Depends(get_repository_factory)
 ):
     """Get a specific job by ID."""
-    job = await repo_factory.job_definition.get(job_id)
-    if not job:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Job with ID {job_id} not found"
-        )
-    print("Job retrieved:", job)
-    return JobDefinitionResponse.model_validate(job)
+    async def load():
+        pin_primary(repo_factory.session)
+        job = await repo_factory.job_definition.get(job_id)
+        if not job:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Job with ID {job_id} not found"
+            )
+        return JobDefinitionResponse.model_validate(job)
+    
+    key = ResponseCache.make_key("get_job", job_id=job_id)
+    return await cached_response(request, key, load, tags=[job_tag(job_id)])
 
 @router.put("/{job_id}", response_model=JobDefinitionResponse)
 async def update_job(
     job_id: UUID,
     job_data: JobDefinitionUpdate,
-    job = Depends(validate_job_exists),
     repo_factory: AsyncRepositoryFactory = Depends(get_repository_factory)
 ):
     """Update an existing job."""
     db_job_data = DBJobUpdate(**job_data.model_dump(exclude_unset=True))
-    updated_job = await repo_factory.job_definition.update(job, db_job_data)
-    return JobDefinitionResponse.model_validate(updated_job)
+    updated_job = await repo_factory.job_definition.update_by_id(job_id, db_job_data.model_dump(exclude_unset=True))
+    if not updated_job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job with ID {job_id} not found"
+        )
+    await get_response_cache().invalidate(JOBS_TAG, job_tag(job_id))
+    return json_response(JobDefinitionResponse.model_validate(updated_job))
 
 @router.delete("/{job_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_job(
     job_id: UUID,
-    job = Depends(validate_job_exists),
     repo_factory: AsyncRepositoryFactory = Depends(get_repository_factory)
 ):
     """Delete a job and all its runs."""
-    await repo_factory.job_definition.delete(job_id)
+    if not await repo_factory.job_definition.delete(job_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job with ID {job_id} not found"
+        )
+    await get_response_cache().invalidate(JOBS_TAG, job_tag(job_id), job_runs_tag(job_id))
 
 @router.post("/{job_id}/trigger", response_model=dict, status_code=status.HTTP_202_ACCEPTED)
 async def trigger_job(
     job_id: UUID,
     trigger_data: JobTriggerRequest = JobTriggerRequest(),
-    job = Depends(validate_job_exists),
     repo_factory: AsyncRepositoryFactory = Depends(get_repository_factory)
 ):
     """Manually trigger a job execution."""
-    # Create job run record
-    job_run_data = DBJobRunCreate(
-        job_id=job_id,
+    # Create job run record; the existence check is part of the INSERT
+    job_run = await repo_factory.job_run.create_for_job(
+        job_id,
         triggered_by="manual",
         execution_host=trigger_data.execution_host
     )
-    job_run = await repo_factory.job_run.create(job_run_data)
+    if not job_run:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job with ID {job_id} not found"
+        )
+    await get_response_cache().invalidate(job_runs_tag(job_id))
     
     # Queue job for processing
     task_payload = {
         "job_id": str(job_id),
         "run_id": str(job_run.id),
-        "override_payload": trigger_data.override_payload
+        # A large override travels through Redis, not the broker
+        "override_payload": offload_payload(trigger_data.override_payload)
     }
     
     task = celery_app.send_task(
@@ -143,85 +230,154 @@ async def trigger_job(
         "task_id": task.id
     }
 
-@router.get("/{job_id}/runs", response_model=JobRunListResponse)
+@router.get(APIEndpointConstant.GET_JOB_RUNS, response_model=JobRunListResponse)
 async def get_job_runs(
+    request: Request,
     job_id: UUID,
-    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    skip: int = Query(0, ge=0, description="Number of records to skip; ignored when cursor is given"),
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
     status_filter: Optional[JobStatus] = Query(None, description="Filter by run status"),
-    job = Depends(validate_job_exists),
+    triggered_by: Optional[TriggerType] = Query(None, description="Filter by trigger source"),
+    started_after: Optional[datetime] = Query(None, description="Only runs started at or after this time"),
+    started_before: Optional[datetime] = Query(None, description="Only runs started before this time"),
+    include_summary: bool = Query(False, description="Add status counts, success rate and p50/p95 duration"),
     repo_factory: AsyncRepositoryFactory = Depends(get_repository_factory)
 ):
-    """Get execution history for a specific job."""
-    runs = await repo_factory.job_run.get_runs_by_job(job_id, limit=limit)
+    """Get execution history for a specific job, newest first."""
+    before = _decode_run_cursor(cursor) if cursor else None
+    filters = {
+        "status": status_filter.value if status_filter else None,
+        "triggered_by": triggered_by.value if triggered_by else None,
+        "started_after": _naive_utc(started_after),
+        "started_before": _naive_utc(started_before),
+    }
     
-    return JobRunListResponse(
-        runs=[JobRunResponse.model_validate(run) for run in runs],
-        total=len(runs),
+    async def load():
+        pin_primary(repo_factory.session)
+        runs = await repo_factory.job_run.query_runs(job_id, limit=limit, skip=skip, before=before, **filters)
+        # Only an empty page needs a separate existence check
+        if not runs and not await repo_factory.job_definition.exists(job_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Job with ID {job_id} not found"
+            )
+        
+        # Total and summary come from one aggregate query over the same filters
+        summary = await repo_factory.job_run.summarize_runs(job_id, include_durations=include_summary, **filters)
+        
+        return JobRunListResponse(
+            runs=[JobRunResponse.model_validate(run) for run in runs],
+            total=summary["total_runs"],
+            skip=0 if before else skip,
+            limit=limit,
+            next_cursor=_encode_run_cursor(runs[-1]) if len(runs) == limit else None,
+            summary=JobRunSummary(**summary) if include_summary else None
+        )
+    
+    key = ResponseCache.make_key(
+        "get_job_runs",
+        job_id=job_id,
         skip=skip,
-        limit=limit
+        limit=limit,
+        cursor=cursor,
+        include_summary=include_summary,
+        **filters
     )
+    return await cached_response(request, key, load, tags=[job_runs_tag(job_id)])
 
 @router.get("/{job_id}/runs/{run_id}", response_model=JobRunResponse)
 async def get_job_run(
     job_id: UUID,
     run_id: UUID,
-    job = Depends(validate_job_exists),
     repo_factory: AsyncRepositoryFactory = Depends(get_repository_factory)
 ):
     """Get details of a specific job run."""
-    job_run = await repo_factory.job_run.get(run_id)
-    if not job_run or job_run.job_id != job_id:
+    job_run = await repo_factory.job_run.get_for_job(run_id, job_id)
+    if not job_run:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Job run with ID {run_id} not found for job {job_id}"
         )
-    return JobRunResponse.model_validate(job_run)
+    return json_response(JobRunResponse.model_validate(job_run))
+
+@router.get(APIEndpointConstant.GET_JOB_RUN_LOGS, response_model=JobRunLogListResponse)
+async def get_job_run_logs(
+    job_id: UUID,
+    run_id: UUID,
+    after_id: Optional[int] = Query(None, ge=0, description="Return log lines after this log id"),
+    limit: int = Query(100, ge=1, le=1000, description="Number of log lines to return"),
+    repo_factory: AsyncRepositoryFactory = Depends(get_repository_factory)
+):
+    """Get log lines of a specific job run, oldest first."""
+    if not await repo_factory.job_run.exists_for_job(run_id, job_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job run with ID {run_id} not found for job {job_id}"
+        )
+    logs = await repo_factory.job_run_log.get_logs_by_run(run_id, after_id=after_id, limit=limit)
+    
+    return json_response(JobRunLogListResponse(
+        logs=[JobRunLogResponse.model_validate(log) for log in logs],
+        next_after_id=logs[-1].id if len(logs) == limit else None,
+        limit=limit
+    ))
 
 @router.put("/{job_id}/enable", response_model=JobDefinitionResponse)
 async def enable_job(
     job_id: UUID,
-    job = Depends(validate_job_exists),
     repo_factory: AsyncRepositoryFactory = Depends(get_repository_factory)
 ):
     """Enable a job for execution."""
-    update_data = DBJobUpdate(enabled=True)
-    updated_job = await repo_factory.job_definition.update(job, update_data)
-    return JobDefinitionResponse.model_validate(updated_job)
+    updated_job = await repo_factory.job_definition.update_by_id(job_id, {"enabled": True})
+    if not updated_job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job with ID {job_id} not found"
+        )
+    await get_response_cache().invalidate(JOBS_TAG, job_tag(job_id))
+    return json_response(JobDefinitionResponse.model_validate(updated_job))
 
 @router.put("/{job_id}/disable", response_model=JobDefinitionResponse)
 async def disable_job(
     job_id: UUID,
-    job = Depends(validate_job_exists),
     repo_factory: AsyncRepositoryFactory = Depends(get_repository_factory)
 ):
     """Disable a job from execution."""
-    update_data = DBJobUpdate(enabled=False)
-    updated_job = await repo_factory.job_definition.update(job, update_data)
-    return JobDefinitionResponse.model_validate(updated_job)
+    updated_job = await repo_factory.job_definition.update_by_id(job_id, {"enabled": False})
+    if not updated_job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job with ID {job_id} not found"
+        )
+    await get_response_cache().invalidate(JOBS_TAG, job_tag(job_id))
+    return json_response(JobDefinitionResponse.model_validate(updated_job))
 
 @router.get("/statistics/overview", response_model=JobStatistics)
 async def get_job_statistics(
     repo_factory: AsyncRepositoryFactory = Depends(get_repository_factory)
 ):
     """Get overall job statistics."""
-    all_jobs = await repo_factory.job_definition.get_multi(limit=10000)
-    
-    total_jobs = len(all_jobs)
-    enabled_jobs = sum(1 for job in all_jobs if job.enabled)
-    disabled_jobs = total_jobs - enabled_jobs
+    # Counted in the database; no job rows are loaded
+    groups = await repo_factory.job_definition.count_grouped(["job_type", "schedule_type", "enabled"])
     
+    total_jobs = 0
+    enabled_jobs = 0
     jobs_by_type = {}
     jobs_by_schedule_type = {}
     
-    for job in all_jobs:
+    for job_type, schedule_type, enabled, count in groups:
+        total_jobs += count
+        if enabled:
+            enabled_jobs += count
+        
         # Count by type
-        job_type = job.job_type
-        jobs_by_type[job_type] = jobs_by_type.get(job_type, 0) + 1
+        jobs_by_type[job_type] = jobs_by_type.get(job_type, 0) + count
         
         # Count by schedule type
-        schedule_type = job.schedule_type
-        jobs_by_schedule_type[schedule_type] = jobs_by_schedule_type.get(schedule_type, 0) + 1
+        jobs_by_schedule_type[schedule_type] = jobs_by_schedule_type.get(schedule_type, 0) + count
+    
+    disabled_jobs = total_jobs - enabled_jobs
     
     return JobStatistics(
         total_jobs=total_jobs,
@@ -0,0 +1,268 @@
+"""
+Batch job endpoints.
+
+Accept either a JSON array body or an NDJSON stream (``Content-Type:
+application/x-ndjson``, one item per line). Items are validated one by one
+and written in chunks, so a bad item only fails its own result and a chunk
+the database rejects only fails that chunk's items.
+"""
+import json
+from typing import Any, AsyncIterator, Dict, List, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+from database import AsyncRepositoryFactory
+from database.repositories.job_repository import JobDefinitionCreate as DBJobCreate
+from database.repositories.job_run_repository import JobRunCreate as DBJobRunCreate
+from api.dependencies import get_repository_factory
+from api.job_schema import (
+    JobDefinitionCreate, JobBatchItemResult, JobBatchResponse,
+    JobBatchTriggerItem, JobBatchEnableItem
+)
+from config.celery_config import celery_app
+from utils.cache import get_response_cache, JOBS_TAG, job_tag, job_runs_tag
+from utils.serialization import json_response
+from utils.task_serialization import offload_payload
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+BATCH_CHUNK_SIZE = 500
+
+class APIEndpointConstant:
+    """Constants for batch job API endpoints."""
+    CREATE_JOBS = "/batch"
+    TRIGGER_JOBS = "/batch/trigger"
+    SET_JOBS_ENABLED = "/batch/enabled"
+
+async def _iter_request_items(request: Request) -> AsyncIterator[Any]:
+    """Yield decoded items from a JSON array or NDJSON body; undecodable lines yield the error."""
+    content_type = request.headers.get("content-type", "")
+
+    if "ndjson" in content_type or "jsonlines" in content_type:
+        buffer = b""
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield _decode_line(line)
+        if buffer.strip():
+            yield _decode_line(buffer)
+        return
+
+    try:
+        body = json.loads(await request.body())
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid JSON body: {str(e)}")
+
+    if isinstance(body, dict) and "job_ids" in body:
+        # Shorthand body: {"job_ids": [...], <fields shared by every item>}
+        shared = {k: v for k, v in body.items() if k != "job_ids"}
+        body = [{"job_id": job_id, **shared} for job_id in body["job_ids"]]
+
+    if not isinstance(body, list):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Expected a JSON array or NDJSON stream")
+
+    for item in body:
+        yield item
+
+def _decode_line(line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        return e
+
+async def _iter_chunks(items: AsyncIterator[Any], size: int = BATCH_CHUNK_SIZE) -> AsyncIterator[List[Tuple[int, Any]]]:
+    """Group indexed items into chunks of ``size``."""
+    chunk = []
+    index = 0
+    async for item in items:
+        chunk.append((index, item))
+        index += 1
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _error_message(error: Exception) -> str:
+    if isinstance(error, ValidationError):
+        return "; ".join(f"{'.'.join(str(p) for p in e['loc'])}: {e['msg']}" for e in error.errors())
+    return str(error)
+
+def _batch_response(results: List[JobBatchItemResult]) -> JobBatchResponse:
+    results.sort(key=lambda result: result.index)
+    succeeded = sum(1 for result in results if result.success)
+    return JobBatchResponse(
+        total=len(results),
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+        results=results
+    )
+
+def _publish_job_tasks(task_payloads: List[Dict[str, Any]]) -> List[str]:
+    """
+    Publish processing tasks over one broker connection; large override
+    payloads are stored in Redis first (claim check). Returns task ids.
+    """
+    with celery_app.producer_or_acquire() as producer:
+        return [
+            celery_app.send_task(
+                "tasks.job_processor.process_geospatial_job",
+                args=[{**task_payload, "override_payload": offload_payload(task_payload["override_payload"])}],
+                queue="geospatial",
+                producer=producer
+            ).id
+            for task_payload in task_payloads
+        ]
+
+@router.post(APIEndpointConstant.CREATE_JOBS, response_model=JobBatchResponse)
+async def create_jobs(
+    request: Request,
+    repo_factory: AsyncRepositoryFactory = Depends(get_repository_factory)
+):
+    """Create many jobs; valid items are inserted in bulk and every item gets a result."""
+    results: List[JobBatchItemResult] = []
+
+    try:
+        async for chunk in _iter_chunks(_iter_request_items(request)):
+            valid = []
+            for index, item in chunk:
+                try:
+                    if isinstance(item, Exception):
+                        raise item
+                    job_data = JobDefinitionCreate.model_validate(item)
+                    valid.append((index, DBJobCreate(**job_data.model_dump()).model_dump()))
+                except (ValidationError, ValueError, TypeError) as e:
+                    results.append(JobBatchItemResult(index=index, success=False, error=_error_message(e)))
+
+            try:
+                jobs = await repo_factory.job_definition.bulk_insert([row for _, row in valid])
+            except SQLAlchemyError as e:
+                # Earlier chunks are committed; only this chunk's items failed
+                await repo_factory.session.rollback()
+                results.extend(
+                    JobBatchItemResult(index=index, success=False, error=f"Failed to store job: {str(e)}")
+                    for index, _ in valid
+                )
+                continue
+            results.extend(
+                JobBatchItemResult(index=index, success=True, job_id=job.id)
+                for (index, _), job in zip(valid, jobs)
+            )
+    finally:
+        await get_response_cache().invalidate(JOBS_TAG)
+    return json_response(_batch_response(results))
+
+@router.post(APIEndpointConstant.TRIGGER_JOBS, response_model=JobBatchResponse, status_code=status.HTTP_202_ACCEPTED)
+async def trigger_jobs(
+    request: Request,
+    repo_factory: AsyncRepositoryFactory = Depends(get_repository_factory)
+):
+    """Trigger many jobs: one bulk JobRun insert per chunk and pipelined task publishes."""
+    results: List[JobBatchItemResult] = []
+    triggered_job_ids = set()
+
+    async for chunk in _iter_chunks(_iter_request_items(request)):
+        requested = []
+        for index, item in chunk:
+            try:
+                if isinstance(item, Exception):
+                    raise item
+                requested.append((index, JobBatchTriggerItem.model_validate(item)))
+            except (ValidationError, ValueError, TypeError) as e:
+                results.append(JobBatchItemResult(index=index, success=False, error=_error_message(e)))
+
+        existing_ids = await repo_factory.job_definition.get_existing_ids([item.job_id for _, item in requested])
+        accepted = []
+        for index, item in requested:
+            if item.job_id in existing_ids:
+                accepted.append((index, item))
+            else:
+                results.append(JobBatchItemResult(
+                    index=index, success=False, job_id=item.job_id, error=f"Job with ID {item.job_id} not found"
+                ))
+
+        if not accepted:
+            continue
+
+        try:
+            job_runs = await repo_factory.job_run.bulk_insert([
+                DBJobRunCreate(job_id=item.job_id, triggered_by="manual", execution_host=item.execution_host).model_dump(exclude_none=True)
+                for _, item in accepted
+            ])
+        except SQLAlchemyError as e:
+            await repo_factory.session.rollback()
+            results.extend(
+                JobBatchItemResult(index=index, success=False, job_id=item.job_id, error=f"Failed to create run: {str(e)}")
+                for index, item in accepted
+            )
+            continue
+
+        try:
+            task_ids = await run_in_threadpool(_publish_job_tasks, [
+                {
+                    "job_id": str(item.job_id),
+                    "run_id": str(job_run.id),
+                    "override_payload": item.override_payload
+                }
+                for (_, item), job_run in zip(accepted, job_runs)
+            ])
+        except Exception as e:
+            # Do not leave runs "running" when their tasks never reached the broker
+            await repo_factory.job_run.mark_many_failed([job_run.id for job_run in job_runs], f"Failed to queue task: {str(e)}")
+            results.extend(
+                JobBatchItemResult(index=index, success=False, job_id=item.job_id, error=f"Failed to queue task: {str(e)}")
+                for index, item in accepted
+            )
+            continue
+
+        for (index, item), job_run, task_id in zip(accepted, job_runs, task_ids):
+            triggered_job_ids.add(item.job_id)
+            results.append(JobBatchItemResult(
+                index=index, success=True, job_id=item.job_id, run_id=job_run.id, task_id=task_id
+            ))
+
+    if triggered_job_ids:
+        await get_response_cache().invalidate(*[job_runs_tag(job_id) for job_id in triggered_job_ids])
+    return json_response(_batch_response(results), status_code=status.HTTP_202_ACCEPTED)
+
+@router.put(APIEndpointConstant.SET_JOBS_ENABLED, response_model=JobBatchResponse)
+async def set_jobs_enabled(
+    request: Request,
+    repo_factory: AsyncRepositoryFactory = Depends(get_repository_factory)
+):
+    """Enable or disable many jobs; each chunk costs at most one UPDATE per target state."""
+    results: List[JobBatchItemResult] = []
+    updated_job_ids = set()
+
+    async for chunk in _iter_chunks(_iter_request_items(request)):
+        requested = {True: [], False: []}
+        for index, item in chunk:
+            try:
+                if isinstance(item, Exception):
+                    raise item
+                enable_item = JobBatchEnableItem.model_validate(item)
+                requested[enable_item.enabled].append((index, enable_item.job_id))
+            except (ValidationError, ValueError, TypeError) as e:
+                results.append(JobBatchItemResult(index=index, success=False, error=_error_message(e)))
+
+        for enabled, items in requested.items():
+            if not items:
+                continue
+            updated_ids = set(await repo_factory.job_definition.set_enabled([job_id for _, job_id in items], enabled))
+            updated_job_ids.update(updated_ids)
+            results.extend(
+                JobBatchItemResult(
+                    index=index,
+                    success=job_id in updated_ids,
+                    job_id=job_id,
+                    error=None if job_id in updated_ids else f"Job with ID {job_id} not found"
+                )
+                for index, job_id in items
+            )
+
+    if updated_job_ids:
+        await get_response_cache().invalidate(JOBS_TAG, *[job_tag(job_id) for job_id in updated_job_ids])
+    return json_response(_batch_response(results))
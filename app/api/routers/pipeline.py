@@ -1,8 +1,9 @@
 from typing import Dict, Any, Optional
 from fastapi import APIRouter, HTTPException, status
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from core.schema import TriggerType, PipelineResult
 from pipelines.registry import PipelineRegistry
+from utils.validators import validate_coordinates
 
 router = APIRouter(prefix="/pipelines", tags=["pipelines"])
 
@@ -50,4 +51,43 @@ async def discover_jobs(
         trigger_metadata=trigger_metadata
     )
     
-    return await execute_pipeline(request)
\ No newline at end of file
+    return await execute_pipeline(request)
+
+class PipelineEventRequest(BaseModel):
+    event_type: str  # e.g. scene_available, polygon_updated, anomaly_detected
+    event_criteria: Dict[str, Any] = {}  # e.g. {"footprint": [[lon, lat], ...], "satellite_type": "Sentinel-2"}
+    execution_host: Optional[str] = None
+    
+    @field_validator("event_criteria")
+    @classmethod
+    def validate_footprint(cls, criteria: Dict[str, Any]) -> Dict[str, Any]:
+        # An unusable footprint is the caller's error (422), not a failed pipeline run
+        if criteria.get("footprint") is not None:
+            criteria = {**criteria, "footprint": validate_coordinates(criteria["footprint"])}
+        return criteria
+
+@router.post("/events", response_model=PipelineResult)
+async def trigger_event(request: PipelineEventRequest):
+    """Run job discovery for the jobs an event concerns"""
+    
+    try:
+        pipeline = PipelineRegistry.get_pipeline(trigger_type=TriggerType.EVENT, pipeline_name="job_discovery")
+        
+        return await pipeline.run(
+            trigger_type=TriggerType.EVENT,
+            trigger_metadata={
+                "event_criteria": {**request.event_criteria, "event_type": request.event_type},
+                "execution_host": request.execution_host or "api"
+            }
+        )
+        
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid event: {str(e)}"
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Pipeline execution failed: {str(e)}"
+        )
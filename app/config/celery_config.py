@@ -2,6 +2,8 @@ import os
 from functools import lru_cache
 from celery import Celery
 from config.settings import get_settings
+from config.worker_profiles import celery_worker_settings
+from utils.task_serialization import register_task_serializers
 
 settings = get_settings()
 
@@ -28,11 +30,9 @@ def get_celery_config():
     broker_url = get_rabbitmq_url()
     result_backend = get_redis_url()
     
-    return {
+    config = {
         "broker_url": broker_url,
         "result_backend": result_backend,
-        "task_serializer": "json",
-        "accept_content": ["json"],
         "result_serializer": "json",
         "timezone": "UTC",
         "enable_utc": True,
@@ -42,6 +42,7 @@ def get_celery_config():
         
         "task_routes": {
             "tasks.job_processor.process_geospatial_job": {"queue": "geospatial"},
+            "tasks.job_processor.process_geospatial_job_batch": {"queue": "geospatial"},
             "tasks.monitoring.health_check": {"queue": "monitoring"},
             "tasks.pipeline_tasks.execute_job_discovery": {"queue": "scheduler"}
         },
@@ -49,6 +50,7 @@ def get_celery_config():
         "task_queues": {
             "celery": { "exchange": "celery" },
             "geospatial": { "exchange": "geospatial" },
+            "fetch": { "exchange": "fetch" },
             "monitoring": { "exchange": "monitoring" },
             "scheduler": { "exchange": "scheduler" },
         },
@@ -66,7 +68,7 @@ def get_celery_config():
             }
         },
         
-        # Worker configuration
+        # Worker configuration; a worker started with a profile overrides these
         "worker_prefetch_multiplier": 1,
         "task_acks_late": True,
         "worker_max_tasks_per_child": 1000,
@@ -75,6 +77,13 @@ def get_celery_config():
         "task_default_retry_delay": 60,
         "task_max_retries": 3,
     }
+    
+    # Task message format (utils/task_serialization.py); results stay json
+    config.update(register_task_serializers(settings.task_transport))
+    
+    # Pool, concurrency, prefetch and recycling limits of this worker's profile (config/worker_profiles.py)
+    config.update(celery_worker_settings(settings.worker))
+    return config
 
 # Create Celery app
 celery_app = Celery("geospatial_data_service")
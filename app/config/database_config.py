@@ -1,5 +1,6 @@
 import os
 from datetime import timedelta
+from typing import Any, Dict, List, Tuple
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -19,11 +20,30 @@ class DatabaseConfig(BaseSettings):
     
     # PostGIS specific settings
     enable_postgis: bool = True
+    # Seconds the in-process job geometry index is reused before reloading (used without PostGIS)
+    spatial_index_ttl: int = int(os.getenv("DB_SPATIAL_INDEX_TTL", "60"))
     
     # Connection timeouts
     pool_timeout: int = 30
     pool_recycle: int = 3600
     
+    # Pool profile per process role: api, worker (Celery prefork child) or scheduler
+    process_role: str = os.getenv("DB_PROCESS_ROLE", "api")
+    worker_pool_size: int = int(os.getenv("DB_WORKER_POOL_SIZE", "1"))  # 0 disables pooling in workers
+    scheduler_pool_size: int = int(os.getenv("DB_SCHEDULER_POOL_SIZE", "2"))
+    pgbouncer: bool = os.getenv("DB_PGBOUNCER", "false").lower() == "true"
+    
+    # Test mode swaps Postgres for a SQLite stand-in (file path or URL in DB_TEST_URL)
+    test_mode: bool = os.getenv("DB_TEST_MODE", "false").lower() == "true"
+    test_url: str = os.getenv("DB_TEST_URL", "")
+    
+    # Read replicas: comma-separated host[:port] list sharing the primary credentials.
+    # Only API processes use them; workers and the scheduler read from the primary.
+    replica_hosts: str = os.getenv("DB_REPLICA_HOSTS", "")
+    replica_selection: str = os.getenv("DB_REPLICA_SELECTION", "round_robin")  # round_robin or least_lag
+    replica_max_lag_seconds: float = float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", "30"))
+    replica_lag_check_interval: int = int(os.getenv("DB_REPLICA_LAG_CHECK_INTERVAL", "10"))
+    
     @property
     def sync_url(self) -> str:
         """Synchronous database URL for SQLAlchemy."""
@@ -34,6 +54,34 @@ class DatabaseConfig(BaseSettings):
         """Asynchronous database URL for SQLAlchemy async operations."""
         return f"postgresql+asyncpg://{self.user}:{self.password}@{self.host}:{self.port}/{self.name}"
     
+    @property
+    def replica_addresses(self) -> List[Tuple[str, str]]:
+        """Parsed (host, port) pairs of configured read replicas."""
+        addresses = []
+        for entry in self.replica_hosts.split(","):
+            entry = entry.strip()
+            if not entry:
+                continue
+            host, _, port = entry.partition(":")
+            addresses.append((host, port or self.port))
+        return addresses
+    
+    @property
+    def replica_sync_urls(self) -> List[str]:
+        """Synchronous database URLs of the read replicas."""
+        return [
+            f"postgresql://{self.user}:{self.password}@{host}:{port}/{self.name}"
+            for host, port in self.replica_addresses
+        ]
+    
+    @property
+    def replica_async_urls(self) -> List[str]:
+        """Asynchronous database URLs of the read replicas."""
+        return [
+            f"postgresql+asyncpg://{self.user}:{self.password}@{host}:{port}/{self.name}"
+            for host, port in self.replica_addresses
+        ]
+    
     class Config:
         env_prefix = "DB_"
         env_file = ".env"
@@ -52,12 +100,31 @@ class RedisConfig(BaseSettings):
     default_ttl: int = 3600  # 1 hour
     max_connections: int = 10
     
+    # Seconds before a connect or command gives up, so an unreachable Redis trips the
+    # callers' local fallbacks instead of stalling every request
+    socket_connect_timeout: float = float(os.getenv("REDIS_SOCKET_CONNECT_TIMEOUT", "0.5"))
+    socket_timeout: float = float(os.getenv("REDIS_SOCKET_TIMEOUT", "0.5"))
+    
+    # Response cache: in-process tier in front of Redis
+    cache_enabled: bool = os.getenv("REDIS_CACHE_ENABLED", "true").lower() == "true"
+    cache_local_ttl: int = int(os.getenv("REDIS_CACHE_LOCAL_TTL", "5"))
+    cache_local_maxsize: int = int(os.getenv("REDIS_CACHE_LOCAL_MAXSIZE", "1024"))
+    
     @property
     def url(self) -> str:
         """Redis connection URL."""
         auth = f":{self.password}@" if self.password else ""
         return f"redis://{auth}{self.host}:{self.port}/{self.db}"
     
+    @property
+    def client_options(self) -> Dict[str, Any]:
+        """Keyword arguments for redis clients created with ``from_url``."""
+        return {
+            "max_connections": self.max_connections,
+            "socket_connect_timeout": self.socket_connect_timeout,
+            "socket_timeout": self.socket_timeout,
+        }
+    
     class Config:
         env_prefix = "REDIS_"
         env_file = ".env"
@@ -0,0 +1,207 @@
+import os
+from typing import List, Set
+from dotenv import load_dotenv
+from pydantic_settings import BaseSettings
+
+load_dotenv()
+
+class AdmissionConfig(BaseSettings):
+    """Rate limiting and load shedding for the API."""
+    
+    enabled: bool = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+    
+    # Token bucket per client and route
+    rate_limit_per_second: float = float(os.getenv("ADMISSION_RATE_LIMIT_PER_SECOND", "20"))
+    rate_limit_burst: int = int(os.getenv("ADMISSION_RATE_LIMIT_BURST", "40"))
+    
+    # Expensive routes (path prefixes) get a tighter bucket and a per-process concurrency cap
+    expensive_routes: str = os.getenv("ADMISSION_EXPENSIVE_ROUTES", "/api/v1/pipelines,/api/v1/jobs/batch")
+    expensive_rate_limit_per_second: float = float(os.getenv("ADMISSION_EXPENSIVE_RATE_LIMIT_PER_SECOND", "1"))
+    expensive_rate_limit_burst: int = int(os.getenv("ADMISSION_EXPENSIVE_RATE_LIMIT_BURST", "5"))
+    expensive_concurrency: int = int(os.getenv("ADMISSION_EXPENSIVE_CONCURRENCY", "4"))
+    expensive_queue_timeout: float = float(os.getenv("ADMISSION_EXPENSIVE_QUEUE_TIMEOUT", "1"))
+    
+    # Shed load with 503 once database pool checkouts wait longer than this
+    pool_wait_threshold: float = float(os.getenv("ADMISSION_POOL_WAIT_THRESHOLD", "1"))
+    retry_after_seconds: int = int(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "5"))
+    
+    # Never limited
+    exempt_paths: str = os.getenv("ADMISSION_EXEMPT_PATHS", "/,/metrics,/api/v1/health,/docs,/redoc,/openapi.json")
+    
+    @property
+    def expensive_route_prefixes(self) -> List[str]:
+        return [route.strip() for route in self.expensive_routes.split(",") if route.strip()]
+    
+    @property
+    def exempt_path_set(self) -> Set[str]:
+        return {path.strip() for path in self.exempt_paths.split(",") if path.strip()}
+    
+    class Config:
+        env_prefix = "ADMISSION_"
+        env_file = ".env"
+        env_file_encoding = "utf-8"
+        extra = "ignore"
+
+class TracingConfig(BaseSettings):
+    """Request tracing and latency breakdown."""
+    
+    enabled: bool = os.getenv("TRACING_ENABLED", "true").lower() == "true"
+    service_name: str = os.getenv("TRACING_SERVICE_NAME", "geospatial-data-service")
+    
+    # OTLP/HTTP collector, e.g. http://localhost:4318/v1/traces; empty disables export
+    otlp_endpoint: str = os.getenv("TRACING_OTLP_ENDPOINT", "")
+    
+    # Log the latency breakdown of requests slower than this
+    slow_request_ms: int = int(os.getenv("TRACING_SLOW_REQUEST_MS", "1000"))
+    max_spans_per_request: int = int(os.getenv("TRACING_MAX_SPANS_PER_REQUEST", "500"))
+    
+    class Config:
+        env_prefix = "TRACING_"
+        env_file = ".env"
+        env_file_encoding = "utf-8"
+        extra = "ignore"
+
+class CompressionConfig(BaseSettings):
+    """Response compression for large API payloads."""
+    
+    enabled: bool = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+    minimum_size: int = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024"))  # bytes; smaller bodies are sent as-is
+    gzip_level: int = int(os.getenv("COMPRESSION_GZIP_LEVEL", "5"))
+    brotli_quality: int = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))  # higher levels cost too much CPU per request
+    content_types: str = os.getenv(
+        "COMPRESSION_CONTENT_TYPES",
+        "application/json,application/x-ndjson,application/geo+json,text/"
+    )
+    
+    @property
+    def content_type_prefixes(self) -> List[str]:
+        return [content_type.strip() for content_type in self.content_types.split(",") if content_type.strip()]
+    
+    class Config:
+        env_prefix = "COMPRESSION_"
+        env_file = ".env"
+        env_file_encoding = "utf-8"
+        extra = "ignore"
+
+class ImageryConfig(BaseSettings):
+    """Satellite imagery source used by geospatial job handlers."""
+    
+    # "fake" serves deterministic synthetic scenes, for local runs and tests without network access
+    backend: str = os.getenv("IMAGERY_BACKEND", "fake")
+    raster_size: int = int(os.getenv("IMAGERY_RASTER_SIZE", "64"))  # pixels per side of a scene clipped to the job bbox
+    max_cloud_coverage: float = float(os.getenv("IMAGERY_MAX_CLOUD_COVERAGE", "40"))  # percent; cloudier scenes are skipped
+    default_lookback_days: int = int(os.getenv("IMAGERY_DEFAULT_LOOKBACK_DAYS", "30"))  # used when the payload has no date_range
+    
+    # On-disk cache of decoded bands, shared by all worker processes on a host
+    tile_cache_enabled: bool = os.getenv("IMAGERY_TILE_CACHE_ENABLED", "true").lower() == "true"
+    tile_cache_dir: str = os.getenv("IMAGERY_TILE_CACHE_DIR", "/tmp/geospatial-tile-cache")
+    tile_cache_max_bytes: int = int(os.getenv("IMAGERY_TILE_CACHE_MAX_BYTES", str(2 * 1024 ** 3)))
+    # Scene searches are cached per process; new acquisitions show up after this
+    scene_search_ttl: int = int(os.getenv("IMAGERY_SCENE_SEARCH_TTL", "3600"))
+    
+    class Config:
+        env_prefix = "IMAGERY_"
+        env_file = ".env"
+        env_file_encoding = "utf-8"
+        extra = "ignore"
+
+class EarthEngineConfig(BaseSettings):
+    """Google Earth Engine client: batching, quota and retries."""
+    
+    # Polygons per reduceRegions call; Earth Engine caps interactive requests at ~5000 features
+    batch_size: int = int(os.getenv("EE_BATCH_SIZE", "500"))
+    
+    # Project-wide request quota, shared by all workers through Redis
+    requests_per_second: float = float(os.getenv("EE_REQUESTS_PER_SECOND", "10"))
+    burst: int = int(os.getenv("EE_BURST", "20"))
+    quota_wait_timeout: float = float(os.getenv("EE_QUOTA_WAIT_TIMEOUT", "120"))  # seconds to wait for a token
+    
+    # Exponential backoff on 429 / quota errors
+    max_retries: int = int(os.getenv("EE_MAX_RETRIES", "5"))
+    backoff_base: float = float(os.getenv("EE_BACKOFF_BASE", "1"))
+    backoff_max: float = float(os.getenv("EE_BACKOFF_MAX", "60"))
+    
+    # Refresh credentials this many seconds before they expire
+    credential_refresh_margin: int = int(os.getenv("EE_CREDENTIAL_REFRESH_MARGIN", "300"))
+    
+    # Replay recorded responses from this JSON file instead of calling Earth Engine (tests, offline runs)
+    recorded_responses: str = os.getenv("EE_RECORDED_RESPONSES", "")
+    # Call Earth Engine and append its responses to recorded_responses
+    record: bool = os.getenv("EE_RECORD", "false").lower() == "true"
+    
+    class Config:
+        env_prefix = "EE_"
+        env_file = ".env"
+        env_file_encoding = "utf-8"
+        extra = "ignore"
+
+class JobBatchConfig(BaseSettings):
+    """Grouping of compatible small-polygon jobs into one worker task."""
+    
+    enabled: bool = os.getenv("JOB_BATCH_ENABLED", "true").lower() == "true"
+    min_size: int = int(os.getenv("JOB_BATCH_MIN_SIZE", "2"))  # smaller groups run as single-job tasks
+    max_size: int = int(os.getenv("JOB_BATCH_MAX_SIZE", "200"))
+    # Jobs are only batched with jobs whose centroid falls in the same grid cell, which bounds
+    # the area (and raster size) of the batch's shared imagery read
+    cell_degrees: float = float(os.getenv("JOB_BATCH_CELL_DEGREES", "0.1"))
+    
+    class Config:
+        env_prefix = "JOB_BATCH_"
+        env_file = ".env"
+        env_file_encoding = "utf-8"
+        extra = "ignore"
+
+class WorkerConfig(BaseSettings):
+    """Celery worker execution profiles; see config/worker_profiles.py."""
+    
+    # Profile this worker process runs (geospatial, fetch, monitoring); empty consumes every queue with one pool
+    profile: str = os.getenv("WORKER_PROFILE", "")
+    # Seconds between broker queue-depth reads by the autoscaler
+    autoscale_interval: float = float(os.getenv("WORKER_AUTOSCALE_INTERVAL", "5"))
+    # Job definitions each worker process keeps between tasks; 0 loads them for every task
+    job_cache_size: int = int(os.getenv("WORKER_JOB_CACHE_SIZE", "1024"))
+    
+    # geospatial: CPU-bound index computation in processes; 0 max concurrency = one per CPU core
+    geospatial_min_concurrency: int = int(os.getenv("WORKER_GEOSPATIAL_MIN_CONCURRENCY", "1"))
+    geospatial_max_concurrency: int = int(os.getenv("WORKER_GEOSPATIAL_MAX_CONCURRENCY", "0"))
+    geospatial_prefetch_multiplier: int = int(os.getenv("WORKER_GEOSPATIAL_PREFETCH_MULTIPLIER", "1"))
+    geospatial_max_tasks_per_child: int = int(os.getenv("WORKER_GEOSPATIAL_MAX_TASKS_PER_CHILD", "200"))
+    geospatial_max_memory_mb: int = int(os.getenv("WORKER_GEOSPATIAL_MAX_MEMORY_MB", "2048"))  # per child, checked after each task
+    
+    # fetch: I/O-bound Earth Engine and scene requests, many green/OS threads waiting on the network
+    fetch_pool: str = os.getenv("WORKER_FETCH_POOL", "threads")  # threads or gevent (needs gevent installed)
+    fetch_concurrency: int = int(os.getenv("WORKER_FETCH_CONCURRENCY", "16"))
+    fetch_prefetch_multiplier: int = int(os.getenv("WORKER_FETCH_PREFETCH_MULTIPLIER", "4"))
+    
+    # monitoring: health checks, discovery runs and monitoring jobs; a small pool kept apart for latency
+    monitoring_min_concurrency: int = int(os.getenv("WORKER_MONITORING_MIN_CONCURRENCY", "2"))
+    monitoring_max_concurrency: int = int(os.getenv("WORKER_MONITORING_MAX_CONCURRENCY", "4"))
+    monitoring_prefetch_multiplier: int = int(os.getenv("WORKER_MONITORING_PREFETCH_MULTIPLIER", "1"))
+    monitoring_max_tasks_per_child: int = int(os.getenv("WORKER_MONITORING_MAX_TASKS_PER_CHILD", "1000"))
+    monitoring_max_memory_mb: int = int(os.getenv("WORKER_MONITORING_MAX_MEMORY_MB", "512"))
+    
+    class Config:
+        env_prefix = "WORKER_"
+        env_file = ".env"
+        env_file_encoding = "utf-8"
+        extra = "ignore"
+
+class TaskTransportConfig(BaseSettings):
+    """Encoding of Celery task messages; see utils/task_serialization.py."""
+    
+    # json, or msgpack (binary, needs the msgpack package; falls back to json without it)
+    serializer: str = os.getenv("TASK_SERIALIZER", "json")
+    # msgpack bodies at least this large are zlib-compressed; 0 never compresses
+    compression_threshold: int = int(os.getenv("TASK_COMPRESSION_THRESHOLD", "16384"))
+    compression_level: int = int(os.getenv("TASK_COMPRESSION_LEVEL", "6"))
+    
+    # Claim check: override payloads larger than this (bytes of JSON) are stored in Redis and the
+    # task carries only a reference; 0 always sends them inline
+    claim_check_threshold: int = int(os.getenv("TASK_CLAIM_CHECK_THRESHOLD", "262144"))
+    claim_check_ttl: int = int(os.getenv("TASK_CLAIM_CHECK_TTL", "86400"))  # seconds; must outlive queueing and retries
+    
+    class Config:
+        env_prefix = "TASK_"
+        env_file = ".env"
+        env_file_encoding = "utf-8"
+        extra = "ignore"
@@ -2,6 +2,7 @@ from functools import lru_cache
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from dotenv import load_dotenv
 from config.database_config import DatabaseConfig, RedisConfig, AmazonMQConfig
+from config.service_config import AdmissionConfig, TracingConfig, CompressionConfig, ImageryConfig, EarthEngineConfig, JobBatchConfig, WorkerConfig, TaskTransportConfig
 
 load_dotenv()
 
@@ -14,10 +15,27 @@ class Settings(BaseSettings):
     api_host: str = "0.0.0.0"
     api_port: int = 8000
     
+    # Production server (server.py)
+    api_workers: int = 0  # 0 = one worker per available CPU core
+    api_backlog: int = 2048
+    api_keepalive: int = 75  # seconds; longer than the load balancer idle timeout (60s on ALB)
+    api_graceful_timeout: int = 120  # seconds in-flight requests (e.g. pipeline runs) get to finish on shutdown
+    api_max_requests: int = 0  # recycle workers after this many requests; 0 disables
+    # Comma-separated addresses or networks of the proxies whose X-Forwarded-For is trusted
+    api_trusted_proxies: str = "127.0.0.1"
+    
     # Configuration modules
     database: DatabaseConfig = DatabaseConfig()
     redis: RedisConfig = RedisConfig()
     amazon_mq: AmazonMQConfig = AmazonMQConfig()
+    admission: AdmissionConfig = AdmissionConfig()
+    tracing: TracingConfig = TracingConfig()
+    compression: CompressionConfig = CompressionConfig()
+    imagery: ImageryConfig = ImageryConfig()
+    earth_engine: EarthEngineConfig = EarthEngineConfig()
+    job_batch: JobBatchConfig = JobBatchConfig()
+    worker: WorkerConfig = WorkerConfig()
+    task_transport: TaskTransportConfig = TaskTransportConfig()
     
     # Google Earth Engine
     gee_project_id: str = ""
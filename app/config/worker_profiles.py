@@ -0,0 +1,173 @@
+"""
+Celery worker execution profiles.
+
+Each profile is one worker consuming its own queues with a pool suited to
+its tasks, so CPU-heavy geospatial jobs, network-bound fetches and small
+latency-sensitive monitoring tasks never wait behind each other:
+
+- ``geospatial``: prefork processes for index computation, autoscaled between
+  min and max on broker queue depth, recycled by task count and memory.
+- ``fetch``: a threads (or gevent) pool for Earth Engine and scene fetches,
+  which spend their time waiting on the network.
+- ``monitoring``: a small prefork pool for health checks, discovery runs and
+  monitoring jobs.
+
+Start a worker with ``python -m config.worker_profiles <profile>``; the
+worker then applies its profile's settings through ``WORKER_PROFILE``.
+"""
+import logging
+import math
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from celery.worker import state
+from celery.worker.autoscale import Autoscaler
+from config.service_config import WorkerConfig
+from config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+AUTOSCALER = "config.worker_profiles:QueueDepthAutoscaler"
+
+def worker_profiles(config: WorkerConfig) -> Dict[str, Dict[str, Any]]:
+    """Queues, pool and limits of every profile."""
+    return {
+        "geospatial": {
+            "queues": ["geospatial"],
+            "pool": "prefork",
+            "min_concurrency": config.geospatial_min_concurrency,
+            "max_concurrency": config.geospatial_max_concurrency or os.cpu_count() or 2,
+            "prefetch_multiplier": config.geospatial_prefetch_multiplier,
+            "max_tasks_per_child": config.geospatial_max_tasks_per_child,
+            "max_memory_mb": config.geospatial_max_memory_mb,
+        },
+        "fetch": {
+            "queues": ["fetch"],
+            "pool": config.fetch_pool,
+            "min_concurrency": config.fetch_concurrency,
+            "max_concurrency": config.fetch_concurrency,
+            "prefetch_multiplier": config.fetch_prefetch_multiplier,
+            # Threads share one process, so there are no children to recycle
+            "max_tasks_per_child": None,
+            "max_memory_mb": None,
+        },
+        "monitoring": {
+            "queues": ["monitoring", "scheduler", "celery"],
+            "pool": "prefork",
+            "min_concurrency": config.monitoring_min_concurrency,
+            "max_concurrency": config.monitoring_max_concurrency,
+            "prefetch_multiplier": config.monitoring_prefetch_multiplier,
+            "max_tasks_per_child": config.monitoring_max_tasks_per_child,
+            "max_memory_mb": config.monitoring_max_memory_mb,
+        },
+    }
+
+def get_profile(config: WorkerConfig, name: str) -> Dict[str, Any]:
+    profiles = worker_profiles(config)
+    if name not in profiles:
+        raise ValueError(f"Unknown worker profile '{name}'; expected one of {', '.join(profiles)}")
+    return profiles[name]
+
+def celery_worker_settings(config: WorkerConfig) -> Dict[str, Any]:
+    """Celery settings of the profile this process runs; empty when it runs none."""
+    if not config.profile:
+        return {}
+    profile = get_profile(config, config.profile)
+    settings = {
+        "worker_pool": profile["pool"],
+        "worker_concurrency": profile["max_concurrency"],
+        "worker_prefetch_multiplier": profile["prefetch_multiplier"],
+    }
+    if profile["pool"] == "prefork":
+        settings.update({
+            "worker_max_tasks_per_child": profile["max_tasks_per_child"],
+            "worker_max_memory_per_child": profile["max_memory_mb"] * 1024,  # KiB
+            "worker_autoscaler": AUTOSCALER,
+        })
+    return settings
+
+def worker_command(config: WorkerConfig, name: str) -> Tuple[List[str], Dict[str, str]]:
+    """Command line and environment starting a worker of a profile."""
+    profile = get_profile(config, name)
+    argv = [
+        "celery", "-A", "config.celery_config", "worker",
+        "-n", f"{name}@%h",
+        "-Q", ",".join(profile["queues"]),
+        "--loglevel=info", "-E",
+    ]
+    if profile["pool"] == "prefork" and profile["max_concurrency"] > profile["min_concurrency"]:
+        argv.append(f"--autoscale={profile['max_concurrency']},{profile['min_concurrency']}")
+    env = {"WORKER_PROFILE": name, "DB_PROCESS_ROLE": "worker"}
+    if profile["pool"] != "prefork":
+        # All threads share the process's connection pool
+        env["DB_WORKER_POOL_SIZE"] = os.getenv("DB_WORKER_POOL_SIZE", str(profile["max_concurrency"]))
+    return argv, env
+
+class QueueDepthAutoscaler(Autoscaler):
+    """
+    Autoscaler sizing the pool on broker backlog as well as reserved tasks.
+
+    Celery's autoscaler only counts tasks this worker has already reserved,
+    which with a prefetch multiplier of 1 never exceeds the current pool, so it
+    does not grow under load. Here the demand is the reserved tasks plus this
+    worker's share of the messages waiting in its queues (backlog divided by
+    the queue's consumers), read at most every ``autoscale_interval`` seconds.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.interval = get_settings().worker.autoscale_interval
+        self._backlog = 0
+        self._backlog_read_at = 0.0
+        self._connection = None
+
+    @property
+    def qty(self) -> int:
+        return len(state.reserved_requests) + self.backlog()
+
+    def backlog(self) -> int:
+        now = time.monotonic()
+        if now - self._backlog_read_at >= self.interval:
+            self._backlog_read_at = now
+            try:
+                self._backlog = self._read_backlog()
+            except Exception as e:
+                logger.debug(f"Could not read queue depth: {str(e)}")
+                self._close()
+        return self._backlog
+
+    def _read_backlog(self) -> int:
+        app = self.worker.app
+        if self._connection is None:
+            self._connection = app.connection_for_read()
+        channel = self._connection.default_channel
+        backlog = 0
+        for queue in app.amqp.queues.consume_from or app.amqp.queues:
+            _, messages, consumers = channel.queue_declare(queue=queue, passive=True)
+            backlog += math.ceil(messages / max(consumers, 1))
+        return backlog
+
+    def _close(self):
+        if self._connection is not None:
+            try:
+                self._connection.release()
+            except Exception:
+                pass
+            self._connection = None
+
+    def info(self) -> Dict[str, Any]:
+        return {**super().info(), "backlog": self._backlog}
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Replace this process with a worker of the named profile; extra arguments go to celery."""
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        raise SystemExit("usage: python -m config.worker_profiles <profile> [celery worker options]")
+    command, env = worker_command(get_settings().worker, argv[0])
+    command += argv[1:]
+    logger.info(f"Starting worker profile {argv[0]}: {' '.join(command)}")
+    os.execvpe(command[0], command, {**os.environ, **env})
+
+if __name__ == "__main__":
+    main()
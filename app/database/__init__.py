@@ -1,7 +1,10 @@
-from .connection import Base, sync_engine, async_engine, SessionLocal, AsyncSessionLocal, get_db, get_async_db
+from .connection import (
+    Base, SessionLocal, AsyncSessionLocal, get_db, get_async_db,
+    get_sync_engine, get_async_engine, dispose_engines, use_test_engines
+)
 from .repository_factory import RepositoryFactory
 from .async_repository_factory import AsyncRepositoryFactory
-from .models import JobDefinition, JobRun
+from .models import JobDefinition, JobRun, JobRunLog
 # SatelliteData, Anomaly, Alert
 
 __all__ = [
@@ -10,10 +13,22 @@ __all__ = [
     "async_engine", 
     "SessionLocal",
     "AsyncSessionLocal",
+    "get_sync_engine",
+    "get_async_engine",
+    "dispose_engines",
+    "use_test_engines",
     "get_db",
     "get_async_db",
     "RepositoryFactory",
     "AsyncRepositoryFactory",
     "JobDefinition",
-    "JobRun"
-]
\ No newline at end of file
+    "JobRun",
+    "JobRunLog"
+]
+
+def __getattr__(name: str):
+    # sync_engine / async_engine are created lazily on first access
+    if name in ("sync_engine", "async_engine"):
+        from . import connection
+        return getattr(connection, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -1,8 +1,8 @@
-from typing import Generic, TypeVar, Type, List, Optional, Dict, Any
+from typing import Generic, TypeVar, Type, List, Optional, Dict, Any, Tuple
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import desc, and_, select, func, update, delete
-from sqlalchemy.orm import selectinload
+from sqlalchemy import desc, and_, select, func, update, delete, insert
+from sqlalchemy.orm import selectinload, defer, load_only
 from pydantic import BaseModel
 
 T = TypeVar("T")
@@ -12,10 +12,48 @@ UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 class AsyncBaseRepository(Generic[T, CreateSchemaType, UpdateSchemaType]):
     """Async base repository with common CRUD operations for FastAPI endpoints."""
     
+    # Large columns left out of list queries unless a caller asks for them
+    deferred_columns: Tuple[str, ...] = ()
+    
     def __init__(self, session: AsyncSession, model: Type[T]):
         self.session = session
         self.model = model
     
+    def _apply_filters(self, query, filters: Optional[Dict[str, Any]] = None):
+        """
+        Add equality (or IN for lists) conditions for filters naming model attributes.
+        
+        Keys suffixed ``__gte`` / ``__lte`` compare the attribute as a lower / upper bound.
+        """
+        if filters:
+            filter_conditions = []
+            for key, value in filters.items():
+                name, _, operator = key.partition("__")
+                if hasattr(self.model, name) and operator in ("", "gte", "lte"):
+                    attr = getattr(self.model, name)
+                    if operator == "gte":
+                        filter_conditions.append(attr >= value)
+                    elif operator == "lte":
+                        filter_conditions.append(attr <= value)
+                    elif isinstance(value, list):
+                        filter_conditions.append(attr.in_(value))
+                    else:
+                        filter_conditions.append(attr == value)
+            
+            if filter_conditions:
+                query = query.where(and_(*filter_conditions))
+        return query
+    
+    def projection_options(self, columns: Optional[List[str]] = None) -> list:
+        """
+        Loader options loading only ``columns``, or every column except ``deferred_columns``.
+        
+        Unloaded columns raise on access instead of lazy loading, which an async session cannot do.
+        """
+        if columns:
+            return [load_only(*[getattr(self.model, column) for column in columns], raiseload=True)]
+        return [defer(getattr(self.model, column), raiseload=True) for column in self.deferred_columns]
+    
     async def create(self, obj_in: CreateSchemaType) -> T:
         """Create a new record."""
         obj_data = obj_in.model_dump() if hasattr(obj_in, 'model_dump') else obj_in.dict()
@@ -26,38 +64,41 @@ class AsyncBaseRepository(Generic[T, CreateSchemaType, UpdateSchemaType]):
         return db_obj
     
     async def get(self, id: UUID) -> Optional[T]:
-        """Get record by ID."""
-        result = await self.session.execute(
-            select(self.model).where(self.model.id == id)
-        )
-        return result.scalar_one_or_none()
+        """Get record by ID, served from the session identity map when already loaded."""
+        return await self.session.get(self.model, id)
     
     async def get_multi(
         self, 
         skip: int = 0, 
         limit: int = 100,
-        filters: Optional[Dict[str, Any]] = None
+        filters: Optional[Dict[str, Any]] = None,
+        columns: Optional[List[str]] = None,
+        include_deferred: bool = False
     ) -> List[T]:
-        """Get multiple records with optional filtering."""
+        """Get multiple records with optional filtering; deferred columns are skipped unless included."""
         query = select(self.model)
+        if columns or not include_deferred:
+            query = query.options(*self.projection_options(columns))
         
-        if filters:
-            filter_conditions = []
-            for key, value in filters.items():
-                if hasattr(self.model, key):
-                    attr = getattr(self.model, key)
-                    if isinstance(value, list):
-                        filter_conditions.append(attr.in_(value))
-                    else:
-                        filter_conditions.append(attr == value)
-            
-            if filter_conditions:
-                query = query.where(and_(*filter_conditions))
-        
+        query = self._apply_filters(query, filters)
         query = query.offset(skip).limit(limit)
         result = await self.session.execute(query)
         return result.scalars().all()
     
+    async def get_multi_rows(
+        self,
+        columns: List[str],
+        skip: int = 0,
+        limit: int = 100,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Get multiple records as plain dicts of the given columns, without building ORM objects."""
+        query = select(*[getattr(self.model, column) for column in columns])
+        query = self._apply_filters(query, filters)
+        query = query.offset(skip).limit(limit)
+        result = await self.session.execute(query)
+        return [dict(row) for row in result.mappings()]
+    
     async def update(self, db_obj: T, obj_in: UpdateSchemaType) -> T:
         """Update an existing record."""
         obj_data = obj_in.model_dump(exclude_unset=True) if hasattr(obj_in, 'model_dump') else obj_in.dict(exclude_unset=True)
@@ -71,6 +112,20 @@ class AsyncBaseRepository(Generic[T, CreateSchemaType, UpdateSchemaType]):
         await self.session.refresh(db_obj)
         return db_obj
     
+    async def update_by_id(self, id: UUID, values: Dict[str, Any]) -> Optional[T]:
+        """Update a record with a single UPDATE ... RETURNING. Returns None if it does not exist."""
+        if not values:
+            return await self.get(id)
+        result = await self.session.execute(
+            update(self.model)
+            .where(self.model.id == id)
+            .values(**values)
+            .returning(self.model)
+        )
+        db_obj = result.scalar_one_or_none()
+        await self.session.commit()
+        return db_obj
+    
     async def delete(self, id: UUID) -> bool:
         """Delete a record by ID."""
         result = await self.session.execute(
@@ -79,23 +134,18 @@ class AsyncBaseRepository(Generic[T, CreateSchemaType, UpdateSchemaType]):
         await self.session.commit()
         return result.rowcount > 0
     
+    async def count_grouped(self, columns: List[str], filters: Optional[Dict[str, Any]] = None) -> List[Tuple]:
+        """Count records per distinct combination of ``columns``; rows are (*values, count)."""
+        attrs = [getattr(self.model, column) for column in columns]
+        query = self._apply_filters(select(*attrs, func.count(self.model.id)), filters).group_by(*attrs)
+        result = await self.session.execute(query)
+        return [tuple(row) for row in result.all()]
+    
     async def count(self, filters: Optional[Dict[str, Any]] = None) -> int:
         """Count records with optional filtering."""
         query = select(func.count(self.model.id))
         
-        if filters:
-            filter_conditions = []
-            for key, value in filters.items():
-                if hasattr(self.model, key):
-                    attr = getattr(self.model, key)
-                    if isinstance(value, list):
-                        filter_conditions.append(attr.in_(value))
-                    else:
-                        filter_conditions.append(attr == value)
-            
-            if filter_conditions:
-                query = query.where(and_(*filter_conditions))
-        
+        query = self._apply_filters(query, filters)
         result = await self.session.execute(query)
         return result.scalar()
     
@@ -133,6 +183,29 @@ class AsyncBaseRepository(Generic[T, CreateSchemaType, UpdateSchemaType]):
         
         return db_objects
     
+    async def bulk_insert(self, rows: List[Dict[str, Any]]) -> List[T]:
+        """Insert many rows with one batched INSERT ... RETURNING and commit."""
+        if not rows:
+            return []
+        
+        result = await self.session.scalars(
+            insert(self.model).returning(self.model, sort_by_parameter_order=True),
+            rows
+        )
+        db_objects = list(result.all())
+        await self.session.commit()
+        return db_objects
+    
+    async def get_existing_ids(self, ids: List[UUID]) -> set:
+        """Return the subset of ids that exist, in one query."""
+        if not ids:
+            return set()
+        
+        result = await self.session.execute(
+            select(self.model.id).where(self.model.id.in_(ids))
+        )
+        return set(result.scalars().all())
+    
     async def bulk_update(self, updates: Dict[UUID, UpdateSchemaType]) -> int:
         """Update multiple records. Returns count of updated records."""
         updated_count = 0
@@ -1,12 +1,20 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from database.async_base_repository import AsyncBaseRepository
-from database.models import JobDefinition, JobRun
-from database.repositories.job_repository import JobDefinitionCreate, JobDefinitionUpdate
+from database.models import JobDefinition, JobRun, JobRunLog
+from database.repositories.job_repository import JobDefinitionCreate, JobDefinitionUpdate, with_version_bump
 from database.repositories.job_run_repository import JobRunCreate, JobRunUpdate
+from database.repositories.job_run_log_repository import JobRunLogCreate, build_log_row
+from database.replica import session_dialect
 
 class AsyncJobDefinitionRepository(AsyncBaseRepository[JobDefinition, JobDefinitionCreate, JobDefinitionUpdate]):
     """Async repository for job definitions - FastAPI endpoints."""
     
+    deferred_columns = ("payload",)
+    
+    async def update_by_id(self, id, values):
+        """Update a job definition; execution field changes bump its version, invalidating worker caches."""
+        return await super().update_by_id(id, with_version_bump(values))
+    
     async def get_eligible_jobs(self):
         """Get jobs eligible for execution - simplified for API access."""
         from sqlalchemy import select, and_, or_
@@ -24,10 +32,29 @@ class AsyncJobDefinitionRepository(AsyncBaseRepository[JobDefinition, JobDefinit
         )
         result = await self.session.execute(query)
         return result.scalars().all()
+    
+    async def set_enabled(self, job_ids, enabled: bool):
+        """Enable or disable many jobs in one UPDATE. Returns ids of updated jobs."""
+        from sqlalchemy import update
+        
+        if not job_ids:
+            return []
+        
+        result = await self.session.execute(
+            update(JobDefinition)
+            .where(JobDefinition.id.in_(job_ids))
+            .values(enabled=enabled)
+            .returning(JobDefinition.id)
+        )
+        updated_ids = list(result.scalars().all())
+        await self.session.commit()
+        return updated_ids
 
 class AsyncJobRunRepository(AsyncBaseRepository[JobRun, JobRunCreate, JobRunUpdate]):
     """Async repository for job runs - FastAPI endpoints."""
     
+    deferred_columns = ("log_message", "output_summary")
+    
     async def get_runs_by_job(self, job_id, limit: int = 100):
         """Get runs for a specific job."""
         from sqlalchemy import select, desc
@@ -40,6 +67,209 @@ class AsyncJobRunRepository(AsyncBaseRepository[JobRun, JobRunCreate, JobRunUpda
         )
         result = await self.session.execute(query)
         return result.scalars().all()
+    
+    def _run_conditions(self, job_id, status=None, triggered_by=None, started_after=None, started_before=None):
+        conditions = [JobRun.job_id == job_id]
+        if status:
+            conditions.append(JobRun.status == status)
+        if triggered_by:
+            conditions.append(JobRun.triggered_by == triggered_by)
+        if started_after:
+            conditions.append(JobRun.start_time >= started_after)
+        if started_before:
+            conditions.append(JobRun.start_time < started_before)
+        return conditions
+    
+    async def query_runs(
+        self,
+        job_id,
+        status: str = None,
+        triggered_by: str = None,
+        started_after=None,
+        started_before=None,
+        limit: int = 100,
+        skip: int = 0,
+        before=None
+    ):
+        """
+        Get a page of a job's runs, newest first, with filters applied in SQL.
+        
+        ``before`` is the (start_time, id) of the last run of the previous page; when
+        given, the page is read by keyset instead of ``skip``.
+        """
+        from sqlalchemy import select, tuple_
+        
+        query = (
+            select(JobRun)
+            .where(*self._run_conditions(job_id, status, triggered_by, started_after, started_before))
+            .order_by(JobRun.start_time.desc(), JobRun.id.desc())
+        )
+        if before:
+            query = query.where(tuple_(JobRun.start_time, JobRun.id) < tuple_(*before))
+        elif skip:
+            query = query.offset(skip)
+        
+        result = await self.session.execute(query.limit(limit))
+        return result.scalars().all()
+    
+    async def summarize_runs(
+        self,
+        job_id,
+        status: str = None,
+        triggered_by: str = None,
+        started_after=None,
+        started_before=None,
+        include_durations: bool = False
+    ):
+        """
+        Count a job's runs matching the filters, per status, in one aggregate query.
+        
+        With ``include_durations`` the same query also computes p50/p95 run duration
+        of finished runs (on Postgres; other dialects compute them in Python).
+        """
+        import statistics
+        from sqlalchemy import select, func
+        
+        conditions = self._run_conditions(job_id, status, triggered_by, started_after, started_before)
+        statuses = ["running", "success", "failed", "skipped"]
+        columns = [func.count(JobRun.id).label("total_runs")] + [
+            func.count(JobRun.id).filter(JobRun.status == run_status).label(run_status)
+            for run_status in statuses
+        ]
+        
+        is_postgres = session_dialect(self.session) == "postgresql"
+        if include_durations and is_postgres:
+            duration = func.extract("epoch", JobRun.end_time - JobRun.start_time)
+            columns += [
+                func.percentile_cont(0.5).within_group(duration).label("p50"),
+                func.percentile_cont(0.95).within_group(duration).label("p95"),
+            ]
+        
+        row = (await self.session.execute(select(*columns).where(*conditions))).one()._mapping
+        status_counts = {run_status: row[run_status] for run_status in statuses}
+        finished = status_counts["success"] + status_counts["failed"]
+        summary = {
+            "total_runs": row["total_runs"],
+            "status_counts": status_counts,
+            "success_rate": round(status_counts["success"] / finished * 100, 2) if finished else None,
+            "p50_duration_seconds": None,
+            "p95_duration_seconds": None,
+        }
+        
+        if include_durations and is_postgres:
+            summary["p50_duration_seconds"] = float(row["p50"]) if row["p50"] is not None else None
+            summary["p95_duration_seconds"] = float(row["p95"]) if row["p95"] is not None else None
+        elif include_durations:
+            result = await self.session.execute(
+                select(JobRun.start_time, JobRun.end_time).where(*conditions, JobRun.end_time.is_not(None))
+            )
+            durations = sorted((end - start).total_seconds() for start, end in result.all())
+            if len(durations) == 1:
+                summary["p50_duration_seconds"] = summary["p95_duration_seconds"] = durations[0]
+            elif durations:
+                cuts = statistics.quantiles(durations, n=100, method="inclusive")
+                summary["p50_duration_seconds"] = cuts[49]
+                summary["p95_duration_seconds"] = cuts[94]
+        
+        return summary
+
+    async def create_for_job(self, job_id, triggered_by: str = "manual", execution_host: str = None):
+        """
+        Create a running job run only if the job exists, in one INSERT ... SELECT.
+        
+        Returns None when the job does not exist.
+        """
+        import uuid
+        from datetime import datetime
+        from sqlalchemy import insert, select, literal, DateTime, Text
+        from sqlalchemy.dialects.postgresql import UUID as PGUUID
+        
+        existing_job = select(
+            literal(uuid.uuid4(), PGUUID(as_uuid=True)),
+            JobDefinition.id,
+            literal(datetime.utcnow(), DateTime()),
+            literal("running", Text()),
+            literal(triggered_by, Text()),
+            literal(execution_host, Text()),
+        ).where(JobDefinition.id == job_id)
+        
+        result = await self.session.execute(
+            insert(JobRun)
+            .from_select(
+                ["id", "job_id", "start_time", "status", "triggered_by", "execution_host"],
+                existing_job
+            )
+            .returning(JobRun)
+        )
+        job_run = result.scalar_one_or_none()
+        await self.session.commit()
+        return job_run
+    
+    async def get_for_job(self, run_id, job_id):
+        """Get a run by ID only if it belongs to the given job."""
+        from sqlalchemy import select
+        
+        result = await self.session.execute(
+            select(JobRun).where(JobRun.id == run_id, JobRun.job_id == job_id)
+        )
+        return result.scalar_one_or_none()
+    
+    async def exists_for_job(self, run_id, job_id) -> bool:
+        """Check a run exists and belongs to the given job."""
+        from sqlalchemy import select
+        
+        result = await self.session.execute(
+            select(JobRun.id).where(JobRun.id == run_id, JobRun.job_id == job_id)
+        )
+        return result.scalar_one_or_none() is not None
+    
+    async def mark_many_failed(self, run_ids, error_message: str):
+        """Mark many running job runs as failed in one UPDATE. Returns ids of transitioned runs."""
+        from sqlalchemy import update
+        from datetime import datetime, UTC
+        
+        if not run_ids:
+            return []
+        
+        result = await self.session.execute(
+            update(JobRun)
+            .where(JobRun.id.in_(run_ids), JobRun.status == "running")
+            .values(
+                status="failed",
+                end_time=datetime.now(UTC),
+                log_message={"error": error_message, "timestamp": datetime.now(UTC).isoformat()}
+            )
+            .returning(JobRun.id)
+        )
+        updated_ids = list(result.scalars().all())
+        await self.session.commit()
+        return updated_ids
+
+class AsyncJobRunLogRepository(AsyncBaseRepository[JobRunLog, JobRunLogCreate, JobRunLogCreate]):
+    """Async repository for job run log lines - FastAPI endpoints."""
+    
+    async def add_entries(self, run_id, log_entries: list) -> int:
+        """Append many log lines for a run in one multi-row INSERT."""
+        from sqlalchemy import insert
+        
+        if not log_entries:
+            return 0
+        
+        rows = [build_log_row(run_id, entry) for entry in log_entries]
+        await self.session.execute(insert(JobRunLog), rows)
+        await self.session.commit()
+        return len(rows)
+    
+    async def get_logs_by_run(self, run_id, after_id: int = None, limit: int = 100):
+        """Get log lines for a run in emission order, paginated by the last seen id."""
+        from sqlalchemy import select
+        
+        query = select(JobRunLog).where(JobRunLog.run_id == run_id)
+        if after_id is not None:
+            query = query.where(JobRunLog.id > after_id)
+        query = query.order_by(JobRunLog.id).limit(limit)
+        result = await self.session.execute(query)
+        return result.scalars().all()
 
 
 class AsyncRepositoryFactory:
@@ -49,6 +279,7 @@ class AsyncRepositoryFactory:
         self.session = session
         self._job_definition_repo = None
         self._job_run_repo = None
+        self._job_run_log_repo = None
         self._satellite_data_repo = None
         self._anomaly_repo = None
         self._alert_repo = None
@@ -67,6 +298,13 @@ class AsyncRepositoryFactory:
             self._job_run_repo = AsyncJobRunRepository(self.session, JobRun)
         return self._job_run_repo
     
+    @property
+    def job_run_log(self) -> AsyncJobRunLogRepository:
+        """Get async JobRunLogRepository instance."""
+        if self._job_run_log_repo is None:
+            self._job_run_log_repo = AsyncJobRunLogRepository(self.session, JobRunLog)
+        return self._job_run_log_repo
+    
     # @property
     # def satellite_data(self) -> AsyncSatelliteDataRepository:
     #     """Get async SatelliteDataRepository instance."""
@@ -1,6 +1,6 @@
-from typing import Generic, TypeVar, Type, List, Optional, Dict, Any
+from typing import Generic, TypeVar, Type, List, Optional, Dict, Any, Tuple
 from uuid import UUID
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, defer, load_only
 from sqlalchemy import desc, and_, or_
 from pydantic import BaseModel
 
@@ -11,6 +11,9 @@ UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 class BaseRepository(Generic[T, CreateSchemaType, UpdateSchemaType]):
     """Base repository with common CRUD operations."""
     
+    # Large columns left out of list queries unless a caller asks for them
+    deferred_columns: Tuple[str, ...] = ()
+    
     def __init__(self, session: Session, model: Type[T]):
         self.session = session
         self.model = model
@@ -24,18 +27,49 @@ class BaseRepository(Generic[T, CreateSchemaType, UpdateSchemaType]):
         self.session.refresh(db_obj)
         return db_obj
     
+    def create_many(self, objs_in: List[CreateSchemaType]) -> List[UUID]:
+        """Create many records in one transaction. Returns their ids, in input order."""
+        db_objs = [
+            self.model(**(obj_in.model_dump() if hasattr(obj_in, 'model_dump') else obj_in.dict()))
+            for obj_in in objs_in
+        ]
+        if not db_objs:
+            return []
+        self.session.add_all(db_objs)
+        self.session.flush()
+        # Read ids before commit expires the instances, which would reload each one
+        ids = [db_obj.id for db_obj in db_objs]
+        self.session.commit()
+        return ids
+    
     def get(self, id: UUID) -> Optional[T]:
-        """Get record by ID."""
-        return self.session.query(self.model).filter(self.model.id == id).first()
+        """Get record by ID, served from the session identity map when already loaded."""
+        return self.session.get(self.model, id)
+    
+    def get_many(self, ids: List[UUID]) -> List[T]:
+        """Get records by ID with one query; missing ids are left out."""
+        if not ids:
+            return []
+        return self.session.query(self.model).filter(self.model.id.in_(ids)).all()
+    
+    def projection_options(self, columns: Optional[List[str]] = None) -> list:
+        """Loader options loading only ``columns``, or every column except ``deferred_columns``."""
+        if columns:
+            return [load_only(*[getattr(self.model, column) for column in columns])]
+        return [defer(getattr(self.model, column)) for column in self.deferred_columns]
     
     def get_multi(
         self, 
         skip: int = 0, 
         limit: int = 100,
-        filters: Optional[Dict[str, Any]] = None
+        filters: Optional[Dict[str, Any]] = None,
+        columns: Optional[List[str]] = None,
+        include_deferred: bool = False
     ) -> List[T]:
-        """Get multiple records with optional filtering."""
+        """Get multiple records with optional filtering; deferred columns load on access unless included."""
         query = self.session.query(self.model)
+        if columns or not include_deferred:
+            query = query.options(*self.projection_options(columns))
         
         if filters:
             filter_conditions = []
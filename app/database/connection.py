@@ -1,35 +1,195 @@
+import os
+import tempfile
+import threading
+from typing import Any, Dict, List, Optional
 from sqlalchemy import create_engine, MetaData
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import declarative_base, sessionmaker
-from sqlalchemy.pool import QueuePool
+from sqlalchemy.pool import StaticPool
 from config.settings import get_settings
+from database.pool import engine_options, instrument_engine
+from database.replica import PRIMARY_ONLY_ROLES, ReplicaSelector, routing_session_class
 
-settings = get_settings()
-
-# Sync engine for Celery workers
-sync_engine = create_engine(
-    settings.database.sync_url,
-    poolclass=QueuePool,
-    pool_size=settings.database.pool_size,
-    max_overflow=settings.database.max_overflow,
-    pool_timeout=settings.database.pool_timeout,
-    pool_recycle=settings.database.pool_recycle,
-    echo=settings.database.echo,
-)
-
-# Async engine for FastAPI endpoints
-async_engine = create_async_engine(
-    settings.database.async_url,
-    pool_size=settings.database.pool_size,
-    max_overflow=settings.database.max_overflow,
-    pool_timeout=settings.database.pool_timeout,
-    pool_recycle=settings.database.pool_recycle,
-    echo=settings.database.echo,
-)
-
-# Session factories
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=sync_engine)
-AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+# Engines are created on first use, once per process. After os.fork() the child
+# drops the inherited pools (without closing the parent's sockets) and builds its own.
+_engines: Dict[str, Any] = {}
+_engines_lock = threading.Lock()
+
+def _build_engines() -> Dict[str, Any]:
+    """Create primary and replica engines for the configured process role."""
+    settings = get_settings()
+    if settings.database.test_mode:
+        return _build_test_engines(settings.database.test_url)
+
+    role = settings.database.process_role
+
+    # Sync engine for Celery workers
+    sync_engine = instrument_engine(
+        create_engine(settings.database.sync_url, **engine_options(settings.database)),
+        "primary_sync",
+        role,
+    )
+
+    # Async engine for FastAPI endpoints
+    async_engine = create_async_engine(settings.database.async_url, **engine_options(settings.database, is_async=True))
+    instrument_engine(async_engine.sync_engine, "primary_async", role)
+
+    # Read replica engines; reads are routed here when DB_REPLICA_HOSTS is set.
+    # Workers and the scheduler read rows the API has only just written (runs,
+    # job definitions), so they always use the primary.
+    replica_sync_urls, replica_async_urls = [], []
+    if role not in PRIMARY_ONLY_ROLES:
+        replica_sync_urls = settings.database.replica_sync_urls
+        replica_async_urls = settings.database.replica_async_urls
+
+    replica_sync_engines = [
+        instrument_engine(
+            create_engine(url, **{**engine_options(settings.database), "pool_pre_ping": True}),
+            f"replica_{index}_sync",
+            role,
+        )
+        for index, url in enumerate(replica_sync_urls)
+    ]
+
+    replica_async_engines = [
+        create_async_engine(url, **{**engine_options(settings.database, is_async=True), "pool_pre_ping": True})
+        for url in replica_async_urls
+    ]
+    for index, engine in enumerate(replica_async_engines):
+        instrument_engine(engine.sync_engine, f"replica_{index}_async", role)
+
+    replica_selector = ReplicaSelector(
+        replica_sync_engines,
+        strategy=settings.database.replica_selection,
+        max_lag_seconds=settings.database.replica_max_lag_seconds,
+        lag_check_interval=settings.database.replica_lag_check_interval,
+    )
+
+    return {
+        "sync": sync_engine,
+        "async": async_engine,
+        "replica_sync": replica_sync_engines,
+        "replica_async": replica_async_engines,
+        "replica_selector": replica_selector,
+    }
+
+@compiles(JSONB, "sqlite")
+def _compile_jsonb_sqlite(type_, compiler, **kw):
+    return "JSON"
+
+def _build_test_engines(url: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Create SQLite engines standing in for Postgres in tests.
+
+    The ``carbonleap`` schema is translated away and all tables are created on
+    first use. The async engine needs the optional ``aiosqlite`` driver.
+    """
+    if not url:
+        url = f"sqlite:///{os.path.join(tempfile.gettempdir(), f'geospatial_test_{os.getpid()}.db')}"
+    translate = {"schema_translate_map": {"carbonleap": None}}
+
+    sync_engine = create_engine(
+        url,
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+        execution_options=translate,
+    )
+    import database.models  # noqa: F401  register tables on Base.metadata
+    Base.metadata.create_all(sync_engine)
+
+    try:
+        import aiosqlite  # noqa: F401
+        async_engine = create_async_engine(
+            url.replace("sqlite://", "sqlite+aiosqlite://", 1),
+            poolclass=StaticPool,
+            execution_options=translate,
+        )
+    except ImportError:
+        async_engine = None
+
+    return {
+        "sync": sync_engine,
+        "async": async_engine,
+        "replica_sync": [],
+        "replica_async": [],
+        "replica_selector": None,
+    }
+
+def _get_engines() -> Dict[str, Any]:
+    if not _engines:
+        with _engines_lock:
+            if not _engines:
+                _engines.update(_build_engines())
+    return _engines
+
+def get_sync_engine() -> Engine:
+    """Get the process-wide sync engine, creating it on first use."""
+    return _get_engines()["sync"]
+
+def get_async_engine() -> AsyncEngine:
+    """Get the process-wide async engine, creating it on first use."""
+    engine = _get_engines()["async"]
+    if engine is None:
+        raise RuntimeError("Async engine unavailable in test mode; install aiosqlite")
+    return engine
+
+def use_test_engines(url: Optional[str] = None) -> Engine:
+    """Replace the process engines with SQLite stand-ins. Returns the sync engine."""
+    dispose_engines()
+    with _engines_lock:
+        _engines.update(_build_test_engines(url))
+    return _engines["sync"]
+
+def dispose_engines(close: bool = True) -> None:
+    """
+    Dispose all engines of this process; they are recreated on next use.
+
+    ``close=False`` drops pooled connections without closing them, which is what
+    a forked child must do so it does not tear down its parent's sockets.
+    """
+    with _engines_lock:
+        engines: List[Engine] = []
+        if _engines:
+            engines.append(_engines["sync"])
+            engines.extend(_engines["replica_sync"])
+            if _engines["async"] is not None:
+                engines.append(_engines["async"].sync_engine)
+            engines.extend(engine.sync_engine for engine in _engines["replica_async"])
+
+        for engine in engines:
+            engine.dispose(close=close)
+        _engines.clear()
+
+def _dispose_engines_after_fork() -> None:
+    global _engines_lock
+    # The lock may have been held by another parent thread at fork time
+    _engines_lock = threading.Lock()
+    dispose_engines(close=False)
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_dispose_engines_after_fork)
+
+def _resolve_sync_binds():
+    engines = _get_engines()
+    return engines["sync"], engines["replica_sync"], engines["replica_selector"]
+
+def _resolve_async_binds():
+    engines = _get_engines()
+    return (
+        get_async_engine().sync_engine,
+        [engine.sync_engine for engine in engines["replica_async"]],
+        engines["replica_selector"],
+    )
+
+SyncRoutingSession = routing_session_class("SyncRoutingSession", _resolve_sync_binds)
+AsyncRoutingSession = routing_session_class("AsyncRoutingSession", _resolve_async_binds)
+
+# Session factories; engines are bound lazily by the routing sessions
+SessionLocal = sessionmaker(class_=SyncRoutingSession, autocommit=False, autoflush=False)
+AsyncSessionLocal = async_sessionmaker(sync_session_class=AsyncRoutingSession, expire_on_commit=False)
 
 # Create declarative base
 # Create Base with naming convention for constraints
@@ -45,6 +205,14 @@ metadata = MetaData(naming_convention=naming_convention)
 Base = declarative_base(metadata=metadata)
 # Base = declarative_base()
 
+def __getattr__(name: str):
+    # Backwards-compatible lazy module attributes
+    if name == "sync_engine":
+        return get_sync_engine()
+    if name == "async_engine":
+        return get_async_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 def get_db():
     """Sync database dependency for Celery workers."""
     db = SessionLocal()
@@ -63,4 +231,4 @@ async def get_async_db():
 
 def get_sync_database_url() -> str:
     """Get the synchronous database URL."""
-    return settings.database.sync_url
\ No newline at end of file
+    return get_settings().database.sync_url
@@ -1,9 +1,10 @@
-from .job import JobDefinition, JobRun
+from .job import JobDefinition, JobRun, JobRunLog
 # from .satellite_data import SatelliteData
 # from .anomaly import Anomaly
 # from .alert import Alert
 
 __all__ = [
     "JobDefinition",
-    "JobRun"
+    "JobRun",
+    "JobRunLog"
 ]
\ No newline at end of file
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Boolean, Integer, DateTime, Text, ForeignKey
+from sqlalchemy import Column, String, Boolean, Integer, BigInteger, Float, DateTime, Text, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from database.connection import Base
@@ -87,6 +87,51 @@ class JobDefinition(Base):
         doc="Retry configuration: count, delay strategy"
     )
     
+    # Geometry metrics derived from payload coordinates on every write
+    bbox_min_lon = Column(
+        Float,
+        nullable=True,
+        doc="Western edge of the job area (degrees)"
+    )
+    
+    bbox_min_lat = Column(
+        Float,
+        nullable=True,
+        doc="Southern edge of the job area (degrees)"
+    )
+    
+    bbox_max_lon = Column(
+        Float,
+        nullable=True,
+        doc="Eastern edge of the job area (degrees)"
+    )
+    
+    bbox_max_lat = Column(
+        Float,
+        nullable=True,
+        doc="Northern edge of the job area (degrees)"
+    )
+    
+    area_ha = Column(
+        Float,
+        nullable=True,
+        doc="Geodesic area of the job polygon in hectares"
+    )
+    
+    vertex_count = Column(
+        Integer,
+        nullable=True,
+        doc="Number of vertices of the job polygon"
+    )
+    
+    version = Column(
+        Integer,
+        nullable=False,
+        default=1,
+        server_default="1",
+        doc="Incremented when fields that affect execution change; workers cache definitions by it"
+    )
+    
     created_at = Column(
         DateTime,
         nullable=False,
@@ -109,7 +154,12 @@ class JobRun(Base):
     """Job execution logs and results."""
     
     __tablename__ = "job_runs"
-    __table_args__ = {"schema": "carbonleap"}  # Specify schema
+    __table_args__ = (
+        # Run history: newest-first keyset pages per job, optionally by status
+        Index("ix_job_runs_job_id_start_time_id", "job_id", "start_time", "id"),
+        Index("ix_job_runs_job_id_status_start_time_id", "job_id", "status", "start_time", "id"),
+        {"schema": "carbonleap"},
+    )
     
     id = Column(
         UUID(as_uuid=True),
@@ -171,4 +221,53 @@ class JobRun(Base):
     )
     
     # Relationship to job definition
-    job_definition = relationship("JobDefinition", back_populates="job_runs")
\ No newline at end of file
+    job_definition = relationship("JobDefinition", back_populates="job_runs")
+
+class JobRunLog(Base):
+    """Append-only log lines emitted while a job run executes."""
+    
+    __tablename__ = "job_run_logs"
+    __table_args__ = (
+        Index("ix_job_run_logs_run_id_id", "run_id", "id"),
+        {"schema": "carbonleap"},
+    )
+    
+    id = Column(
+        BigInteger().with_variant(Integer, "sqlite"),
+        primary_key=True,
+        autoincrement=True,
+        doc="Monotonic log line identifier, also used as the pagination cursor"
+    )
+    
+    run_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("carbonleap.job_runs.id", ondelete="CASCADE"),
+        nullable=False,
+        doc="Reference to the job run that emitted this line"
+    )
+    
+    created_at = Column(
+        DateTime,
+        nullable=False,
+        default=datetime.utcnow,
+        doc="Timestamp when the log line was produced"
+    )
+    
+    level = Column(
+        Text,
+        nullable=False,
+        default="info",
+        doc="Log level: debug, info, warning, error"
+    )
+    
+    message = Column(
+        Text,
+        nullable=True,
+        doc="Human-readable log message"
+    )
+    
+    details = Column(
+        JSONB,
+        nullable=True,
+        doc="Structured context attached to the log line"
+    )
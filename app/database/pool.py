@@ -0,0 +1,162 @@
+import itertools
+import threading
+import time
+from typing import Any, Dict, Optional
+from uuid import uuid4
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+from config.database_config import DatabaseConfig
+
+POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled database connection",
+    ["engine", "role"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30)
+)
+POOL_CHECKOUT_TIMEOUTS = Counter(
+    "db_pool_checkout_timeouts_total",
+    "Connection checkouts that hit pool_timeout",
+    ["engine", "role"]
+)
+# Summed over live processes when gunicorn workers share a multiprocess registry
+POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Connections currently checked out", ["engine", "role"], multiprocess_mode="livesum")
+POOL_OVERFLOW = Gauge("db_pool_overflow", "Connections open beyond pool_size", ["engine", "role"], multiprocess_mode="livesum")
+POOL_SIZE = Gauge("db_pool_size", "Configured pool size", ["engine", "role"], multiprocess_mode="livesum")
+
+class PoolPressure:
+    """
+    How long connection checkouts currently wait in this process.
+
+    ``wait_seconds`` is the larger of the oldest checkout still waiting and a
+    moving average of completed waits that halves every ``half_life`` seconds,
+    so the signal clears on its own once the pools recover.
+    """
+
+    def __init__(self, half_life: float = 5.0):
+        self.half_life = half_life
+        self._average = 0.0
+        self._updated_at = time.monotonic()
+        self._waiting: Dict[int, float] = {}
+        self._tokens = itertools.count()
+        self._lock = threading.Lock()
+
+    def checkout_started(self) -> int:
+        token = next(self._tokens)
+        with self._lock:
+            self._waiting[token] = time.monotonic()
+        return token
+
+    def checkout_finished(self, token: int, waited: float) -> None:
+        with self._lock:
+            self._waiting.pop(token, None)
+            self._average = 0.8 * self._decayed_average() + 0.2 * waited
+            self._updated_at = time.monotonic()
+
+    def wait_seconds(self) -> float:
+        now = time.monotonic()
+        with self._lock:
+            oldest = min(self._waiting.values(), default=now)
+            average = self._decayed_average()
+        return max(now - oldest, average)
+
+    def _decayed_average(self) -> float:
+        return self._average * 0.5 ** ((time.monotonic() - self._updated_at) / self.half_life)
+
+POOL_PRESSURE = PoolPressure()
+
+class InstrumentedPoolMixin:
+    """Records checkout wait time and timeouts of a queue pool."""
+
+    metric_labels: Dict[str, str] = {"engine": "unknown", "role": "unknown"}
+
+    def _do_get(self):
+        start = time.perf_counter()
+        token = POOL_PRESSURE.checkout_started()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            POOL_CHECKOUT_TIMEOUTS.labels(**self.metric_labels).inc()
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            POOL_PRESSURE.checkout_finished(token, waited)
+            POOL_CHECKOUT_WAIT.labels(**self.metric_labels).observe(waited)
+        self.record_usage()
+        return connection
+
+    def _do_return_conn(self, record):
+        super()._do_return_conn(record)
+        self.record_usage()
+
+    def record_usage(self) -> None:
+        """Update the pool gauges; set on checkout and checkin, which also works in multiprocess mode."""
+        POOL_CHECKED_OUT.labels(**self.metric_labels).set(self.checkedout())
+        POOL_OVERFLOW.labels(**self.metric_labels).set(max(self.overflow(), 0))
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metric_labels = self.metric_labels
+        return pool
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    """QueuePool exporting checkout telemetry."""
+
+class InstrumentedAsyncQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool exporting checkout telemetry."""
+
+def engine_options(config: DatabaseConfig, is_async: bool = False, role: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Build create_engine keyword arguments for the pool profile of a process role.
+
+    - ``api``: shared QueuePool sized by ``pool_size`` / ``max_overflow``.
+    - ``worker``: one small pool per prefork child (``worker_pool_size``), or NullPool
+      when it is 0 or PgBouncer does the pooling.
+    - ``scheduler``: small pool for beat and discovery runs.
+    """
+    role = role or config.process_role
+    options: Dict[str, Any] = {
+        "pool_recycle": config.pool_recycle,
+        "pool_pre_ping": role != "api",
+        "echo": config.echo,
+    }
+
+    if role == "worker":
+        pool_size, max_overflow = config.worker_pool_size, 1
+    elif role == "scheduler":
+        pool_size, max_overflow = config.scheduler_pool_size, 2
+    else:
+        pool_size, max_overflow = config.pool_size, config.max_overflow
+
+    if role != "api" and (pool_size == 0 or config.pgbouncer):
+        options["poolclass"] = NullPool
+        options.pop("pool_recycle")
+    else:
+        options.update({
+            "poolclass": InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+            "pool_size": pool_size,
+            "max_overflow": max_overflow,
+            "pool_timeout": config.pool_timeout,
+        })
+
+    if is_async and config.pgbouncer:
+        # PgBouncer in transaction mode cannot keep server-side prepared statements
+        options["connect_args"] = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+
+    return options
+
+def instrument_engine(engine: Engine, name: str, role: str) -> Engine:
+    """Attach pool gauges and metric labels to an engine's pool."""
+    labels = {"engine": name, "role": role}
+
+    if isinstance(engine.pool, InstrumentedPoolMixin):
+        engine.pool.metric_labels = labels
+        engine.pool.record_usage()
+        POOL_SIZE.labels(**labels).set(engine.pool.size())
+
+    return engine
@@ -0,0 +1,165 @@
+import itertools
+import logging
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+from sqlalchemy import Select, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+PRIMARY_PINNED = "primary_pinned"
+REPLICA_INDEX = "replica_index"
+
+# Process roles that never read from replicas (see DB_PROCESS_ROLE)
+PRIMARY_ONLY_ROLES = ("worker", "scheduler")
+
+REPLICA_LAG_QUERY = text(
+    "SELECT COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)"
+)
+
+class ReplicaSelector:
+    """
+    Chooses a read replica for read-only statements.
+
+    A background thread measures every replica's replication lag each
+    ``lag_check_interval`` seconds. ``round_robin`` cycles through the replicas;
+    ``least_lag`` picks the one with the lowest lag. With either strategy,
+    replicas lagging more than ``max_lag_seconds`` (or unreachable) are skipped;
+    when none qualifies, callers fall back to the primary.
+    """
+
+    def __init__(
+        self,
+        probe_engines: List[Engine],
+        strategy: str = "round_robin",
+        max_lag_seconds: float = 30.0,
+        lag_check_interval: int = 10
+    ):
+        self.probe_engines = probe_engines
+        self.strategy = strategy
+        self.max_lag_seconds = max_lag_seconds
+        self.lag_check_interval = lag_check_interval
+        self._lags: List[Optional[float]] = [0.0] * len(probe_engines)
+        self._cycle = itertools.cycle(range(len(probe_engines)))
+        self._lock = threading.Lock()
+        self._probe_thread: Optional[threading.Thread] = None
+
+    @property
+    def has_replicas(self) -> bool:
+        return len(self.probe_engines) > 0
+
+    def select(self) -> Optional[int]:
+        """Return the index of the replica to read from, or None to use the primary."""
+        if not self.has_replicas:
+            return None
+
+        # Both strategies skip replicas the probe found lagging or unreachable
+        self._ensure_probe_thread()
+        if self.strategy == "least_lag":
+            healthy = [
+                (lag, index) for index, lag in enumerate(self._lags)
+                if lag is not None and lag <= self.max_lag_seconds
+            ]
+            return min(healthy)[1] if healthy else None
+
+        with self._lock:
+            for _ in range(len(self.probe_engines)):
+                index = next(self._cycle)
+                lag = self._lags[index]
+                if lag is not None and lag <= self.max_lag_seconds:
+                    return index
+        return None
+
+    def refresh_lag(self) -> None:
+        """Measure replication lag of every replica."""
+        for index, engine in enumerate(self.probe_engines):
+            try:
+                with engine.connect() as connection:
+                    self._lags[index] = float(connection.execute(REPLICA_LAG_QUERY).scalar())
+            except Exception as e:
+                logger.warning(f"Replica {engine.url.host} lag probe failed: {str(e)}")
+                self._lags[index] = None
+
+    def _ensure_probe_thread(self) -> None:
+        if self._probe_thread is not None and self._probe_thread.is_alive():
+            return
+        with self._lock:
+            if self._probe_thread is None or not self._probe_thread.is_alive():
+                self._probe_thread = threading.Thread(target=self._probe_loop, name="replica-lag-probe", daemon=True)
+                self._probe_thread.start()
+
+    def _probe_loop(self) -> None:
+        while True:
+            self.refresh_lag()
+            time.sleep(self.lag_check_interval)
+
+def is_read_only(clause) -> bool:
+    """Whether a statement can be served by a replica."""
+    return isinstance(clause, Select) and clause._for_update_arg is None
+
+class RoutingSession(Session):
+    """
+    Session that sends reads to replicas and everything else to the primary.
+
+    Flushes, DML and locking reads go to the primary. After the first write the
+    session is pinned to the primary so later reads in the same unit of work see
+    their own writes. Set ``session.info["primary_pinned"] = True`` to force the
+    primary for the whole session.
+
+    A transaction reads from one replica, chosen on its first read and kept
+    until it commits or rolls back, so a request never mixes snapshots of
+    replicas with different lag.
+
+    Engines are resolved on every ``get_bind`` through ``resolve_binds`` so that
+    they can be created lazily and replaced after a fork.
+    """
+
+    resolve_binds: Callable[[], Tuple[Engine, List[Engine], Optional[ReplicaSelector]]] = None
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        primary, replicas, selector = type(self).resolve_binds()
+
+        if selector is None or not selector.has_replicas or self.info.get(PRIMARY_PINNED):
+            return primary
+
+        if self._flushing or not is_read_only(clause):
+            self.info[PRIMARY_PINNED] = True
+            return primary
+
+        if REPLICA_INDEX not in self.info:
+            self.info[REPLICA_INDEX] = selector.select()
+        index = self.info[REPLICA_INDEX]
+        return primary if index is None or index >= len(replicas) else replicas[index]
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _release_replica(session: Session, transaction) -> None:
+    """Let the next transaction choose a replica again."""
+    if transaction.parent is None:
+        session.info.pop(REPLICA_INDEX, None)
+
+def pin_primary(session) -> None:
+    """
+    Send all further statements of a (sync or async) session to the primary.
+
+    Used for reads whose result outlives the request, such as response cache
+    fills, which must not be taken from a lagging replica.
+    """
+    getattr(session, "sync_session", session).info[PRIMARY_PINNED] = True
+
+def session_dialect(session) -> str:
+    """
+    Dialect name of a (sync or async) session's database.
+
+    Read from the routing session's primary engine rather than through
+    ``get_bind()``, which would pin the session to the primary.
+    """
+    session = getattr(session, "sync_session", session)
+    if isinstance(session, RoutingSession):
+        return type(session).resolve_binds()[0].dialect.name
+    return session.get_bind().dialect.name
+
+def routing_session_class(name: str, resolve_binds: Callable) -> type:
+    """Build a RoutingSession subclass resolving its engines through ``resolve_binds``."""
+    return type(name, (RoutingSession,), {"resolve_binds": staticmethod(resolve_binds)})
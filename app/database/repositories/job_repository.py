@@ -1,11 +1,45 @@
+import logging
+import threading
+import time
 from datetime import datetime, UTC
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Sequence
 from uuid import UUID
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, update, func, literal_column
+from sqlalchemy.exc import DBAPIError
+from config.settings import get_settings
 from database.base_repository import BaseRepository
+from database.replica import session_dialect
 from database.models.job import JobDefinition
-from pydantic import BaseModel
+from pydantic import BaseModel, model_validator
+from services.geospatial_utils import geometry_columns
+from utils.spatial_index import GeometryIndex, polygon_ring, ring_wkt
+
+logger = logging.getLogger(__name__)
+
+# Process-wide job geometry index for databases without PostGIS
+_geometry_index: Optional[GeometryIndex] = None
+_geometry_index_built_at = 0.0
+_geometry_index_lock = threading.Lock()
+_postgis_failed = False
+
+# SQLSTATEs meaning the geometry column or PostGIS functions are missing:
+# undefined_column, undefined_function, undefined_object (type geometry)
+POSTGIS_MISSING_SQLSTATES = {"42703", "42883", "42704"}
+
+def _postgis_missing(error: DBAPIError) -> bool:
+    original = error.orig
+    code = getattr(original, "pgcode", None) or getattr(original, "sqlstate", None)
+    return code in POSTGIS_MISSING_SQLSTATES
+
+# Fields the executor reads; changing any of them bumps the definition's version
+EXECUTION_FIELDS = ("job_name", "job_type", "target_function", "payload")
+
+def with_version_bump(values: Dict[str, Any]) -> Dict[str, Any]:
+    """UPDATE values, plus a version increment when they change how the job executes."""
+    if any(field in values for field in EXECUTION_FIELDS):
+        return {**values, "version": JobDefinition.version + 1}
+    return values
 
 class JobDefinitionCreate(BaseModel):
     job_name: str
@@ -18,6 +52,19 @@ class JobDefinitionCreate(BaseModel):
     payload: Dict[str, Any]
     target_function: str
     retry_policy: Optional[Dict[str, Any]] = None
+    bbox_min_lon: Optional[float] = None
+    bbox_min_lat: Optional[float] = None
+    bbox_max_lon: Optional[float] = None
+    bbox_max_lat: Optional[float] = None
+    area_ha: Optional[float] = None
+    vertex_count: Optional[int] = None
+    
+    @model_validator(mode="after")
+    def derive_geometry(self):
+        """Store the payload's geometry metrics alongside it."""
+        for column, value in geometry_columns(self.payload).items():
+            setattr(self, column, value)
+        return self
 
 class JobDefinitionUpdate(BaseModel):
     job_name: Optional[str] = None
@@ -31,10 +78,26 @@ class JobDefinitionUpdate(BaseModel):
     payload: Optional[Dict[str, Any]] = None
     target_function: Optional[str] = None
     retry_policy: Optional[Dict[str, Any]] = None
+    bbox_min_lon: Optional[float] = None
+    bbox_min_lat: Optional[float] = None
+    bbox_max_lon: Optional[float] = None
+    bbox_max_lat: Optional[float] = None
+    area_ha: Optional[float] = None
+    vertex_count: Optional[int] = None
+    
+    @model_validator(mode="after")
+    def derive_geometry(self):
+        """Refresh the geometry metrics when the payload changes."""
+        if "payload" in self.model_fields_set and self.payload is not None:
+            for column, value in geometry_columns(self.payload).items():
+                setattr(self, column, value)
+        return self
 
 class JobDefinitionRepository(BaseRepository[JobDefinition, JobDefinitionCreate, JobDefinitionUpdate]):
     """Repository for job definition operations."""
     
+    deferred_columns = ("payload",)
+    
     def __init__(self, session: Session):
         super().__init__(session, JobDefinition)
     
@@ -81,44 +144,71 @@ class JobDefinitionRepository(BaseRepository[JobDefinition, JobDefinitionCreate,
             .all()
         )
     
+    def update(self, db_obj: JobDefinition, obj_in: JobDefinitionUpdate) -> JobDefinition:
+        """Update a job definition, bumping its version when execution fields change."""
+        if any(field in obj_in.model_fields_set for field in EXECUTION_FIELDS):
+            db_obj.version = JobDefinition.version + 1
+        return super().update(db_obj, obj_in)
+    
+    def get_versions(self, job_ids: List[UUID]) -> Dict[UUID, int]:
+        """Current version of each existing job, in one query."""
+        if not job_ids:
+            return {}
+        rows = (
+            self.session.query(JobDefinition.id, JobDefinition.version)
+            .filter(JobDefinition.id.in_(job_ids))
+            .all()
+        )
+        return dict(rows)
+    
     def update_last_run(self, job_id: UUID, run_time: Optional[datetime] = None) -> bool:
         """Update last run timestamp for a job."""
         if run_time is None:
             run_time = datetime.now(UTC)
         
-        job = self.get(job_id)
-        if job:
-            job.last_run_at = run_time
-            self.session.commit()
-            return True
-        return False
+        return len(self._update_jobs([job_id], last_run_at=run_time)) > 0
+    
+    def update_last_run_many(self, job_ids: List[UUID], run_time: Optional[datetime] = None) -> List[UUID]:
+        """Update last run timestamp for many jobs in one UPDATE. Returns ids of updated jobs."""
+        if run_time is None:
+            run_time = datetime.now(UTC)
+        
+        return self._update_jobs(job_ids, last_run_at=run_time)
     
     def update_next_run(self, job_id: UUID, next_run: datetime) -> bool:
         """Update next run timestamp for a job."""
-        job = self.get(job_id)
-        if job:
-            job.next_run_at = next_run
-            self.session.commit()
-            return True
-        return False
+        return len(self._update_jobs([job_id], next_run_at=next_run)) > 0
     
     def disable_job(self, job_id: UUID) -> bool:
         """Disable a job."""
-        job = self.get(job_id)
-        if job:
-            job.enabled = False
-            self.session.commit()
-            return True
-        return False
+        return len(self._update_jobs([job_id], enabled=False)) > 0
     
     def enable_job(self, job_id: UUID) -> bool:
         """Enable a job."""
-        job = self.get(job_id)
-        if job:
-            job.enabled = True
-            self.session.commit()
-            return True
-        return False
+        return len(self._update_jobs([job_id], enabled=True)) > 0
+    
+    def disable_jobs(self, job_ids: List[UUID]) -> List[UUID]:
+        """Disable many jobs in one UPDATE. Returns ids of updated jobs."""
+        return self._update_jobs(job_ids, enabled=False)
+    
+    def enable_jobs(self, job_ids: List[UUID]) -> List[UUID]:
+        """Enable many jobs in one UPDATE. Returns ids of updated jobs."""
+        return self._update_jobs(job_ids, enabled=True)
+    
+    def _update_jobs(self, job_ids: List[UUID], **values) -> List[UUID]:
+        """Apply an UPDATE ... RETURNING to the given jobs in a single round-trip."""
+        if not job_ids:
+            return []
+        
+        result = self.session.execute(
+            update(JobDefinition)
+            .where(JobDefinition.id.in_(job_ids))
+            .values(**values)
+            .returning(JobDefinition.id)
+        )
+        updated_ids = list(result.scalars().all())
+        self.session.commit()
+        return updated_ids
     
     def search_by_payload(self, search_criteria: Dict[str, Any]) -> List[JobDefinition]:
         """Search jobs by payload content."""
@@ -135,4 +225,69 @@ class JobDefinitionRepository(BaseRepository[JobDefinition, JobDefinitionCreate,
             self.session.query(JobDefinition)
             .filter(JobDefinition.payload.has_key('polygon'))
             .all()
-        )
\ No newline at end of file
+        )
+    
+    def find_intersecting(self, coordinates: Sequence[Sequence[float]]) -> List[JobDefinition]:
+        """
+        Enabled jobs whose geometry intersects the given area ([lon, lat] pairs).
+        
+        On PostGIS this is an ``ST_Intersects`` on the trigger-maintained
+        ``geom`` column, served by its GiST index. Elsewhere (or if the column
+        or PostGIS functions are missing, as on servers without PostGIS where
+        the migration adds no column) an in-process STR-tree over job
+        coordinates is used, rebuilt every ``DB_SPATIAL_INDEX_TTL`` seconds.
+        Other database errors propagate.
+        """
+        ring = polygon_ring(coordinates)
+        if self._use_postgis():
+            try:
+                # A savepoint, so a failure leaves the caller's transaction usable
+                with self.session.begin_nested():
+                    return self._find_intersecting_postgis(ring_wkt(ring))
+            except DBAPIError as e:
+                if not _postgis_missing(e):
+                    raise
+                global _postgis_failed
+                _postgis_failed = True
+                logger.warning(f"PostGIS geometry column or functions missing, using the in-process index: {str(e)}")
+        
+        job_ids = self._geometry_index().query(ring.tolist())
+        return [job for job in self.get_many(job_ids) if job.enabled]
+    
+    def _use_postgis(self) -> bool:
+        return (
+            not _postgis_failed
+            and get_settings().database.enable_postgis
+            and session_dialect(self.session) == "postgresql"
+        )
+    
+    def _find_intersecting_postgis(self, footprint_wkt: str) -> List[JobDefinition]:
+        footprint = func.ST_MakeValid(func.ST_GeomFromText(footprint_wkt, 4326))
+        return (
+            self.session.query(JobDefinition)
+            .filter(
+                JobDefinition.enabled == True,
+                func.ST_Intersects(literal_column("carbonleap.job_definitions.geom"), footprint)
+            )
+            .all()
+        )
+    
+    def _geometry_index(self) -> GeometryIndex:
+        """The process-wide geometry index of enabled jobs, reloaded once stale."""
+        global _geometry_index, _geometry_index_built_at
+        ttl = get_settings().database.spatial_index_ttl
+        with _geometry_index_lock:
+            if _geometry_index is None or time.monotonic() - _geometry_index_built_at > ttl:
+                started = time.perf_counter()
+                rows = (
+                    self.session.query(JobDefinition.id, JobDefinition.payload)
+                    .filter(JobDefinition.enabled == True)
+                    .all()
+                )
+                _geometry_index = GeometryIndex(
+                    [job_id for job_id, _ in rows],
+                    [(payload or {}).get("coordinates") for _, payload in rows]
+                )
+                _geometry_index_built_at = time.monotonic()
+                logger.info(f"Built job geometry index of {len(_geometry_index)} jobs in {(time.perf_counter() - started) * 1000:.1f} ms")
+            return _geometry_index
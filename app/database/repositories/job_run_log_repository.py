@@ -0,0 +1,179 @@
+import time
+from datetime import datetime, UTC
+from typing import List, Optional, Dict, Any
+from uuid import UUID
+from sqlalchemy.orm import Session
+from sqlalchemy import insert, func
+from database.base_repository import BaseRepository
+from database.models.job import JobRunLog
+from pydantic import BaseModel
+
+class JobRunLogCreate(BaseModel):
+    run_id: UUID
+    level: str = "info"
+    message: Optional[str] = None
+    details: Optional[Dict[str, Any]] = None
+    created_at: Optional[datetime] = None
+
+def build_log_row(run_id: UUID, log_entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Split a free-form log entry into job_run_logs columns."""
+    entry = dict(log_entry)
+    level = entry.pop("level", "info")
+    message = entry.pop("message", None) or entry.pop("info", None) or entry.pop("error", None)
+    created_at = entry.pop("timestamp", None)
+    if isinstance(created_at, str):
+        created_at = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
+
+    return {
+        "run_id": run_id,
+        "level": level,
+        "message": message,
+        "details": entry or None,
+        "created_at": (created_at or datetime.now(UTC)).replace(tzinfo=None)
+    }
+
+class JobRunLogRepository(BaseRepository[JobRunLog, JobRunLogCreate, JobRunLogCreate]):
+    """Repository for append-only job run log lines."""
+
+    def __init__(self, session: Session):
+        super().__init__(session, JobRunLog)
+
+    def add_entry(self, run_id: UUID, log_entry: Dict[str, Any], commit: bool = True) -> None:
+        """Append a single log line with one INSERT."""
+        self.add_entries(run_id, [log_entry], commit=commit)
+
+    def add_entries(self, run_id: UUID, log_entries: List[Dict[str, Any]], commit: bool = True) -> int:
+        """Append many log lines for a run in one multi-row INSERT. Returns count of inserted lines."""
+        if not log_entries:
+            return 0
+
+        rows = [build_log_row(run_id, entry) for entry in log_entries]
+        self.session.execute(insert(JobRunLog), rows)
+        if commit:
+            self.session.commit()
+        return len(rows)
+
+    def add_entries_for_runs(self, log_entries: Dict[UUID, List[Dict[str, Any]]], commit: bool = True) -> int:
+        """Append log lines of many runs in one multi-row INSERT. Returns count of inserted lines."""
+        rows = [build_log_row(run_id, entry) for run_id, entries in log_entries.items() for entry in entries]
+        if not rows:
+            return 0
+
+        self.session.execute(insert(JobRunLog), rows)
+        if commit:
+            self.session.commit()
+        return len(rows)
+
+    def get_logs_by_run(self, run_id: UUID, after_id: Optional[int] = None, limit: int = 100) -> List[JobRunLog]:
+        """Get log lines for a run in emission order, paginated by the last seen id."""
+        query = self.session.query(JobRunLog).filter(JobRunLog.run_id == run_id)
+        if after_id is not None:
+            query = query.filter(JobRunLog.id > after_id)
+        return query.order_by(JobRunLog.id).limit(limit).all()
+
+    def count_by_run(self, run_id: UUID) -> int:
+        """Count log lines recorded for a run."""
+        return (
+            self.session.query(func.count(JobRunLog.id))
+            .filter(JobRunLog.run_id == run_id)
+            .scalar()
+        )
+
+class JobRunLogBuffer:
+    """
+    Buffers log lines for a single job run and writes them in batches.
+
+    Workers call ``log()`` on the hot path; lines are flushed with one multi-row
+    INSERT once ``max_entries`` are pending or ``flush_interval`` seconds have
+    passed, and on ``close()`` / context exit.
+    """
+
+    def __init__(
+        self,
+        repository: JobRunLogRepository,
+        run_id: UUID,
+        max_entries: int = 50,
+        flush_interval: float = 5.0
+    ):
+        self.repository = repository
+        self.run_id = run_id
+        self.max_entries = max_entries
+        self.flush_interval = flush_interval
+        self._pending: List[Dict[str, Any]] = []
+        self._last_flush = time.monotonic()
+
+    def log(self, message: str, level: str = "info", **details) -> None:
+        """Queue a log line, flushing if the buffer is full or stale."""
+        self._pending.append({
+            "level": level,
+            "message": message,
+            "timestamp": datetime.now(UTC).isoformat(),
+            **details
+        })
+
+        if len(self._pending) >= self.max_entries or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self) -> int:
+        """Write all pending lines. Returns count of written lines."""
+        if not self._pending:
+            return 0
+
+        pending, self._pending = self._pending, []
+        self._last_flush = time.monotonic()
+        return self.repository.add_entries(self.run_id, pending)
+
+    def close(self) -> None:
+        """Flush remaining lines."""
+        self.flush()
+
+    def __enter__(self) -> "JobRunLogBuffer":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+class MultiRunLogBuffer:
+    """
+    Buffers log lines of the runs of a job batch and writes them together.
+
+    ``for_run()`` returns a per-run logger with the ``JobRunLogBuffer.log``
+    interface; pending lines of every run go out in one multi-row INSERT on
+    ``flush()`` and on context exit.
+    """
+
+    def __init__(self, repository: JobRunLogRepository):
+        self.repository = repository
+        self._pending: Dict[UUID, List[Dict[str, Any]]] = {}
+
+    def for_run(self, run_id: UUID) -> "RunLog":
+        return RunLog(self, run_id)
+
+    def log(self, run_id: UUID, message: str, level: str = "info", **details) -> None:
+        self._pending.setdefault(run_id, []).append({
+            "level": level,
+            "message": message,
+            "timestamp": datetime.now(UTC).isoformat(),
+            **details
+        })
+
+    def flush(self) -> int:
+        """Write all pending lines. Returns count of written lines."""
+        pending, self._pending = self._pending, {}
+        return self.repository.add_entries_for_runs(pending)
+
+    def __enter__(self) -> "MultiRunLogBuffer":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.flush()
+
+class RunLog:
+    """Log lines of one run, queued on a ``MultiRunLogBuffer``."""
+
+    def __init__(self, buffer: MultiRunLogBuffer, run_id: UUID):
+        self.buffer = buffer
+        self.run_id = run_id
+
+    def log(self, message: str, level: str = "info", **details) -> None:
+        self.buffer.log(self.run_id, message, level, **details)
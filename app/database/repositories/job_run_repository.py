@@ -1,10 +1,12 @@
 from datetime import datetime, timedelta, UTC
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from uuid import UUID
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, desc, func
+from sqlalchemy import and_, bindparam, desc, func, update
+from sqlalchemy.exc import IntegrityError
 from database.base_repository import BaseRepository
-from database.models.job import JobRun
+from database.models.job import JobDefinition, JobRun
+from database.repositories.job_run_log_repository import JobRunLogRepository
 from pydantic import BaseModel
 
 class JobRunCreate(BaseModel):
@@ -24,6 +26,9 @@ class JobRunUpdate(BaseModel):
 class JobRunRepository(BaseRepository[JobRun, JobRunCreate, JobRunUpdate]):
     """Repository for job run operations."""
     
+    # Logs and outputs are only loaded when a caller touches them
+    deferred_columns = ("log_message", "output_summary")
+    
     def __init__(self, session: Session):
         super().__init__(session, JobRun)
     
@@ -31,6 +36,7 @@ class JobRunRepository(BaseRepository[JobRun, JobRunCreate, JobRunUpdate]):
         """Get all runs for a specific job."""
         return (
             self.session.query(JobRun)
+            .options(*self.projection_options())
             .filter(JobRun.job_id == job_id)
             .order_by(desc(JobRun.start_time))
             .limit(limit)
@@ -41,6 +47,7 @@ class JobRunRepository(BaseRepository[JobRun, JobRunCreate, JobRunUpdate]):
         """Get all currently running jobs."""
         return (
             self.session.query(JobRun)
+            .options(*self.projection_options())
             .filter(JobRun.status == "running")
             .all()
         )
@@ -50,6 +57,7 @@ class JobRunRepository(BaseRepository[JobRun, JobRunCreate, JobRunUpdate]):
         cutoff_time = datetime.now(UTC) - timedelta(hours=hours)
         return (
             self.session.query(JobRun)
+            .options(*self.projection_options())
             .filter(
                 and_(
                     JobRun.status == "failed",
@@ -65,6 +73,7 @@ class JobRunRepository(BaseRepository[JobRun, JobRunCreate, JobRunUpdate]):
         cutoff_time = datetime.now(UTC) - timedelta(hours=hours)
         return (
             self.session.query(JobRun)
+            .options(*self.projection_options())
             .filter(
                 and_(
                     JobRun.status == "success",
@@ -79,6 +88,7 @@ class JobRunRepository(BaseRepository[JobRun, JobRunCreate, JobRunUpdate]):
         """Get runs by status."""
         return (
             self.session.query(JobRun)
+            .options(*self.projection_options())
             .filter(JobRun.status == status)
             .order_by(desc(JobRun.start_time))
             .limit(limit)
@@ -89,49 +99,181 @@ class JobRunRepository(BaseRepository[JobRun, JobRunCreate, JobRunUpdate]):
         """Get runs by trigger type."""
         return (
             self.session.query(JobRun)
+            .options(*self.projection_options())
             .filter(JobRun.triggered_by == triggered_by)
             .order_by(desc(JobRun.start_time))
             .limit(limit)
             .all()
         )
     
-    def mark_as_completed(self, run_id: UUID, status: str, output_summary: Optional[Dict[str, Any]] = None) -> bool:
-        """Mark a job run as completed with status and output."""
-        job_run = self.get(run_id)
-        if job_run:
-            job_run.status = status
-            job_run.end_time = datetime.now(UTC)
-            if output_summary:
-                job_run.output_summary = output_summary
-            self.session.commit()
-            return True
-        return False
-    
-    def mark_as_failed(self, run_id: UUID, error_message: str) -> bool:
-        """Mark a job run as failed with error message."""
-        job_run = self.get(run_id)
-        if job_run:
-            job_run.status = "failed"
-            job_run.end_time = datetime.now(UTC)
-            job_run.log_message = {"error": error_message, "timestamp": datetime.now(UTC).isoformat()}
+    def mark_as_completed(
+        self,
+        run_id: UUID,
+        status: str,
+        output_summary: Optional[Dict[str, Any]] = None,
+        expected_status: Optional[str] = "running",
+        log_message: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """
+        Mark a job run as completed with status and output in a single UPDATE.
+        
+        Only runs currently in ``expected_status`` are transitioned, so a late
+        retry cannot overwrite a terminal state. Pass ``None`` to skip the guard.
+        """
+        values = {"status": status, "end_time": datetime.now(UTC)}
+        if output_summary:
+            values["output_summary"] = output_summary
+        if log_message:
+            values["log_message"] = log_message
+        
+        return len(self._transition([run_id], values, expected_status)) > 0
+    
+    def mark_as_failed(self, run_id: UUID, error_message: str, expected_status: Optional[str] = "running") -> bool:
+        """Mark a job run as failed with error message in a single UPDATE."""
+        values = {
+            "status": "failed",
+            "end_time": datetime.now(UTC),
+            "log_message": {"error": error_message, "timestamp": datetime.now(UTC).isoformat()}
+        }
+        return len(self._transition([run_id], values, expected_status)) > 0
+    
+    def mark_many_completed(
+        self,
+        run_ids: List[UUID],
+        status: str = "success",
+        output_summary: Optional[Dict[str, Any]] = None,
+        expected_status: Optional[str] = "running"
+    ) -> List[UUID]:
+        """Mark many job runs as completed in one UPDATE. Returns ids of transitioned runs."""
+        values = {"status": status, "end_time": datetime.now(UTC)}
+        if output_summary:
+            values["output_summary"] = output_summary
+        
+        return self._transition(run_ids, values, expected_status)
+    
+    def mark_many_failed(
+        self,
+        run_ids: List[UUID],
+        error_message: str,
+        expected_status: Optional[str] = "running"
+    ) -> List[UUID]:
+        """Mark many job runs as failed in one UPDATE. Returns ids of transitioned runs."""
+        values = {
+            "status": "failed",
+            "end_time": datetime.now(UTC),
+            "log_message": {"error": error_message, "timestamp": datetime.now(UTC).isoformat()}
+        }
+        return self._transition(run_ids, values, expected_status)
+    
+    def get_for_execution(
+        self,
+        run_id: UUID,
+        job_id: UUID,
+        with_definition: bool = True
+    ) -> Optional[Tuple[str, int, Optional[JobDefinition]]]:
+        """
+        A run's status with its job's version and, if asked, the job definition,
+        in one joined query. None when the run does not exist for that job.
+        """
+        columns = [JobRun.status, JobDefinition.version]
+        if with_definition:
+            columns.append(JobDefinition)
+        row = (
+            self.session.query(*columns)
+            .join(JobDefinition, JobRun.job_id == JobDefinition.id)
+            .filter(JobRun.id == run_id, JobRun.job_id == job_id)
+            .first()
+        )
+        if row is None:
+            return None
+        return (row[0], row[1], row[2] if with_definition else None)
+    
+    def complete_runs(
+        self,
+        results: List[Dict[str, Any]],
+        job_ids: List[UUID],
+        expected_status: Optional[str] = "running",
+        run_time: Optional[datetime] = None
+    ) -> int:
+        """
+        Record runs' outcomes (see ``finish_many``) and their jobs' ``last_run_at``
+        in one transaction. Returns the number of updated runs.
+        """
+        updated = self.finish_many(results, expected_status, commit=False)
+        if job_ids:
+            self.session.execute(
+                update(JobDefinition)
+                .where(JobDefinition.id.in_(job_ids))
+                .values(last_run_at=run_time or datetime.now(UTC))
+            )
+        self.session.commit()
+        return updated
+    
+    def finish_many(self, results: List[Dict[str, Any]], expected_status: Optional[str] = "running", commit: bool = True) -> int:
+        """
+        Record a different outcome for each of many runs in one executemany UPDATE.
+        
+        Each result holds the run ``id``, its ``status`` and optionally
+        ``output_summary`` and ``log_message``. Runs no longer in
+        ``expected_status`` are left untouched. Returns the number of updated runs.
+        """
+        if not results:
+            return 0
+        
+        table = JobRun.__table__
+        end_time = datetime.now(UTC)
+        # One executemany per set of columns being written (e.g. failures have no output)
+        groups: Dict[tuple, List[Dict[str, Any]]] = {}
+        for result in results:
+            groups.setdefault(tuple(sorted(key for key in result if key != "id")), []).append(result)
+        
+        updated = 0
+        for columns, rows in groups.items():
+            statement = update(table).where(table.c.id == bindparam("run_id"))
+            if expected_status is not None:
+                statement = statement.where(table.c.status == expected_status)
+            statement = statement.values(end_time=end_time, **{column: bindparam(f"new_{column}") for column in columns})
+            params = [
+                {"run_id": row["id"], **{f"new_{column}": row[column] for column in columns}}
+                for row in rows
+            ]
+            updated += self.session.execute(statement, params).rowcount
+        if commit:
             self.session.commit()
-            return True
-        return False
+        return updated
+    
+    def _transition(self, run_ids: List[UUID], values: Dict[str, Any], expected_status: Optional[str]) -> List[UUID]:
+        """Apply an UPDATE ... RETURNING to the given runs, optionally guarded on current status."""
+        if not run_ids:
+            return []
+        
+        conditions = [JobRun.id.in_(run_ids)]
+        if expected_status is not None:
+            conditions.append(JobRun.status == expected_status)
+        
+        result = self.session.execute(
+            update(JobRun)
+            .where(and_(*conditions))
+            .values(**values)
+            .returning(JobRun.id)
+        )
+        updated_ids = list(result.scalars().all())
+        self.session.commit()
+        return updated_ids
     
     def add_log_entry(self, run_id: UUID, log_entry: Dict[str, Any]) -> bool:
-        """Add a log entry to an existing job run."""
-        job_run = self.get(run_id)
-        if job_run:
-            if job_run.log_message is None:
-                job_run.log_message = {"logs": []}
-            elif "logs" not in job_run.log_message:
-                job_run.log_message["logs"] = []
-            
-            log_entry["timestamp"] = datetime.now(UTC).isoformat()
-            job_run.log_message["logs"].append(log_entry)
-            self.session.commit()
-            return True
-        return False
+        """Append a log entry to an existing job run as a single job_run_logs INSERT."""
+        try:
+            JobRunLogRepository(self.session).add_entry(run_id, log_entry)
+        except IntegrityError:
+            # Foreign key violation: the run does not exist
+            self.session.rollback()
+            return False
+        return True
+    
+    def add_log_entries(self, run_id: UUID, log_entries: List[Dict[str, Any]]) -> int:
+        """Append many log entries to a job run in one INSERT. Returns count of written entries."""
+        return JobRunLogRepository(self.session).add_entries(run_id, log_entries)
     
     def get_execution_stats(self, hours: int = 24) -> Dict[str, Any]:
         """Get execution statistics for the specified time period."""
@@ -169,6 +311,7 @@ class JobRunRepository(BaseRepository[JobRun, JobRunCreate, JobRunUpdate]):
         """Get the longest running jobs that are still in progress."""
         return (
             self.session.query(JobRun)
+            .options(*self.projection_options())
             .filter(JobRun.status == "running")
             .order_by(JobRun.start_time)
             .limit(limit)
@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
 from database.repositories.job_repository import JobDefinitionRepository
 from database.repositories.job_run_repository import JobRunRepository
+from database.repositories.job_run_log_repository import JobRunLogRepository
 # from database.repositories.satellite_data_repository import SatelliteDataRepository
 # from database.repositories.anomaly_repository import AnomalyRepository
 # from database.repositories.alert_repository import AlertRepository
@@ -12,6 +13,7 @@ class RepositoryFactory:
         self.session = session
         self._job_definition_repo = None
         self._job_run_repo = None
+        self._job_run_log_repo = None
         self._satellite_data_repo = None
         self._anomaly_repo = None
         self._alert_repo = None
@@ -30,6 +32,13 @@ class RepositoryFactory:
             self._job_run_repo = JobRunRepository(self.session)
         return self._job_run_repo
     
+    @property
+    def job_run_log(self) -> JobRunLogRepository:
+        """Get JobRunLogRepository instance."""
+        if self._job_run_log_repo is None:
+            self._job_run_log_repo = JobRunLogRepository(self.session)
+        return self._job_run_log_repo
+    
     # @property
     # def satellite_data(self) -> SatelliteDataRepository:
     #     """Get SatelliteDataRepository instance."""
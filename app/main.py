@@ -1,6 +1,10 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response
+import os
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, generate_latest, multiprocess
 from api import api_router
+from api.middleware import AdmissionControlMiddleware, CompressionMiddleware, TracingMiddleware
 from config.settings import get_settings
 
 settings = get_settings()
@@ -11,18 +15,29 @@ app = FastAPI(
     description="Event-driven geospatial data processing service with satellite analytics",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse
 )
 
-# Add CORS middleware
+# Add admission control (rate limits, concurrency caps, load shedding)
+app.add_middleware(AdmissionControlMiddleware, config=settings.admission, trusted_proxies=settings.api_trusted_proxies)
+
+# Add response compression (Brotli or gzip) for large JSON bodies
+app.add_middleware(CompressionMiddleware, config=settings.compression)
+
+# Add CORS middleware (added last so it also wraps rejected requests)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # Configure appropriately for production
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID", "Server-Timing"],
 )
 
+# Add request tracing outermost so rejected and CORS requests are measured too
+app.add_middleware(TracingMiddleware, config=settings.tracing)
+
 # Include API router
 app.include_router(api_router)
 
@@ -38,11 +53,22 @@ async def root():
         "api": "/api/v1"
     }
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics, including database pool telemetry."""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        # Under gunicorn: aggregate every worker's metrics, not just the one answering
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
         "main:app",
         host=settings.api_host,
         port=settings.api_port,
-        reload=settings.debug
+        # Development only; production serves through server.py
+        reload=settings.debug and settings.environment == "development"
     )
\ No newline at end of file
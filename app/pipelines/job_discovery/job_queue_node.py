@@ -1,11 +1,12 @@
 import logging
 from datetime import datetime, UTC
-from typing import Dict
+from typing import Dict, List
 from uuid import UUID
 from config.celery_config import celery_app
 from database import SessionLocal, RepositoryFactory
 from database.repositories.job_run_repository import JobRunCreate
 from core.base import BaseNode
+from utils.cache import get_response_cache, JOBS_TAG, job_tag, job_runs_tag
 from core.schema import PipelineContext
 
 logger = logging.getLogger(__name__)
@@ -26,12 +27,20 @@ class JobQueueNode(BaseNode):
         with SessionLocal() as session:
             repo_factory = RepositoryFactory(session)
             
+            queued_job_ids = []
+            
             # Process each routing queue
             for queue_name, jobs in context.routed_jobs.items():
                 if queue_name == "failed_routing":
                     continue  # Skip failed routing jobs
                 
+                # Batched jobs go out as one task per batch
+                batches: Dict[str, List[Dict]] = {}
                 for job in jobs:
+                    batch_id = job.get("routing_metadata", {}).get("batch_id")
+                    if batch_id:
+                        batches.setdefault(batch_id, []).append(job)
+                        continue
                     try:
                         # Create job run record
                         job_run = self._create_job_run(repo_factory, job, context)
@@ -62,9 +71,7 @@ class JobQueueNode(BaseNode):
                         queuing_stats["queue_distribution"][actual_queue] += 1
                         
                         queuing_stats["total_queued"] += 1
-                        
-                        # Update job definition last run time
-                        repo_factory.job_definition.update_last_run(UUID(job["job_id"]))
+                        queued_job_ids.append(UUID(job["job_id"]))
                         
                         logger.info(f"Queued job {job['job_name']} to queue '{actual_queue}' with task_id: {task_result.id}")
                         
@@ -77,6 +84,54 @@ class JobQueueNode(BaseNode):
                         if "failed_routing" not in context.routed_jobs:
                             context.routed_jobs["failed_routing"] = []
                         context.routed_jobs["failed_routing"].append(job)
+                
+                for batch_id, batch_jobs in batches.items():
+                    try:
+                        # Create all job run records of the batch in one transaction
+                        run_ids = self._create_job_runs(repo_factory, batch_jobs, context)
+                        task_result = self._queue_batch_to_celery(batch_id, batch_jobs, run_ids)
+                        actual_queue = batch_jobs[0]["routing_metadata"]["celery_queue"]
+                        queued_at = datetime.now(UTC).isoformat()
+                        
+                        for job, run_id in zip(batch_jobs, run_ids):
+                            job["job_run_id"] = str(run_id)
+                            job["task_id"] = task_result.id
+                            job["queued_at"] = queued_at
+                            queuing_stats["queuing_details"].append({
+                                "job_id": job["job_id"],
+                                "job_name": job["job_name"],
+                                "job_run_id": str(run_id),
+                                "task_id": task_result.id,
+                                "batch_id": batch_id,
+                                "queue": queue_name,
+                                "celery_queue": actual_queue
+                            })
+                            queued_job_ids.append(UUID(job["job_id"]))
+                        
+                        queuing_stats["queue_distribution"][actual_queue] = (
+                            queuing_stats["queue_distribution"].get(actual_queue, 0) + len(batch_jobs)
+                        )
+                        queuing_stats["total_queued"] += len(batch_jobs)
+                        
+                        logger.info(f"Queued batch {batch_id} of {len(batch_jobs)} jobs to queue '{actual_queue}' with task_id: {task_result.id}")
+                        
+                    except Exception as e:
+                        logger.error(f"Failed to queue batch {batch_id}: {str(e)}")
+                        queuing_stats["failed_to_queue"] += len(batch_jobs)
+                        context.errors.append(f"Queue error for batch {batch_id} of {len(batch_jobs)} jobs: {str(e)}")
+                        
+                        if "failed_routing" not in context.routed_jobs:
+                            context.routed_jobs["failed_routing"] = []
+                        context.routed_jobs["failed_routing"].extend(batch_jobs)
+            
+            # Update last run time of all queued job definitions in one statement
+            repo_factory.job_definition.update_last_run_many(queued_job_ids)
+            if queued_job_ids:
+                get_response_cache().invalidate_sync(
+                    JOBS_TAG,
+                    *[job_tag(job_id) for job_id in queued_job_ids],
+                    *[job_runs_tag(job_id) for job_id in queued_job_ids]
+                )
         
         context.execution_stats.update({
             "queuing_stats": queuing_stats,
@@ -99,6 +154,36 @@ class JobQueueNode(BaseNode):
         
         return repo_factory.job_run.create(job_run_data)
     
+    def _create_job_runs(self, repo_factory: RepositoryFactory, jobs: List[Dict], context: PipelineContext) -> List[UUID]:
+        """Create the job run records of a batch in one transaction; returns their ids"""
+        
+        execution_host = context.trigger_metadata.get("execution_host", "job-discovery-pipeline")
+        return repo_factory.job_run.create_many([
+            JobRunCreate(job_id=UUID(job["job_id"]), triggered_by=context.trigger_type.value, execution_host=execution_host)
+            for job in jobs
+        ])
+    
+    def _queue_batch_to_celery(self, batch_id: str, jobs: List[Dict], run_ids: List[UUID]):
+        """Queue one task processing every job of a batch"""
+        
+        celery_queue = jobs[0].get("routing_metadata", {}).get("celery_queue", "geospatial")
+        task_payload = {
+            "batch_id": batch_id,
+            "jobs": [
+                {"job_id": job["job_id"], "run_id": str(run_id), "override_payload": None}
+                for job, run_id in zip(jobs, run_ids)
+            ]
+        }
+        
+        logger.info(f"Sending batch task to queue: {celery_queue}")
+        return celery_app.send_task(
+            "tasks.job_processor.process_geospatial_job_batch",
+            args=[task_payload],
+            queue=celery_queue,
+            exchange=celery_queue,
+            retry=True
+        )
+    
     def _queue_to_celery(self, job: Dict, job_run):
         """Queue job to Celery with explicit queue and routing configuration"""
         
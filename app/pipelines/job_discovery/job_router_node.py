@@ -1,7 +1,12 @@
 import logging
-from typing import Dict, List, Type
+import math
+import uuid
+from typing import Dict, List, Optional, Tuple, Type
+from config.settings import get_settings
 from core.base import RouterNode, BaseNode
 from core.schema import PipelineContext
+from services.job_executor import batch_key, job_celery_queue
+from services.geospatial_utils import geometry_columns
 
 logger = logging.getLogger(__name__)
 
@@ -55,6 +60,8 @@ class JobRouterNode(RouterNode):
                 context.routed_jobs["failed_routing"].append(job)
                 context.errors.append(f"Routing error for {job['job_name']}: {str(e)}")
         
+        routing_stats["batching"] = self._assign_batches(context)
+        
         context.execution_stats.update({
             "routing_stats": routing_stats,
             "queue_distribution": {
@@ -74,6 +81,71 @@ class JobRouterNode(RouterNode):
         # Always proceed to queue jobs and collect stats
         return [JobQueueNode, JobStatsNode]
     
+    def _assign_batches(self, context: PipelineContext) -> Dict:
+        """
+        Group compatible jobs of each queue into batches run by one task.
+        
+        Jobs are compatible when they share a ``batch_key`` (handler, satellite,
+        date range, ...) and a Celery queue, and their centroids fall in the
+        same grid cell, so the batch's shared imagery stays small. Batched jobs
+        get ``batch_id`` and ``batch_size`` in their routing metadata.
+        """
+        config = get_settings().job_batch
+        stats = {"batches": 0, "batched_jobs": 0}
+        if not config.enabled:
+            return stats
+        
+        for queue_name, jobs in context.routed_jobs.items():
+            if queue_name == "failed_routing":
+                continue
+            
+            groups: Dict[Tuple, List[Dict]] = {}
+            for job in jobs:
+                key = self._batch_group(job, config.cell_degrees)
+                if key is not None:
+                    groups.setdefault(key, []).append(job)
+            
+            for group in groups.values():
+                for start in range(0, len(group), config.max_size):
+                    chunk = group[start:start + config.max_size]
+                    if len(chunk) < config.min_size:
+                        continue
+                    batch_id = f"batch-{uuid.uuid4().hex[:12]}"
+                    for job in chunk:
+                        job["routing_metadata"]["batch_id"] = batch_id
+                        job["routing_metadata"]["batch_size"] = len(chunk)
+                    stats["batches"] += 1
+                    stats["batched_jobs"] += len(chunk)
+        
+        if stats["batches"]:
+            logger.info(f"JobRouter: Grouped {stats['batched_jobs']} jobs into {stats['batches']} batches")
+        return stats
+    
+    def _batch_group(self, job: Dict, cell_degrees: float) -> Optional[Tuple]:
+        """Batching group of a job, or None if it runs on its own."""
+        payload = job.get("payload") or {}
+        key = batch_key(job.get("target_function"), job.get("job_type"), payload)
+        if key is None:
+            return None
+        bbox = self._job_geometry(job)["bbox"]
+        if bbox is None:
+            return None
+        min_lon, min_lat, max_lon, max_lat = bbox
+        cell = (math.floor((min_lon + max_lon) / 2 / cell_degrees), math.floor((min_lat + max_lat) / 2 / cell_degrees))
+        return (key, job["routing_metadata"]["celery_queue"], cell)
+    
+    def _job_geometry(self, job: Dict) -> Dict:
+        """Stored bbox, area and vertex count of a job, derived from its payload when not stored yet."""
+        if job.get("area_ha") is None:
+            columns = geometry_columns(job.get("payload"))
+            job["bbox"] = (
+                [columns["bbox_min_lon"], columns["bbox_min_lat"], columns["bbox_max_lon"], columns["bbox_max_lat"]]
+                if columns["bbox_min_lon"] is not None else None
+            )
+            job["area_ha"] = columns["area_ha"]
+            job["vertex_count"] = columns["vertex_count"]
+        return job
+    
     def _route_job(self, job: Dict) -> Dict:
         """Route individual job to appropriate queue"""
         
@@ -96,7 +168,7 @@ class JobRouterNode(RouterNode):
         estimated_duration = self._estimate_duration(job)
         
         # Determine Celery queue
-        celery_queue = self._get_celery_queue(job_type)
+        celery_queue = self._get_celery_queue(job)
         
         return {
             "queue": queue,
@@ -153,9 +225,9 @@ class JobRouterNode(RouterNode):
         
         base_duration = base_durations.get(job_type, 10)
         
-        # Adjust based on payload complexity
-        coordinates_count = len(payload.get("coordinates", []))
-        complexity_multiplier = 1 + (coordinates_count / 100)  # More coordinates = longer processing
+        # Adjust based on area (pixels to process) and outline complexity
+        geometry = self._job_geometry(job)
+        complexity_multiplier = 1 + (geometry["area_ha"] or 0) / 5000 + (geometry["vertex_count"] or 0) / 100
         
         # Adjust based on satellite type
         satellite_multipliers = {
@@ -169,18 +241,10 @@ class JobRouterNode(RouterNode):
         
         return max(estimated_duration, 1)  # Minimum 1 minute
     
-    def _get_celery_queue(self, job_type: str) -> str:
-        """Get Celery queue name for job type"""
-        
-        queue_mapping = {
-            "anomaly_detection": "geospatial",
-            "change_analysis": "geospatial", 
-            "monitoring": "monitoring",
-            "fetch_data": "geospatial",
-            "metric_calc": "geospatial"
-        }
+    def _get_celery_queue(self, job: Dict) -> str:
+        """Get Celery queue name: the worker profile suited to the job's handler"""
         
-        return queue_mapping.get(job_type, "geospatial")
+        return job_celery_queue(job.get("target_function"), job.get("job_type"))
     
     def _get_retry_config(self, job: Dict) -> Dict:
         """Get retry configuration for job"""
@@ -25,7 +25,7 @@ class JobScannerNode(BaseNode):
                 elif context.trigger_type == TriggerType.API:
                     # API-triggered: get jobs based on API parameters
                     job_filters = context.trigger_metadata.get("filters", {})
-                    eligible_jobs = repo_factory.job_definition.get_multi(filters=job_filters)
+                    eligible_jobs = repo_factory.job_definition.get_multi(filters=job_filters, include_deferred=True)
                     context.execution_stats["scan_method"] = "api_filtered"
                     
                 elif context.trigger_type == TriggerType.MANUAL:
@@ -60,7 +60,14 @@ class JobScannerNode(BaseNode):
                         "next_run_at": job.next_run_at.isoformat() if job.next_run_at else None,
                         "payload": job.payload,
                         "target_function": job.target_function,
-                        "retry_policy": job.retry_policy or {}
+                        "retry_policy": job.retry_policy or {},
+                        # Precomputed on write, so routing never re-walks coordinates
+                        "bbox": (
+                            [job.bbox_min_lon, job.bbox_min_lat, job.bbox_max_lon, job.bbox_max_lat]
+                            if job.bbox_min_lon is not None else None
+                        ),
+                        "area_ha": job.area_ha,
+                        "vertex_count": job.vertex_count
                     }
                     for job in eligible_jobs
                 ]
@@ -94,10 +101,24 @@ class JobScannerNode(BaseNode):
             return repo_factory.job_definition.get_by_job_type("monitoring")
             
         elif event_type == "polygon_updated":
-            # Get jobs with specific polygon data
+            # Get jobs with specific polygon data, or intersecting the updated area
             polygon_id = event_criteria.get("polygon_id")
             if polygon_id:
                 return repo_factory.job_definition.search_by_payload({"polygon_id": polygon_id})
+            if event_criteria.get("coordinates"):
+                return repo_factory.job_definition.find_intersecting(event_criteria["coordinates"])
+            
+        elif event_type == "scene_available":
+            # Get jobs whose area the new scene covers, optionally only for its satellite
+            footprint = event_criteria.get("footprint")
+            if not footprint:
+                logger.warning("scene_available event without a footprint; no jobs selected")
+                return []
+            jobs = repo_factory.job_definition.find_intersecting(footprint)
+            satellite_type = event_criteria.get("satellite_type")
+            if satellite_type:
+                jobs = [job for job in jobs if (job.payload or {}).get("satellite_type") == satellite_type]
+            return jobs
             
         # Default: return all enabled jobs
         return repo_factory.job_definition.get_enabled_jobs()
\ No newline at end of file
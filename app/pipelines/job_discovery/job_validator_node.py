@@ -3,6 +3,7 @@ from datetime import datetime, timedelta, UTC
 from typing import Dict, Any, List
 from core.base import BaseNode
 from core.schema import PipelineContext
+from utils.validators import validate_coordinates
 
 logger = logging.getLogger(__name__)
 
@@ -91,9 +92,10 @@ class JobValidatorNode(BaseNode):
                 return False
         
         # Validate coordinates
-        coordinates = payload.get("coordinates")
-        if not isinstance(coordinates, list) or len(coordinates) == 0:
-            logger.warning("Invalid coordinates format")
+        try:
+            validate_coordinates(payload.get("coordinates"))
+        except ValueError as e:
+            logger.warning(f"Invalid coordinates: {str(e)}")
             return False
         
         # Validate satellite type
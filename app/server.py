@@ -0,0 +1,100 @@
+"""
+Production API server.
+
+Runs the FastAPI app under gunicorn with one uvicorn worker per CPU core:
+
+    cd app && python server.py
+
+The app is imported once in the master (``preload_app``) so workers share its
+modules copy-on-write; database engines and Redis clients are created lazily in
+each worker. On SIGTERM workers stop accepting connections and get
+``API_GRACEFUL_TIMEOUT`` seconds to finish in-flight requests such as pipeline
+runs. Use ``python main.py`` (single process, reload in development) locally.
+
+Prometheus runs in multiprocess mode: workers write their metrics to
+``PROMETHEUS_MULTIPROC_DIR`` (a fresh temporary directory unless set) and
+``/metrics`` aggregates all of them, whichever worker answers the scrape.
+Proxy headers are trusted only from ``API_TRUSTED_PROXIES``.
+"""
+import glob
+import os
+import tempfile
+from typing import Any, Dict
+from gunicorn.app.base import BaseApplication
+from uvicorn_worker import UvicornWorker
+from config.settings import get_settings
+
+class ProductionUvicornWorker(UvicornWorker):
+    """Uvicorn worker pinned to the uvloop event loop and httptools parser."""
+
+    CONFIG_KWARGS = {"loop": "uvloop", "http": "httptools"}
+
+def default_workers() -> int:
+    """One worker per CPU core available to this process."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+def gunicorn_options() -> Dict[str, Any]:
+    """Gunicorn settings derived from application settings."""
+    settings = get_settings()
+    return {
+        "bind": f"{settings.api_host}:{settings.api_port}",
+        "workers": settings.api_workers or default_workers(),
+        "worker_class": ProductionUvicornWorker,
+        "preload_app": True,
+        "backlog": settings.api_backlog,
+        "keepalive": settings.api_keepalive,
+        "graceful_timeout": settings.api_graceful_timeout,
+        # Uvicorn workers heartbeat from the event loop; only a blocked loop trips this
+        "timeout": settings.api_graceful_timeout + 30,
+        "max_requests": settings.api_max_requests,
+        "max_requests_jitter": settings.api_max_requests // 10,
+        "forwarded_allow_ips": settings.api_trusted_proxies,
+        "child_exit": child_exit,
+        "loglevel": settings.log_level.lower(),
+        "accesslog": "-",
+        "errorlog": "-",
+    }
+
+def prepare_metrics_dir() -> str:
+    """
+    Point prometheus_client at an empty multiprocess directory. Must run before
+    the app (and so prometheus_client) is imported.
+    """
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR") or tempfile.mkdtemp(prefix="gds-metrics-")
+    os.makedirs(path, exist_ok=True)
+    # Files left by a previous server would be aggregated as live workers
+    for stale in glob.glob(os.path.join(path, "*.db")):
+        os.remove(stale)
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = path
+    return path
+
+def child_exit(server, worker):
+    """Drop an exited worker's live gauges from the aggregate."""
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
+
+class ProductionServer(BaseApplication):
+    """Gunicorn application serving ``main:app``."""
+
+    def __init__(self, options: Dict[str, Any]):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            if key in self.cfg.settings and value is not None:
+                self.cfg.set(key, value)
+
+    def load(self):
+        from main import app
+        return app
+
+def main():
+    prepare_metrics_dir()
+    ProductionServer(gunicorn_options()).run()
+
+if __name__ == "__main__":
+    main()
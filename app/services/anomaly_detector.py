@@ -0,0 +1,65 @@
+"""
+Anomaly scoring of index time series.
+
+The latest observation of each metric is compared with an absolute lower
+threshold (``<metric>_threshold`` in the job's threshold_config) and with the
+earlier observations as a baseline (z-score above ``z_threshold``).
+"""
+from statistics import fmean, pstdev
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_Z_THRESHOLD = 2.0
+MIN_BASELINE_POINTS = 3
+
+def detect_anomalies(
+    series: Dict[str, Sequence[Tuple[str, Optional[float]]]],
+    threshold_config: Optional[Dict[str, Any]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Score the latest value of each metric series.
+
+    Args:
+        series: Metric name -> [(acquisition date, mean value)], oldest first
+        threshold_config: Optional ``<metric>_threshold`` lower bounds and ``z_threshold``
+    """
+    threshold_config = threshold_config or {}
+    z_threshold = float(threshold_config.get("z_threshold", DEFAULT_Z_THRESHOLD))
+    anomalies = []
+
+    for metric, points in series.items():
+        observed = [(day, value) for day, value in points if value is not None]
+        if not observed:
+            continue
+        day, latest = observed[-1]
+        baseline = [value for _, value in observed[:-1]]
+
+        threshold = threshold_config.get(f"{metric}_threshold")
+        if threshold is not None and latest < float(threshold):
+            anomalies.append({
+                "metric": metric,
+                "type": f"{metric}_below_threshold",
+                "date": day,
+                "value": latest,
+                "threshold": float(threshold),
+                "confidence": round(min(1.0, 0.5 + (float(threshold) - latest) / max(abs(float(threshold)), 1e-6)), 2),
+            })
+
+        if len(baseline) < MIN_BASELINE_POINTS:
+            continue
+        baseline_mean = fmean(baseline)
+        baseline_std = pstdev(baseline)
+        if baseline_std == 0:
+            continue
+        z_score = (latest - baseline_mean) / baseline_std
+        if abs(z_score) >= z_threshold:
+            anomalies.append({
+                "metric": metric,
+                "type": f"{metric}_drop" if z_score < 0 else f"{metric}_spike",
+                "date": day,
+                "value": latest,
+                "baseline_mean": round(baseline_mean, 4),
+                "z_score": round(z_score, 2),
+                "confidence": round(min(1.0, abs(z_score) / (2 * z_threshold)), 2),
+            })
+
+    return anomalies
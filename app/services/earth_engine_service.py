@@ -0,0 +1,348 @@
+"""
+Google Earth Engine client.
+
+``EarthEngineService.reduce_regions`` computes spectral index statistics for
+many polygons with one ``reduceRegions`` call per ``EE_BATCH_SIZE`` polygons
+over a FeatureCollection, instead of one request per polygon. Every call takes
+a token from a Redis token bucket shared by all workers, so the project's
+quota is respected cluster-wide, and 429 / quota errors are retried with
+exponential backoff and jitter.
+
+Earth Engine is initialised once per process (again in forked children) and
+credentials are refreshed ahead of expiry rather than on a request's path.
+
+Requests are plain JSON, so a transport can record them with the responses
+and ``RecordedTransport`` can replay them offline (``EE_RECORDED_RESPONSES``).
+"""
+import fcntl
+from abc import ABC, abstractmethod
+import hashlib
+import json
+import logging
+import os
+import random
+import threading
+import time
+from datetime import date, datetime, timedelta, UTC
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence
+from config.service_config import EarthEngineConfig
+from config.settings import get_settings
+from services.processing_service import SPECTRAL_INDICES, Coordinates, coordinates_bbox, required_bands
+from services.satellite_data_service import SATELLITE_BANDS, UnsupportedSatelliteError
+from utils.rate_limit import TokenBucketLimiter, get_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+EE_SCOPES = [
+    "https://www.googleapis.com/auth/earthengine",
+    "https://www.googleapis.com/auth/cloud-platform",
+]
+
+# Surface reflectance collections; reflectance = DN * multiply + add
+SATELLITE_COLLECTIONS: Dict[str, Dict[str, Any]] = {
+    "Sentinel-2": {
+        "collection": "COPERNICUS/S2_SR_HARMONIZED",
+        "cloud_property": "CLOUDY_PIXEL_PERCENTAGE",
+        "scale": 10,
+        "multiply": 0.0001,
+        "add": 0.0,
+    },
+    "Landsat-8": {
+        "collection": "LANDSAT/LC08/C02/T1_L2",
+        "cloud_property": "CLOUD_COVER",
+        "scale": 30,
+        "multiply": 0.0000275,
+        "add": -0.2,
+    },
+    "MODIS": {
+        "collection": "MODIS/061/MOD09GA",
+        "cloud_property": None,
+        "scale": 500,
+        "multiply": 0.0001,
+        "add": 0.0,
+    },
+}
+
+# Reducer output name -> statistics key used across the service
+REDUCER_OUTPUTS = {"mean": "mean", "stdDev": "std", "min": "min", "max": "max", "count": "pixel_count"}
+
+class EarthEngineError(RuntimeError):
+    """Raised when an Earth Engine request fails."""
+
+class EarthEngineQuotaError(EarthEngineError):
+    """Raised when the quota does not allow a request in time, or retries are exhausted."""
+
+def build_reduce_request(
+    satellite_type: str,
+    regions: Sequence[Coordinates],
+    start_date: date,
+    end_date: date,
+    indices: Sequence[str],
+    max_cloud_coverage: float,
+    scale: Optional[float] = None
+) -> Dict[str, Any]:
+    """JSON description of a reduceRegions call over a median composite."""
+    if satellite_type not in SATELLITE_COLLECTIONS:
+        raise UnsupportedSatelliteError(f"Unsupported satellite type: {satellite_type}")
+    collection = SATELLITE_COLLECTIONS[satellite_type]
+    band_ids = SATELLITE_BANDS[satellite_type]
+    return {
+        "satellite_type": satellite_type,
+        "collection": collection["collection"],
+        "start": start_date.isoformat(),
+        "end": end_date.isoformat(),
+        "cloud_property": collection["cloud_property"],
+        "max_cloud_coverage": max_cloud_coverage,
+        "multiply": collection["multiply"],
+        "add": collection["add"],
+        "scale": scale or collection["scale"],
+        "bands": {band: band_ids[band] for band in required_bands(indices)},
+        "indices": {name: list(SPECTRAL_INDICES[name]) for name in indices},
+        "regions": [_ring(coordinates) for coordinates in regions],
+    }
+
+def _ring(coordinates: Coordinates) -> List[List[float]]:
+    """Polygon ring of a job's coordinates; fewer than three points become their bbox."""
+    if len(coordinates) >= 3:
+        return [[float(lon), float(lat)] for lon, lat, *_ in coordinates]
+    min_lon, min_lat, max_lon, max_lat = coordinates_bbox(coordinates)
+    return [[min_lon, min_lat], [max_lon, min_lat], [max_lon, max_lat], [min_lon, max_lat]]
+
+def request_key(request: Dict[str, Any]) -> str:
+    return hashlib.sha1(json.dumps(request, sort_keys=True).encode()).hexdigest()
+
+def parse_region_statistics(properties: Dict[str, Any], indices: Sequence[str]) -> Dict[str, Dict[str, Optional[float]]]:
+    """Index statistics from a reduced feature's properties (``<index>_<reducer output>``)."""
+    stats = {}
+    for name in indices:
+        values: Dict[str, Optional[float]] = {}
+        for output, key in REDUCER_OUTPUTS.items():
+            # A single-band image yields unprefixed output names
+            value = properties.get(f"{name}_{output}", properties.get(output) if len(indices) == 1 else None)
+            if key == "pixel_count":
+                values[key] = int(value or 0)
+            else:
+                values[key] = round(float(value), 4) if value is not None else None
+        stats[name] = values
+    return stats
+
+class CredentialManager:
+    """Loads credentials once and refreshes them before they expire."""
+
+    def __init__(self, credentials_path: str, refresh_margin: int = 300):
+        self.credentials_path = credentials_path
+        self.refresh_margin = timedelta(seconds=refresh_margin)
+        self._credentials = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        with self._lock:
+            if self._credentials is None:
+                import google.auth
+                # Service account keys and workload identity federation (external_account) configs
+                self._credentials, _ = google.auth.load_credentials_from_file(self.credentials_path, scopes=EE_SCOPES)
+            if self._needs_refresh():
+                from google.auth.transport.requests import Request
+                self._credentials.refresh(Request())
+                logger.info(f"Refreshed Earth Engine credentials, valid until {self._credentials.expiry}")
+            return self._credentials
+
+    def _needs_refresh(self) -> bool:
+        credentials = self._credentials
+        if not credentials.valid:
+            return True
+        if credentials.expiry is None:
+            return False
+        # google-auth expiries are naive UTC
+        return credentials.expiry - self.refresh_margin <= datetime.now(UTC).replace(tzinfo=None)
+
+class EarthEngineTransport(ABC):
+    """Executes reduce requests; returns the properties of each reduced region, in order."""
+
+    name = "base"
+
+    @abstractmethod
+    def reduce_regions(self, request: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Properties of each reduced region of the request, in order."""
+
+class EarthEngineApiTransport(EarthEngineTransport):
+    """Runs requests against the Earth Engine API."""
+
+    name = "earth_engine"
+
+    def __init__(self, credentials: CredentialManager, project: str):
+        self.credentials = credentials
+        self.project = project
+        self._initialized_pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def reduce_regions(self, request: Dict[str, Any]) -> List[Dict[str, Any]]:
+        ee = self._ee()
+        regions = ee.FeatureCollection([
+            ee.Feature(ee.Geometry.Polygon([ring]), {"region_index": index})
+            for index, ring in enumerate(request["regions"])
+        ])
+        end = date.fromisoformat(request["end"]) + timedelta(days=1)  # filterDate's end is exclusive
+
+        collection = ee.ImageCollection(request["collection"]).filterDate(request["start"], end.isoformat()).filterBounds(regions.geometry())
+        if request["cloud_property"]:
+            collection = collection.filter(ee.Filter.lte(request["cloud_property"], request["max_cloud_coverage"]))
+        composite = (
+            collection.select(list(request["bands"].values()), list(request["bands"].keys()))
+            .median()
+            .multiply(request["multiply"])
+            .add(request["add"])
+        )
+        image = ee.Image.cat([
+            composite.normalizedDifference(bands).rename(name) for name, bands in request["indices"].items()
+        ])
+        reducer = (
+            ee.Reducer.mean()
+            .combine(ee.Reducer.stdDev(), sharedInputs=True)
+            .combine(ee.Reducer.minMax(), sharedInputs=True)
+            .combine(ee.Reducer.count(), sharedInputs=True)
+        )
+        result = image.reduceRegions(collection=regions, reducer=reducer, scale=request["scale"]).getInfo()
+
+        properties = [feature["properties"] for feature in result["features"]]
+        properties.sort(key=lambda props: props["region_index"])
+        return properties
+
+    def _ee(self):
+        """The ``ee`` module, initialised once per process with fresh credentials."""
+        import ee
+        credentials = self.credentials.get()
+        with self._lock:
+            if self._initialized_pid != os.getpid():
+                ee.Initialize(credentials=credentials, project=self.project)
+                self._initialized_pid = os.getpid()
+                logger.info(f"Earth Engine initialised for project {self.project} in process {os.getpid()}")
+        return ee
+
+class RecordedTransport(EarthEngineTransport):
+    """Replays responses recorded by ``RecordingTransport``; no network access."""
+
+    name = "recorded"
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path) as file:
+            self._responses: Dict[str, Any] = json.load(file)
+
+    def reduce_regions(self, request: Dict[str, Any]) -> List[Dict[str, Any]]:
+        recorded = self._responses.get(request_key(request))
+        if recorded is None:
+            raise EarthEngineError(f"No recorded response for request {request_key(request)} in {self.path}")
+        return recorded["response"]
+
+class RecordingTransport(EarthEngineTransport):
+    """Passes requests to another transport and appends request/response pairs to a JSON file."""
+
+    def __init__(self, transport: EarthEngineTransport, path: str):
+        self.transport = transport
+        self.path = path
+        self.name = transport.name
+
+    def reduce_regions(self, request: Dict[str, Any]) -> List[Dict[str, Any]]:
+        response = self.transport.reduce_regions(request)
+        with open(self.path, "a+") as file:
+            fcntl.flock(file, fcntl.LOCK_EX)
+            try:
+                file.seek(0)
+                content = file.read()
+                recorded = json.loads(content) if content.strip() else {}
+                recorded[request_key(request)] = {"request": request, "response": response}
+                file.seek(0)
+                file.truncate()
+                json.dump(recorded, file, indent=1, sort_keys=True)
+            finally:
+                fcntl.flock(file, fcntl.LOCK_UN)
+        return response
+
+def _is_retryable(error: Exception) -> bool:
+    """429s, quota and rate limit errors, and 503s from Earth Engine."""
+    status = getattr(getattr(error, "resp", None), "status", None)
+    if status in (429, 503):
+        return True
+    message = str(error).lower()
+    return any(marker in message for marker in ("429", "too many requests", "quota", "rate limit", "service unavailable"))
+
+class EarthEngineService:
+    """Batched, quota-aware Earth Engine reductions."""
+
+    def __init__(
+        self,
+        config: EarthEngineConfig,
+        transport: EarthEngineTransport,
+        limiter: Optional[TokenBucketLimiter] = None,
+        quota_key: str = "earth_engine"
+    ):
+        self.config = config
+        self.transport = transport
+        self.limiter = limiter
+        self.quota_key = quota_key
+
+    def reduce_regions(
+        self,
+        satellite_type: str,
+        regions: Sequence[Coordinates],
+        start_date: date,
+        end_date: date,
+        indices: Sequence[str],
+        max_cloud_coverage: float,
+        scale: Optional[float] = None
+    ) -> List[Dict[str, Dict[str, Optional[float]]]]:
+        """
+        Index statistics of a median composite for every region.
+
+        Returns one ``{index: {mean, std, min, max, pixel_count}}`` per region,
+        in the order given, using ``ceil(len(regions) / EE_BATCH_SIZE)`` requests.
+        """
+        results: List[Dict[str, Dict[str, Optional[float]]]] = []
+        for offset in range(0, len(regions), self.config.batch_size):
+            batch = regions[offset:offset + self.config.batch_size]
+            request = build_reduce_request(satellite_type, batch, start_date, end_date, indices, max_cloud_coverage, scale)
+            properties = self._call(request)
+            if len(properties) != len(batch):
+                raise EarthEngineError(f"Expected {len(batch)} reduced regions, got {len(properties)}")
+            results.extend(parse_region_statistics(props, indices) for props in properties)
+        return results
+
+    def _call(self, request: Dict[str, Any]) -> List[Dict[str, Any]]:
+        for attempt in range(self.config.max_retries + 1):
+            self._take_quota()
+            try:
+                return self.transport.reduce_regions(request)
+            except EarthEngineError:
+                raise
+            except Exception as e:
+                if not _is_retryable(e):
+                    raise EarthEngineError(f"Earth Engine request failed: {str(e)}") from e
+                if attempt == self.config.max_retries:
+                    raise EarthEngineQuotaError(f"Earth Engine still throttled after {attempt + 1} attempts: {str(e)}") from e
+                # Full jitter keeps workers that hit the limit together from retrying together
+                delay = random.uniform(0, min(self.config.backoff_max, self.config.backoff_base * 2 ** attempt))
+                logger.warning(f"Earth Engine throttled (attempt {attempt + 1}), retrying in {delay:.1f}s: {str(e)}")
+                time.sleep(delay)
+
+    def _take_quota(self) -> None:
+        limiter = self.limiter or get_rate_limiter()
+        if not limiter.acquire_sync(self.quota_key, self.config.requests_per_second, self.config.burst, timeout=self.config.quota_wait_timeout):
+            raise EarthEngineQuotaError(f"No Earth Engine quota within {self.config.quota_wait_timeout}s")
+
+@lru_cache
+def get_earth_engine_service() -> EarthEngineService:
+    """Get the process-wide Earth Engine service."""
+    settings = get_settings()
+    config = settings.earth_engine
+    if config.recorded_responses and not config.record:
+        transport: EarthEngineTransport = RecordedTransport(config.recorded_responses)
+    else:
+        if not settings.google_application_credentials or not settings.gee_project_id:
+            raise EarthEngineError("GOOGLE_APPLICATION_CREDENTIALS and GEE_PROJECT_ID are required for Earth Engine")
+        credentials = CredentialManager(settings.google_application_credentials, config.credential_refresh_margin)
+        transport = EarthEngineApiTransport(credentials, settings.gee_project_id)
+        if config.record and config.recorded_responses:
+            transport = RecordingTransport(transport, config.recorded_responses)
+    return EarthEngineService(config, transport, quota_key=f"earth_engine:{settings.gee_project_id or 'recorded'}")
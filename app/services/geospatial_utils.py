@@ -0,0 +1,71 @@
+"""
+Derived geometry of job areas.
+
+Job ``coordinates`` are summarised once, when a job is written, into the
+columns the scheduler and API filter and estimate on (bbox, area, vertex
+count), so routing never walks coordinate lists again. Metrics are taken on
+the repaired ring, and, as in the workers, fewer than three points stand for
+their bounding box.
+"""
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+from utils import geometry
+from utils.spatial_index import polygon_ring
+
+logger = logging.getLogger(__name__)
+
+GEOMETRY_COLUMNS = ("bbox_min_lon", "bbox_min_lat", "bbox_max_lon", "bbox_max_lat", "area_ha", "vertex_count")
+
+def geometry_summary(coordinates: Sequence[Sequence[float]]) -> Dict[str, Any]:
+    """Bbox, centroid, geodesic area and perimeter, vertex count and validity of a job area."""
+    points = geometry.as_ring(coordinates)
+    ring, fixes = geometry.repair(polygon_ring(points))
+    if len(ring) < 3:
+        raise ValueError("Coordinates do not describe an area")
+    min_lon, min_lat, max_lon, max_lat = geometry.bbox(ring)
+    return {
+        "bbox_min_lon": min_lon,
+        "bbox_min_lat": min_lat,
+        "bbox_max_lon": max_lon,
+        "bbox_max_lat": max_lat,
+        "area_ha": round(geometry.area_hectares(ring), 4),
+        "perimeter_m": round(geometry.perimeter_m(ring), 2),
+        "centroid": list(geometry.centroid(ring)),
+        "vertex_count": len(points),
+        "is_valid": not geometry.validity_issues(points) if len(points) >= 3 else True,
+        "repairs": [fix for fix in fixes if fix != "reoriented"],
+    }
+
+def geometry_columns(payload: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Stored geometry columns of a job payload; all None when it has no usable coordinates."""
+    coordinates = (payload or {}).get("coordinates")
+    try:
+        summary = geometry_summary(coordinates)
+    except (TypeError, ValueError) as e:
+        logger.debug(f"No geometry metrics for coordinates: {str(e)}")
+        return dict.fromkeys(GEOMETRY_COLUMNS)
+    if summary["repairs"]:
+        logger.info(f"Job geometry needed repairs ({', '.join(summary['repairs'])}); metrics use the repaired ring")
+    return {column: summary[column] for column in GEOMETRY_COLUMNS}
+
+def prepare_coordinates(
+    coordinates: Sequence[Sequence[float]],
+    tolerance_m: float = 0.0,
+    method: str = "douglas_peucker",
+    decimals: Optional[int] = 6
+) -> List[List[float]]:
+    """
+    Repaired, simplified and quantised copy of a polygon, for sending to
+    imagery backends or storing. ``tolerance_m`` 0 skips simplification and
+    ``decimals`` None skips quantisation.
+    """
+    ring, _ = geometry.repair(geometry.as_ring(coordinates))
+    if len(ring) < 3:
+        return ring.tolist()
+    if tolerance_m > 0:
+        ring = geometry.simplify(ring, tolerance_m, method)
+    if decimals is not None:
+        quantized = geometry.quantize(ring, decimals)
+        if len(quantized) >= 3:
+            ring = quantized
+    return ring.tolist()
@@ -0,0 +1,716 @@
+"""
+Execution engine behind ``tasks.job_processor.process_geospatial_job``.
+
+A job's ``target_function`` names the handler that runs it. Names resolve in
+order: the exact registered name, the name without a ``process_`` prefix, then
+the job's ``job_type``. Handlers fetch imagery through the configured backend
+and return the structured result stored in the run's ``output_summary``,
+including measured time per phase.
+
+Handlers that can also run many jobs at once register a batch variant with
+``register_batch_handler``. ``execute_job_batch`` runs compatible jobs (same
+``batch_key``) through it with one scene search over the union of their areas;
+each job then reads its own window of those scenes (``ImageryBackend.window``)
+at its own resolution, so batched results equal single-job results.
+"""
+import json
+import logging
+import operator
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, UTC
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+import numpy as np
+from config.settings import get_settings
+from services.anomaly_detector import detect_anomalies
+from services.earth_engine_service import get_earth_engine_service
+from services.processing_service import (
+    SPECTRAL_INDICES,
+    SpectralIndexEngine,
+    compute_index,
+    coordinates_bbox,
+    pixel_area_hectares,
+)
+from services.satellite_data_service import REVISIT_DAYS, SATELLITE_BANDS, ImageryBackend, Raster, Scene, get_imagery_backend
+from utils.validators import validate_coordinates
+
+logger = logging.getLogger(__name__)
+
+class JobExecutionError(ValueError):
+    """Raised when a job cannot be executed as defined."""
+
+class UnknownTargetFunctionError(JobExecutionError):
+    """Raised when neither the target function nor the job type has a handler."""
+
+class JobExecutionContext:
+    """Inputs and shared helpers of one job execution."""
+
+    def __init__(
+        self,
+        job_id: str,
+        job_name: str,
+        job_type: str,
+        target_function: str,
+        payload: Dict[str, Any],
+        backend: ImageryBackend,
+        run_log=None
+    ):
+        self.job_id = job_id
+        self.job_name = job_name
+        self.job_type = job_type
+        self.target_function = target_function
+        self.payload = payload
+        self.backend = backend
+        self.run_log = run_log
+        self.config = get_settings().imagery
+        self.timings: Dict[str, float] = {}
+
+        try:
+            self.coordinates = validate_coordinates(payload.get("coordinates"))
+        except ValueError as e:
+            raise JobExecutionError(f"Invalid payload coordinates: {str(e)}") from e
+        self.bbox = coordinates_bbox(self.coordinates)
+
+        self.satellite_type = payload.get("satellite_type")
+        if self.satellite_type not in SATELLITE_BANDS:
+            raise JobExecutionError(f"Unsupported satellite type: {self.satellite_type}")
+        self.max_cloud_coverage = float(payload.get("max_cloud_coverage", self.config.max_cloud_coverage))
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Add the time spent in the block to the named phase."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - start
+
+    def log(self, message: str, **details) -> None:
+        logger.info(f"[{self.job_name}] {message}")
+        if self.run_log is not None:
+            self.run_log.log(message, **details)
+
+    def date_range(self, default_days: Optional[int] = None) -> Tuple[date, date]:
+        """Payload ``date_range`` {start, end}, else the lookback window ending today."""
+        date_range = self.payload.get("date_range") or {}
+        today = datetime.now(UTC).date()
+        try:
+            end = date.fromisoformat(date_range["end"]) if date_range.get("end") else today
+            if date_range.get("start"):
+                start = date.fromisoformat(date_range["start"])
+            else:
+                start = end - timedelta(days=default_days or self.config.default_lookback_days)
+        except (TypeError, ValueError) as e:
+            raise JobExecutionError(f"Invalid date_range: {str(e)}")
+        if start > end:
+            raise JobExecutionError("date_range start is after end")
+        return start, end
+
+    def search_scenes(self, default_days: Optional[int] = None) -> List[Scene]:
+        start, end = self.date_range(default_days)
+        with self.phase("search"):
+            scenes = self.backend.search_scenes(self.satellite_type, self.bbox, start, end, self.max_cloud_coverage)
+        self.log(f"Found {len(scenes)} {self.satellite_type} scenes", start=start.isoformat(), end=end.isoformat())
+        return scenes
+
+    def read_bands(self, scene: Scene, bands: List[str]) -> Dict[str, Raster]:
+        with self.phase("read"):
+            return {band: self.backend.read_band(scene, band) for band in bands}
+
+    def read_cloud_mask(self, scene: Scene) -> Optional[np.ndarray]:
+        with self.phase("read"):
+            return self.backend.read_cloud_mask(scene)
+
+    def index_statistics(self, engine: SpectralIndexEngine, scene: Scene) -> Dict[str, Dict[str, Optional[float]]]:
+        """Polygon-masked, cloud-masked statistics of the engine's indices for one scene."""
+        bands = self.read_bands(scene, engine.bands)
+        cloud_mask = self.read_cloud_mask(scene)
+        with self.phase("compute"):
+            return engine.statistics(bands, self.coordinates, self.bbox, cloud_mask)
+
+    def requested_indices(self, default: List[str]) -> Tuple[List[str], List[str]]:
+        """Supported and unsupported entries of the payload's ``metrics``."""
+        metrics = [str(metric).lower() for metric in self.payload.get("metrics") or default]
+        supported = [metric for metric in metrics if metric in SPECTRAL_INDICES]
+        unsupported = [metric for metric in metrics if metric not in SPECTRAL_INDICES]
+        return supported, unsupported
+
+JobHandler = Callable[[JobExecutionContext], Dict[str, Any]]
+
+HANDLERS: Dict[str, JobHandler] = {}
+# Handlers that mostly wait on remote services; they run on the thread-pool "fetch" workers
+IO_BOUND_HANDLERS: Set[str] = set()
+
+def register_handler(*names: str, io_bound: bool = False) -> Callable[[JobHandler], JobHandler]:
+    """Register a handler under one or more target function names."""
+    def decorator(handler: JobHandler) -> JobHandler:
+        for name in names:
+            HANDLERS[name] = handler
+            if io_bound:
+                IO_BOUND_HANDLERS.add(name)
+        return handler
+    return decorator
+
+def resolve_handler(target_function: Optional[str], job_type: Optional[str]) -> Tuple[str, JobHandler]:
+    """Find the handler for a job; returns (resolved name, handler)."""
+    candidates = []
+    if target_function:
+        candidates.append(target_function)
+        if target_function.startswith("process_"):
+            candidates.append(target_function[len("process_"):])
+    if job_type:
+        candidates.append(job_type)
+
+    for name in candidates:
+        handler = HANDLERS.get(name)
+        if handler is not None:
+            return name, handler
+    raise UnknownTargetFunctionError(
+        f"No handler for target_function '{target_function}' or job_type '{job_type}'"
+    )
+
+def job_celery_queue(target_function: Optional[str], job_type: Optional[str]) -> str:
+    """
+    Celery queue of the worker profile suited to a job (see config/worker_profiles.py):
+    ``fetch`` for I/O-bound handlers, ``monitoring`` for monitoring jobs, else ``geospatial``.
+    """
+    if job_type == "monitoring":
+        return "monitoring"
+    try:
+        name, _ = resolve_handler(target_function, job_type)
+    except UnknownTargetFunctionError:
+        return "geospatial"
+    return "fetch" if name in IO_BOUND_HANDLERS else "geospatial"
+
+class JobBatchContext:
+    """Jobs of one batch: their own contexts plus the imagery area they share."""
+
+    def __init__(self, contexts: List[JobExecutionContext], backend: ImageryBackend):
+        self.contexts = contexts
+        self.lead = contexts[0]
+        self.backend = backend
+        self.satellite_type = self.lead.satellite_type
+        self.max_cloud_coverage = self.lead.max_cloud_coverage
+        self.payload = self.lead.payload
+        boxes = np.array([context.bbox for context in contexts])
+        self.bbox = (float(boxes[:, 0].min()), float(boxes[:, 1].min()), float(boxes[:, 2].max()), float(boxes[:, 3].max()))
+        self.timings: Dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Add the time spent in the block to the named phase."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - start
+
+    def log(self, message: str, **details) -> None:
+        """Log to the run of every job in the batch."""
+        logger.info(f"[batch of {len(self.contexts)}] {message}")
+        for context in self.contexts:
+            if context.run_log is not None:
+                context.run_log.log(message, **details)
+
+    def date_range(self, default_days: Optional[int] = None) -> Tuple[date, date]:
+        return self.lead.date_range(default_days)
+
+    def requested_indices(self, default: List[str]) -> Tuple[List[str], List[str]]:
+        return self.lead.requested_indices(default)
+
+    def search_scenes(self, default_days: Optional[int] = None) -> List[List[Scene]]:
+        """
+        Per job, the scenes its own search would return: one search over the
+        batch area without a cloud limit, then each job's window of every
+        acquisition, filtered on the window's cloud coverage.
+        """
+        start, end = self.date_range(default_days)
+        with self.phase("search"):
+            candidates = self.backend.search_scenes(self.satellite_type, self.bbox, start, end, 100.0)
+            per_job = []
+            for context in self.contexts:
+                windows = (self.backend.window(scene, context.bbox) for scene in candidates)
+                per_job.append([window for window in windows if window.cloud_coverage <= context.max_cloud_coverage])
+        self.log(f"Found {len(candidates)} {self.satellite_type} acquisitions for the batch", start=start.isoformat(), end=end.isoformat())
+        return per_job
+
+    def index_statistics(self, context: JobExecutionContext, engine: SpectralIndexEngine, scene: Scene) -> Dict[str, Dict[str, Optional[float]]]:
+        """Polygon-masked, cloud-masked statistics of one job's window of a scene."""
+        with context.phase("read"):
+            bands = {band: self.backend.read_band(scene, band) for band in engine.bands}
+            cloud_mask = self.backend.read_cloud_mask(scene)
+        with context.phase("compute"):
+            return engine.statistics(bands, context.coordinates, context.bbox, cloud_mask)
+
+BatchHandler = Callable[[JobBatchContext], List[Dict[str, Any]]]
+
+BATCH_HANDLERS: Dict[str, BatchHandler] = {}
+
+# Payload fields jobs must share to run in one batch; coordinates and thresholds stay per job
+BATCH_PARAMETERS = ("satellite_type", "date_range", "max_cloud_coverage", "metrics", "baseline_days")
+
+def register_batch_handler(*names: str) -> Callable[[BatchHandler], BatchHandler]:
+    """Register the batch variant of the handlers registered under these names."""
+    def decorator(handler: BatchHandler) -> BatchHandler:
+        for name in names:
+            BATCH_HANDLERS[name] = handler
+        return handler
+    return decorator
+
+def batch_key(target_function: Optional[str], job_type: Optional[str], payload: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Key shared by jobs that can run in one batch, or None if the job cannot be batched."""
+    try:
+        handler_name, _ = resolve_handler(target_function, job_type)
+    except UnknownTargetFunctionError:
+        return None
+    if handler_name not in BATCH_HANDLERS or not isinstance(payload, dict):
+        return None
+    parameters = {name: payload.get(name) for name in BATCH_PARAMETERS}
+    return f"{handler_name}|{json.dumps(parameters, sort_keys=True, default=str)}"
+
+def execute_job(job, payload: Optional[Dict[str, Any]] = None, run_log=None, backend: Optional[ImageryBackend] = None) -> Dict[str, Any]:
+    """
+    Run a job definition through its handler.
+
+    Args:
+        job: Job definition (model instance or anything with the same attributes)
+        payload: Override payload; defaults to the job's own payload
+        run_log: Optional ``JobRunLogBuffer`` receiving progress entries
+        backend: Imagery backend; defaults to the configured one
+
+    Returns:
+        Structured output for the run's ``output_summary``
+    """
+    started = time.perf_counter()
+    handler_name, handler = resolve_handler(job.target_function, job.job_type)
+    context = JobExecutionContext(
+        job_id=str(job.id),
+        job_name=job.job_name,
+        job_type=job.job_type,
+        target_function=job.target_function,
+        payload=payload or job.payload or {},
+        backend=backend or get_imagery_backend(),
+        run_log=run_log
+    )
+    context.log(f"Running handler {handler_name}", target_function=job.target_function, backend=context.backend.name)
+
+    result = handler(context)
+
+    total = time.perf_counter() - started
+    timing_ms = {phase: round(seconds * 1000, 2) for phase, seconds in context.timings.items()}
+    timing_ms["total"] = round(total * 1000, 2)
+
+    output = {
+        "status": "completed",
+        "handler": handler_name,
+        "target_function": job.target_function,
+        "satellite_type": context.satellite_type,
+        "imagery_backend": context.backend.name,
+    }
+    output.update(result)
+    output["timing_ms"] = timing_ms
+    return output
+
+def execute_job_batch(
+    jobs: List[Any],
+    payloads: Optional[Dict[str, Dict[str, Any]]] = None,
+    run_logs: Optional[Dict[str, Any]] = None,
+    backend: Optional[ImageryBackend] = None
+) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, str]]:
+    """
+    Run many job definitions, batching those that share a ``batch_key``.
+
+    Jobs that cannot be batched (or end up alone) run through ``execute_job``.
+    A failure only fails the jobs it concerns: an invalid payload its own job,
+    an imagery error the jobs of that batch.
+
+    Args:
+        jobs: Job definitions
+        payloads: Override payloads by job id
+        run_logs: Per-run loggers by job id
+        backend: Imagery backend; defaults to the configured one
+
+    Returns:
+        (output summaries by job id, error messages by job id)
+    """
+    payloads = payloads or {}
+    run_logs = run_logs or {}
+    backend = backend or get_imagery_backend()
+    outputs: Dict[str, Dict[str, Any]] = {}
+    errors: Dict[str, str] = {}
+
+    groups: Dict[Optional[str], List[Any]] = {}
+    for job in jobs:
+        payload = payloads.get(str(job.id)) or job.payload or {}
+        groups.setdefault(batch_key(job.target_function, job.job_type, payload), []).append(job)
+
+    for key, group in groups.items():
+        if key is None or len(group) == 1:
+            for job in group:
+                job_id = str(job.id)
+                try:
+                    outputs[job_id] = execute_job(job, payloads.get(job_id), run_log=run_logs.get(job_id), backend=backend)
+                except Exception as e:
+                    logger.error(f"Job {job_id} failed: {str(e)}")
+                    errors[job_id] = str(e)
+            continue
+
+        started = time.perf_counter()
+        handler_name = key.split("|", 1)[0]
+        contexts = []
+        for job in group:
+            job_id = str(job.id)
+            try:
+                contexts.append(JobExecutionContext(
+                    job_id=job_id,
+                    job_name=job.job_name,
+                    job_type=job.job_type,
+                    target_function=job.target_function,
+                    payload=payloads.get(job_id) or job.payload or {},
+                    backend=backend,
+                    run_log=run_logs.get(job_id)
+                ))
+            except JobExecutionError as e:
+                errors[job_id] = str(e)
+        if not contexts:
+            continue
+
+        batch = JobBatchContext(contexts, backend)
+        batch.log(f"Running batch handler {handler_name} for {len(contexts)} jobs", backend=backend.name)
+        try:
+            results = BATCH_HANDLERS[handler_name](batch)
+        except Exception as e:
+            logger.error(f"Batch {handler_name} of {len(contexts)} jobs failed: {str(e)}")
+            for context in contexts:
+                errors[context.job_id] = str(e)
+            continue
+
+        batch_timing_ms = {phase: round(seconds * 1000, 2) for phase, seconds in batch.timings.items()}
+        batch_timing_ms["total"] = round((time.perf_counter() - started) * 1000, 2)
+        for context, result in zip(contexts, results):
+            # The job's own reads and computation; phases shared by the batch are in batch_timing_ms
+            timing_ms = {phase: round(seconds * 1000, 2) for phase, seconds in context.timings.items()}
+            timing_ms["total"] = round(sum(context.timings.values()) * 1000, 2)
+            output = {
+                "status": "completed",
+                "handler": handler_name,
+                "target_function": context.target_function,
+                "satellite_type": context.satellite_type,
+                "imagery_backend": backend.name,
+                "batch_size": len(contexts),
+            }
+            output.update(result)
+            output["timing_ms"] = timing_ms
+            output["batch_timing_ms"] = batch_timing_ms
+            outputs[context.job_id] = output
+    return outputs, errors
+
+# Handlers
+
+@register_handler("fetch_data", io_bound=True)
+def fetch_data(context: JobExecutionContext) -> Dict[str, Any]:
+    """Fetch the scenes covering the job area and report what was retrieved."""
+    bands = context.payload.get("bands") or list(SATELLITE_BANDS[context.satellite_type])
+    unknown = [band for band in bands if band not in SATELLITE_BANDS[context.satellite_type]]
+    if unknown:
+        raise JobExecutionError(f"Unknown bands for {context.satellite_type}: {unknown}")
+
+    scenes = context.search_scenes()
+    pixels_read = 0
+    for scene in scenes:
+        rasters = context.read_bands(scene, bands)
+        pixels_read += sum(raster.size for raster in rasters.values())
+
+    return {
+        "data_fetched": bool(scenes),
+        "scene_count": len(scenes),
+        "scenes": [scene.to_dict() for scene in scenes],
+        "bands": bands,
+        "pixels_read": pixels_read,
+        "mean_cloud_coverage": round(sum(scene.cloud_coverage for scene in scenes) / len(scenes), 2) if scenes else None,
+    }
+
+@register_handler("metric_calc")
+def metric_calc(context: JobExecutionContext) -> Dict[str, Any]:
+    """Spectral index statistics over the job polygon for the latest usable scene."""
+    indices, unsupported = context.requested_indices(default=list(SPECTRAL_INDICES))
+    if not indices:
+        raise JobExecutionError(f"No supported metrics requested; supported: {list(SPECTRAL_INDICES)}")
+
+    scenes = context.search_scenes()
+    if not scenes:
+        return {"scene_count": 0, "metrics_calculated": {}, "unsupported_metrics": unsupported, "message": "No scenes in date range"}
+
+    scene = scenes[-1]
+    metrics = context.index_statistics(SpectralIndexEngine(indices), scene)
+    pixel_count = max((stats["pixel_count"] for stats in metrics.values()), default=0)
+
+    return {
+        "scene_count": len(scenes),
+        "scene": scene.to_dict(),
+        "metrics_calculated": metrics,
+        "unsupported_metrics": unsupported,
+        "area_analyzed_hectares": round(pixel_count * pixel_area_hectares(scene.bbox, (scene.size, scene.size)), 2),
+    }
+
+@register_batch_handler("metric_calc")
+def metric_calc_batch(batch: JobBatchContext) -> List[Dict[str, Any]]:
+    """``metric_calc`` for many polygons from one scene search, each reading its window of its latest usable scene."""
+    indices, unsupported = batch.requested_indices(default=list(SPECTRAL_INDICES))
+    if not indices:
+        raise JobExecutionError(f"No supported metrics requested; supported: {list(SPECTRAL_INDICES)}")
+
+    engine = SpectralIndexEngine(indices)
+    results = []
+    for context, scenes in zip(batch.contexts, batch.search_scenes()):
+        if not scenes:
+            results.append({"scene_count": 0, "metrics_calculated": {}, "unsupported_metrics": unsupported, "message": "No scenes in date range"})
+            continue
+        scene = scenes[-1]
+        metrics = batch.index_statistics(context, engine, scene)
+        pixel_count = max((stats["pixel_count"] for stats in metrics.values()), default=0)
+        results.append({
+            "scene_count": len(scenes),
+            "scene": scene.to_dict(),
+            "metrics_calculated": metrics,
+            "unsupported_metrics": unsupported,
+            "area_analyzed_hectares": round(pixel_count * pixel_area_hectares(scene.bbox, (scene.size, scene.size)), 2),
+        })
+    return results
+
+@register_handler("earth_engine_metric_calc", "gee_metric_calc", io_bound=True)
+def earth_engine_metric_calc(context: JobExecutionContext) -> Dict[str, Any]:
+    """Spectral index statistics of an Earth Engine median composite over the date range."""
+    indices, unsupported = context.requested_indices(default=list(SPECTRAL_INDICES))
+    if not indices:
+        raise JobExecutionError(f"No supported metrics requested; supported: {list(SPECTRAL_INDICES)}")
+
+    start, end = context.date_range()
+    service = get_earth_engine_service()
+    with context.phase("earth_engine"):
+        metrics = service.reduce_regions(
+            context.satellite_type, [context.coordinates], start, end, indices, context.max_cloud_coverage
+        )[0]
+    context.log(f"Reduced {len(indices)} indices on Earth Engine", transport=service.transport.name)
+
+    return {
+        "source": "earth_engine_median_composite",
+        "date_range": {"start": start.isoformat(), "end": end.isoformat()},
+        "metrics_calculated": metrics,
+        "unsupported_metrics": unsupported,
+    }
+
+@register_batch_handler("earth_engine_metric_calc", "gee_metric_calc")
+def earth_engine_metric_calc_batch(batch: JobBatchContext) -> List[Dict[str, Any]]:
+    """``earth_engine_metric_calc`` for many polygons through batched reduceRegions calls."""
+    indices, unsupported = batch.requested_indices(default=list(SPECTRAL_INDICES))
+    if not indices:
+        raise JobExecutionError(f"No supported metrics requested; supported: {list(SPECTRAL_INDICES)}")
+
+    start, end = batch.date_range()
+    service = get_earth_engine_service()
+    with batch.phase("earth_engine"):
+        per_job = service.reduce_regions(
+            batch.satellite_type, [context.coordinates for context in batch.contexts], start, end, indices, batch.max_cloud_coverage
+        )
+    batch.log(f"Reduced {len(indices)} indices on Earth Engine for the batch", transport=service.transport.name)
+
+    return [
+        {
+            "source": "earth_engine_median_composite",
+            "date_range": {"start": start.isoformat(), "end": end.isoformat()},
+            "metrics_calculated": metrics,
+            "unsupported_metrics": unsupported,
+        }
+        for metrics in per_job
+    ]
+
+ALERT_OPERATORS: Dict[str, Callable[[float, float], bool]] = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+ALERT_STATISTICS = ("mean", "min", "max", "std")
+
+def parse_alert_rules(rules: Any) -> List[Dict[str, Any]]:
+    """Validate the payload's ``alert_rules``: [{metric, operator, threshold, statistic?, severity?}]."""
+    if not isinstance(rules, list) or not rules:
+        raise JobExecutionError("Payload alert_rules must be a non-empty list of {metric, operator, threshold}")
+    parsed = []
+    for index, rule in enumerate(rules):
+        try:
+            metric = str(rule["metric"]).lower()
+            threshold = float(rule["threshold"])
+        except (KeyError, TypeError, ValueError):
+            raise JobExecutionError(f"alert_rules[{index}] needs a metric and a numeric threshold")
+        comparison = rule.get("operator", "<")
+        statistic = rule.get("statistic", "mean")
+        if metric not in SPECTRAL_INDICES:
+            raise JobExecutionError(f"alert_rules[{index}]: unsupported metric {metric}; supported: {list(SPECTRAL_INDICES)}")
+        if comparison not in ALERT_OPERATORS:
+            raise JobExecutionError(f"alert_rules[{index}]: operator must be one of {list(ALERT_OPERATORS)}")
+        if statistic not in ALERT_STATISTICS:
+            raise JobExecutionError(f"alert_rules[{index}]: statistic must be one of {list(ALERT_STATISTICS)}")
+        parsed.append({
+            "metric": metric,
+            "statistic": statistic,
+            "operator": comparison,
+            "threshold": threshold,
+            "severity": rule.get("severity", "medium"),
+        })
+    return parsed
+
+@register_handler("alert_eval")
+def alert_eval(context: JobExecutionContext) -> Dict[str, Any]:
+    """Evaluate the payload's alert rules against index statistics of the latest usable scene."""
+    rules = parse_alert_rules(context.payload.get("alert_rules"))
+
+    scenes = context.search_scenes()
+    if not scenes:
+        return {"scene_count": 0, "rules_evaluated": 0, "alerts_triggered": 0, "alerts": [], "message": "No scenes in date range"}
+
+    scene = scenes[-1]
+    metrics = context.index_statistics(SpectralIndexEngine(sorted({rule["metric"] for rule in rules})), scene)
+
+    evaluations = []
+    for rule in rules:
+        value = metrics[rule["metric"]][rule["statistic"]]
+        # Polygons without clear pixels have no value and trigger nothing
+        triggered = value is not None and ALERT_OPERATORS[rule["operator"]](value, rule["threshold"])
+        evaluations.append({**rule, "value": value, "triggered": triggered})
+    alerts = [evaluation for evaluation in evaluations if evaluation["triggered"]]
+
+    return {
+        "scene_count": len(scenes),
+        "scene": scene.to_dict(),
+        "rules_evaluated": len(evaluations),
+        "alerts_triggered": len(alerts),
+        "alerts": alerts,
+        "evaluations": evaluations,
+        "metrics_calculated": metrics,
+    }
+
+@register_handler("monitoring")
+def monitoring(context: JobExecutionContext) -> Dict[str, Any]:
+    """Imagery availability for the job area: latest usable scene, its age and acquisition coverage."""
+    revisit = REVISIT_DAYS[context.satellite_type]
+    max_age_days = int(context.payload.get("max_age_days", 3 * revisit))
+
+    start, end = context.date_range()
+    scenes = context.search_scenes()
+    latest = scenes[-1] if scenes else None
+    age_days = (end - latest.acquired_on).days if latest is not None else None
+    expected = (end - start).days // revisit + 1
+
+    return {
+        "scene_count": len(scenes),
+        "expected_acquisitions": expected,
+        "usable_ratio": round(len(scenes) / expected, 2),
+        "latest_scene": latest.to_dict() if latest is not None else None,
+        "days_since_latest_scene": age_days,
+        "max_age_days": max_age_days,
+        "imagery_status": "ok" if age_days is not None and age_days <= max_age_days else "stale",
+        "mean_cloud_coverage": round(sum(scene.cloud_coverage for scene in scenes) / len(scenes), 2) if scenes else None,
+    }
+
+@register_handler("anomaly_detection")
+def anomaly_detection(context: JobExecutionContext) -> Dict[str, Any]:
+    """Compare the latest index means with thresholds and their recent history."""
+    indices, unsupported = context.requested_indices(default=["ndvi"])
+    if not indices:
+        raise JobExecutionError(f"No supported metrics requested; supported: {list(SPECTRAL_INDICES)}")
+
+    scenes = context.search_scenes(default_days=int(context.payload.get("baseline_days", 90)))
+    engine = SpectralIndexEngine(indices)
+    series: Dict[str, List[Tuple[str, Optional[float]]]] = {name: [] for name in indices}
+    for scene in scenes:
+        stats = context.index_statistics(engine, scene)
+        for name in indices:
+            series[name].append((scene.acquired_on.isoformat(), stats[name]["mean"]))
+
+    with context.phase("compute"):
+        anomalies = detect_anomalies(series, context.payload.get("threshold_config"))
+
+    return {
+        "scene_count": len(scenes),
+        "anomalies_detected": len(anomalies),
+        "anomaly_types": sorted({anomaly["type"] for anomaly in anomalies}),
+        "anomalies": anomalies,
+        "series": {name: [{"date": day, "mean": value} for day, value in points] for name, points in series.items()},
+        "unsupported_metrics": unsupported,
+    }
+
+@register_batch_handler("anomaly_detection")
+def anomaly_detection_batch(batch: JobBatchContext) -> List[Dict[str, Any]]:
+    """``anomaly_detection`` for many polygons from one scene search, each reading its own windows."""
+    indices, unsupported = batch.requested_indices(default=["ndvi"])
+    if not indices:
+        raise JobExecutionError(f"No supported metrics requested; supported: {list(SPECTRAL_INDICES)}")
+
+    per_job_scenes = batch.search_scenes(default_days=int(batch.payload.get("baseline_days", 90)))
+    engine = SpectralIndexEngine(indices)
+    series: List[Dict[str, List[Tuple[str, Optional[float]]]]] = [{name: [] for name in indices} for _ in batch.contexts]
+    for context, scenes, job_series in zip(batch.contexts, per_job_scenes, series):
+        for scene in scenes:
+            stats = batch.index_statistics(context, engine, scene)
+            for name in indices:
+                job_series[name].append((scene.acquired_on.isoformat(), stats[name]["mean"]))
+
+    results = []
+    for context, scenes, job_series in zip(batch.contexts, per_job_scenes, series):
+        with context.phase("compute"):
+            anomalies = detect_anomalies(job_series, context.payload.get("threshold_config"))
+        results.append({
+            "scene_count": len(scenes),
+            "anomalies_detected": len(anomalies),
+            "anomaly_types": sorted({anomaly["type"] for anomaly in anomalies}),
+            "anomalies": anomalies,
+            "series": {name: [{"date": day, "mean": value} for day, value in points] for name, points in job_series.items()},
+            "unsupported_metrics": unsupported,
+        })
+    return results
+
+@register_handler("change_analysis")
+def change_analysis(context: JobExecutionContext) -> Dict[str, Any]:
+    """Per-pixel index change between the first and last scene of the date range."""
+    index = str(context.payload.get("index", "ndvi")).lower()
+    if index not in SPECTRAL_INDICES:
+        raise JobExecutionError(f"Unsupported index: {index}")
+    change_threshold = float(context.payload.get("change_threshold", 0.1))
+
+    scenes = context.search_scenes(default_days=365)
+    if len(scenes) < 2:
+        return {"scene_count": len(scenes), "change_percentage": None, "message": "Need at least two scenes in date range"}
+
+    before_scene, after_scene = scenes[0], scenes[-1]
+    engine = SpectralIndexEngine([index])
+    before_bands = context.read_bands(before_scene, engine.bands)
+    after_bands = context.read_bands(after_scene, engine.bands)
+    before_clouds = context.read_cloud_mask(before_scene)
+    after_clouds = context.read_cloud_mask(after_scene)
+
+    with context.phase("compute"):
+        # Only pixels valid in both scenes are compared
+        valid = engine.valid_mask(before_bands, context.coordinates, context.bbox, before_clouds)
+        valid &= engine.valid_mask(after_bands, context.coordinates, context.bbox, after_clouds)
+        delta = compute_index(index, after_bands) - compute_index(index, before_bands)
+        deltas = delta[valid & ~np.isnan(delta)]
+        changed = int(np.count_nonzero(np.abs(deltas) >= change_threshold))
+        mean_delta = float(deltas.mean()) if deltas.size else 0.0
+
+    direction = "loss" if mean_delta < 0 else "gain"
+    change_type = f"vegetation_{direction}" if index == "ndvi" else f"{index}_{'decrease' if mean_delta < 0 else 'increase'}"
+
+    return {
+        "scene_count": len(scenes),
+        "before_scene": before_scene.to_dict(),
+        "after_scene": after_scene.to_dict(),
+        "index": index,
+        "mean_change": round(mean_delta, 4),
+        "change_threshold": change_threshold,
+        "change_percentage": round(100 * changed / deltas.size, 2) if deltas.size else 0.0,
+        "change_type": change_type,
+        "compared_pixels": int(deltas.size),
+        "affected_area_hectares": round(changed * pixel_area_hectares(after_scene.bbox, delta.shape), 2),
+    }
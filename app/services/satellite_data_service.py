@@ -0,0 +1,220 @@
+"""
+Satellite imagery backends.
+
+A backend finds scenes covering a bounding box in a date range and reads their
+bands as rasters clipped to that box. Handlers only see the common band names
+below, so the same code runs on every satellite and backend. Rasters are 2-D
+float32 arrays, rows north to south, holding surface reflectance in [0, 1]
+with NaN for nodata.
+"""
+import hashlib
+from abc import ABC, abstractmethod
+import logging
+import math
+import random
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, Type
+import numpy as np
+from config.service_config import ImageryConfig
+from config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+BBox = Tuple[float, float, float, float]  # (min_lon, min_lat, max_lon, max_lat)
+Raster = np.ndarray
+
+# Common band name -> band id of each supported satellite
+SATELLITE_BANDS: Dict[str, Dict[str, str]] = {
+    "Sentinel-2": {"green": "B3", "red": "B4", "nir": "B8", "swir1": "B11"},
+    "Landsat-8": {"green": "SR_B3", "red": "SR_B4", "nir": "SR_B5", "swir1": "SR_B6"},
+    "MODIS": {"green": "sur_refl_b04", "red": "sur_refl_b01", "nir": "sur_refl_b02", "swir1": "sur_refl_b06"},
+}
+
+# Days between acquisitions over the same area
+REVISIT_DAYS: Dict[str, int] = {"Sentinel-2": 5, "Landsat-8": 16, "MODIS": 1}
+
+class UnsupportedSatelliteError(ValueError):
+    """Raised for a satellite type no backend knows about."""
+
+class Scene:
+    """A single acquisition covering the requested area."""
+
+    def __init__(self, scene_id: str, satellite_type: str, acquired_on: date, cloud_coverage: float, bbox: BBox, size: int):
+        self.scene_id = scene_id
+        self.satellite_type = satellite_type
+        self.acquired_on = acquired_on
+        self.cloud_coverage = cloud_coverage
+        self.bbox = bbox
+        self.size = size
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "scene_id": self.scene_id,
+            "acquired_on": self.acquired_on.isoformat(),
+            "cloud_coverage": round(self.cloud_coverage, 2),
+        }
+
+class ImageryBackend(ABC):
+    """Interface of an imagery source."""
+
+    name = "base"
+
+    @classmethod
+    def from_config(cls, config: ImageryConfig) -> "ImageryBackend":
+        return cls()
+
+    @abstractmethod
+    def search_scenes(
+        self,
+        satellite_type: str,
+        bbox: BBox,
+        start_date: date,
+        end_date: date,
+        max_cloud_coverage: float
+    ) -> List[Scene]:
+        """Scenes covering bbox acquired between start_date and end_date, oldest first."""
+
+    @abstractmethod
+    def read_band(self, scene: Scene, band: str) -> Raster:
+        """Read one common band (see ``SATELLITE_BANDS``) of a scene, clipped to its bbox."""
+
+    def read_cloud_mask(self, scene: Scene) -> Optional[np.ndarray]:
+        """Boolean raster, True for cloudy pixels; None if the backend has no cloud mask."""
+        return None
+
+    def window(self, scene: Scene, bbox: BBox) -> Scene:
+        """
+        The acquisition of ``scene`` over a smaller ``bbox``, as a search over
+        that bbox would return it (same resolution and cloud coverage). Batches
+        search once over their combined area and read each job's window.
+        """
+        return Scene(scene.scene_id, scene.satellite_type, scene.acquired_on, scene.cloud_coverage, bbox, scene.size)
+
+class FakeImageryBackend(ImageryBackend):
+    """
+    Deterministic synthetic imagery for local development and tests.
+
+    Scenes follow each satellite's revisit cycle and reflectances derive from
+    a vegetation field that varies smoothly in space and with the season, so
+    indices, anomalies and changes behave plausibly. The same request always
+    returns the same pixels; nothing touches the network.
+    """
+
+    name = "fake"
+
+    def __init__(self, raster_size: int = 64):
+        self.raster_size = raster_size
+
+    @classmethod
+    def from_config(cls, config: ImageryConfig) -> "FakeImageryBackend":
+        return cls(raster_size=config.raster_size)
+
+    def search_scenes(
+        self,
+        satellite_type: str,
+        bbox: BBox,
+        start_date: date,
+        end_date: date,
+        max_cloud_coverage: float
+    ) -> List[Scene]:
+        if satellite_type not in SATELLITE_BANDS:
+            raise UnsupportedSatelliteError(f"Unsupported satellite type: {satellite_type}")
+
+        revisit = REVISIT_DAYS[satellite_type]
+        # Align acquisitions to a fixed orbit cycle so overlapping searches see the same scenes
+        day = start_date + timedelta(days=(-start_date.toordinal()) % revisit)
+
+        scenes = []
+        while day <= end_date:
+            scene = self._scene(satellite_type, day, bbox)
+            if scene.cloud_coverage <= max_cloud_coverage:
+                scenes.append(scene)
+            day += timedelta(days=revisit)
+        return scenes
+
+    def window(self, scene: Scene, bbox: BBox) -> Scene:
+        # Synthetic scenes are generated per area, so the window is the scene of that area
+        return self._scene(scene.satellite_type, scene.acquired_on, bbox)
+
+    def _scene(self, satellite_type: str, day: date, bbox: BBox) -> Scene:
+        scene_id = f"{satellite_type}_{day:%Y%m%d}_{self._area_key(bbox)}"
+        cloud_coverage = self._random(scene_id, "cloud").uniform(0, 100) ** 2 / 100
+        return Scene(scene_id, satellite_type, day, cloud_coverage, bbox, self.raster_size)
+
+    def read_band(self, scene: Scene, band: str) -> Raster:
+        if band not in SATELLITE_BANDS[scene.satellite_type]:
+            raise ValueError(f"Unknown band {band} for {scene.satellite_type}")
+
+        rng = self._generator(scene.scene_id, band)
+        season = 0.5 + 0.5 * math.sin(2 * math.pi * (scene.acquired_on.timetuple().tm_yday - 100) / 365)
+        y, x = self._grid(scene.size)
+        vegetation = season * (0.55 + 0.35 * np.sin(3 * x + 1.3) * np.cos(2 * y))
+        raster = self._reflectance(band, vegetation).astype(np.float32)
+        raster += rng.normal(0, 0.01, raster.shape).astype(np.float32)
+        return raster
+
+    def read_cloud_mask(self, scene: Scene) -> np.ndarray:
+        # Smooth noise thresholded so the cloudy share matches the scene's cloud coverage
+        rng = self._generator(scene.scene_id, "cloud_mask")
+        y, x = self._grid(scene.size)
+        phase_x, phase_y, frequency = rng.uniform(0, 2 * np.pi), rng.uniform(0, 2 * np.pi), rng.uniform(2, 6)
+        field = np.sin(frequency * 2 * x + phase_x) * np.cos(frequency * 3 * y + phase_y)
+        return field > np.quantile(field, 1 - scene.cloud_coverage / 100)
+
+    @staticmethod
+    def _reflectance(band: str, vegetation: np.ndarray) -> np.ndarray:
+        if band == "nir":
+            return 0.15 + 0.35 * vegetation
+        if band == "red":
+            return 0.12 - 0.08 * vegetation
+        if band == "green":
+            return 0.09 - 0.02 * vegetation
+        # swir1
+        return 0.25 - 0.12 * vegetation
+
+    @staticmethod
+    def _grid(size: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Row (column vector) and column (row vector) positions in [0, 1)."""
+        positions = np.arange(size, dtype=np.float32) / size
+        return positions[:, np.newaxis], positions[np.newaxis, :]
+
+    @staticmethod
+    def _area_key(bbox: BBox) -> str:
+        return hashlib.sha1(",".join(f"{v:.5f}" for v in bbox).encode()).hexdigest()[:8]
+
+    @staticmethod
+    def _seed(*parts: str) -> int:
+        return int.from_bytes(hashlib.sha1("|".join(parts).encode()).digest()[:8], "big")
+
+    @classmethod
+    def _random(cls, *parts: str) -> random.Random:
+        return random.Random(cls._seed(*parts))
+
+    @classmethod
+    def _generator(cls, *parts: str) -> np.random.Generator:
+        return np.random.default_rng(cls._seed(*parts))
+
+IMAGERY_BACKENDS: Dict[str, Type[ImageryBackend]] = {
+    "fake": FakeImageryBackend,
+}
+
+def register_imagery_backend(name: str, backend_class: Type[ImageryBackend]) -> None:
+    """Make a backend selectable through ``IMAGERY_BACKEND``."""
+    IMAGERY_BACKENDS[name] = backend_class
+    get_imagery_backend.cache_clear()
+
+@lru_cache
+def get_imagery_backend(name: Optional[str] = None) -> ImageryBackend:
+    """Get the process-wide imagery backend (``IMAGERY_BACKEND`` by default), behind the tile cache if enabled."""
+    config = get_settings().imagery
+    name = name or config.backend
+    backend_class = IMAGERY_BACKENDS.get(name)
+    if backend_class is None:
+        raise ValueError(f"Unknown imagery backend: {name}")
+    logger.info(f"Using imagery backend: {name}")
+    backend = backend_class.from_config(config)
+    if config.tile_cache_enabled:
+        from services.tile_cache import CachedImageryBackend
+        backend = CachedImageryBackend.wrap(backend, config)
+    return backend
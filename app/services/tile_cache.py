@@ -0,0 +1,229 @@
+"""
+On-disk raster tile cache shared by the worker processes of a host.
+
+Tiles are the bands a backend returns for a scene over a job's area, keyed by
+(satellite, scene, band, tile) and stored one ``.npy`` file each:
+
+    <root>/<satellite>/<scene_id>/<tile>/<band>.npy
+
+Reads memory-map the file, so every process shares the same page-cache pages
+and nothing is copied or decoded again. Writes go to a temporary file renamed
+into place, so readers never see a partial tile. Eviction is least recently
+used by file mtime (bumped on every hit) under a byte budget, serialised across
+processes with a lock file; unlinking a tile another process still maps is
+safe, the mapping stays valid until released.
+"""
+import fcntl
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from datetime import date
+from typing import List, Optional, Tuple
+import numpy as np
+from cachetools import TTLCache
+from prometheus_client import Counter
+from config.service_config import ImageryConfig
+from services.satellite_data_service import BBox, ImageryBackend, Raster, Scene
+
+logger = logging.getLogger(__name__)
+
+TILE_CACHE_REQUESTS = Counter(
+    "imagery_tile_cache_requests_total",
+    "Raster tile cache lookups",
+    ["result"]
+)
+
+CLOUD_MASK_BAND = "_cloud_mask"
+
+def tile_key(bbox: BBox, size: int) -> str:
+    """Tile identifier of a raster extent: bbox (to ~1 m) and raster size."""
+    extent = ",".join(f"{value:.5f}" for value in bbox)
+    return f"{hashlib.sha1(extent.encode()).hexdigest()[:16]}_{size}"
+
+class TileCache:
+    """Byte-budgeted LRU cache of memory-mapped raster tiles."""
+
+    def __init__(self, root: str, max_bytes: int, low_watermark: float = 0.9):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.low_watermark = low_watermark
+        # Scan for eviction after writing this much, rather than on every write
+        self.check_every_bytes = max(max_bytes // 20, 1)
+        self._written_since_check = 0
+        # Fetch workers run threads that share the cache
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, satellite_type: str, scene_id: str, tile: str, band: str) -> str:
+        return os.path.join(self.root, _safe(satellite_type), _safe(scene_id), tile, f"{_safe(band)}.npy")
+
+    def get(self, satellite_type: str, scene_id: str, tile: str, band: str) -> Optional[np.ndarray]:
+        """Read-only memory map of a cached tile, or None."""
+        path = self.path(satellite_type, scene_id, tile, band)
+        try:
+            array = np.load(path, mmap_mode="r")
+        except FileNotFoundError:
+            TILE_CACHE_REQUESTS.labels(result="miss").inc()
+            return None
+        except (ValueError, OSError) as e:
+            logger.warning(f"Dropping unreadable tile {path}: {str(e)}")
+            self._remove(path)
+            TILE_CACHE_REQUESTS.labels(result="miss").inc()
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass  # evicted meanwhile; the mapping stays valid
+        TILE_CACHE_REQUESTS.labels(result="hit").inc()
+        return array
+
+    def put(self, satellite_type: str, scene_id: str, tile: str, band: str, array: np.ndarray) -> np.ndarray:
+        """Store a tile and return it memory-mapped from the cache."""
+        path = self.path(satellite_type, scene_id, tile, band)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                np.save(file, np.ascontiguousarray(array), allow_pickle=False)
+            # Map before the rename: the mapping follows the file even if another process evicts it
+            mapped = np.load(temp_path, mmap_mode="r")
+            os.replace(temp_path, path)
+        except BaseException:
+            self._remove(temp_path)
+            raise
+
+        with self._lock:
+            self._written_since_check += array.nbytes
+            due = self._written_since_check >= self.check_every_bytes
+            if due:
+                self._written_since_check = 0
+        if due:
+            self.evict()
+        return mapped
+
+    def evict(self) -> int:
+        """Delete least recently used tiles until under the low watermark. Returns bytes freed."""
+        with open(os.path.join(self.root, ".lock"), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                entries = self._scan()
+                total = sum(size for _, size, _ in entries)
+                if total <= self.max_bytes:
+                    return 0
+                target = int(self.max_bytes * self.low_watermark)
+                freed = 0
+                for path, size, _ in sorted(entries, key=lambda entry: entry[2]):
+                    if total - freed <= target:
+                        break
+                    if self._remove(path):
+                        freed += size
+                logger.info(f"Tile cache evicted {freed} bytes ({total} -> {total - freed})")
+                return freed
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def usage(self) -> int:
+        return sum(size for _, size, _ in self._scan())
+
+    def _scan(self) -> List[Tuple[str, int, float]]:
+        """(path, bytes, mtime) of every cached tile and of temporary files abandoned by crashed writers."""
+        abandoned_before = time.time() - 3600
+        entries = []
+        stack = [self.root]
+        while stack:
+            try:
+                iterator = os.scandir(stack.pop())
+            except FileNotFoundError:
+                continue
+            with iterator:
+                for entry in iterator:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.name.endswith(".npy"):
+                            stat = entry.stat(follow_symlinks=False)
+                            entries.append((entry.path, stat.st_size, stat.st_mtime))
+                        elif entry.name.endswith(".tmp"):
+                            stat = entry.stat(follow_symlinks=False)
+                            if stat.st_mtime < abandoned_before:
+                                entries.append((entry.path, stat.st_size, 0.0))
+                    except FileNotFoundError:
+                        continue
+        return entries
+
+    @staticmethod
+    def _remove(path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+def _safe(name: str) -> str:
+    return "".join(char if char.isalnum() or char in "-_." else "_" for char in name)
+
+class CachedImageryBackend(ImageryBackend):
+    """
+    Imagery backend serving bands and cloud masks from a ``TileCache``.
+
+    Misses are read from the wrapped backend and written through. Scene
+    searches are kept per process for ``search_ttl`` seconds, so repeat jobs on
+    the same area do not touch the network at all.
+    """
+
+    def __init__(self, backend: ImageryBackend, cache: TileCache, search_ttl: int = 3600):
+        self.backend = backend
+        self.cache = cache
+        self.name = backend.name
+        self._searches: TTLCache = TTLCache(maxsize=1024, ttl=search_ttl)
+        # TTLCache is not thread-safe; fetch workers search from several threads
+        self._searches_lock = threading.Lock()
+
+    @classmethod
+    def wrap(cls, backend: ImageryBackend, config: ImageryConfig) -> "CachedImageryBackend":
+        return cls(backend, TileCache(config.tile_cache_dir, config.tile_cache_max_bytes), config.scene_search_ttl)
+
+    def search_scenes(
+        self,
+        satellite_type: str,
+        bbox: BBox,
+        start_date: date,
+        end_date: date,
+        max_cloud_coverage: float
+    ) -> List[Scene]:
+        key = (satellite_type, tuple(round(value, 5) for value in bbox), start_date, end_date, max_cloud_coverage)
+        with self._searches_lock:
+            scenes = self._searches.get(key)
+        if scenes is None:
+            scenes = self.backend.search_scenes(satellite_type, bbox, start_date, end_date, max_cloud_coverage)
+            with self._searches_lock:
+                self._searches[key] = scenes
+        return list(scenes)
+
+    def window(self, scene: Scene, bbox: BBox) -> Scene:
+        return self.backend.window(scene, bbox)
+
+    def read_band(self, scene: Scene, band: str) -> Raster:
+        return self._cached(scene, band, lambda: self.backend.read_band(scene, band))
+
+    def read_cloud_mask(self, scene: Scene) -> Optional[np.ndarray]:
+        return self._cached(scene, CLOUD_MASK_BAND, lambda: self.backend.read_cloud_mask(scene))
+
+    def _cached(self, scene: Scene, band: str, load) -> Optional[np.ndarray]:
+        tile = tile_key(scene.bbox, scene.size)
+        array = self.cache.get(scene.satellite_type, scene.scene_id, tile, band)
+        if array is not None:
+            return array
+        array = load()
+        if array is None:
+            return None
+        try:
+            return self.cache.put(scene.satellite_type, scene.scene_id, tile, band, array)
+        except OSError as e:
+            # A full or read-only disk must not fail the job
+            logger.warning(f"Tile cache write failed: {str(e)}")
+            return array
@@ -9,6 +9,6 @@ from . import pipeline_tasks
 from . import monitoring
 
 # Export specific tasks that might be imported elsewhere
-from .job_processor import process_geospatial_job
+from .job_processor import process_geospatial_job, process_geospatial_job_batch
 from .pipeline_tasks import execute_job_discovery_pipeline
 from .monitoring import health_check
\ No newline at end of file
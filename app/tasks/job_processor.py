@@ -1,9 +1,14 @@
 import logging
+import time
 from datetime import datetime, UTC
 from uuid import UUID
 from config.celery_config import celery_app
 from database import SessionLocal, RepositoryFactory
-from database.repositories.job_run_repository import JobRunUpdate
+from database.repositories.job_run_log_repository import JobRunLogBuffer, MultiRunLogBuffer
+from services.job_executor import execute_job, execute_job_batch
+from tasks.worker_runtime import get_job_definition_cache
+from utils.cache import get_response_cache, JOBS_TAG, job_tag, job_runs_tag
+from utils.task_serialization import resolve_payload
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -26,109 +31,151 @@ def process_geospatial_job(task_payload: dict):
         repo_factory = RepositoryFactory(session)
         
         try:
-            # Get job definition
-            job = repo_factory.job_definition.get(UUID(job_id))
-            if not job:
-                raise ValueError(f"Job {job_id} not found")
+            # Run status and job definition in one joined query; the definition comes
+            # from this worker's cache while its version is unchanged
+            job, run_status = get_job_definition_cache().load_for_run(repo_factory, UUID(job_id), UUID(run_id))
+            if run_status != "running":
+                # Redelivered task of a run that already finished (or was cancelled)
+                logger.warning(f"Job run {run_id} is {run_status}; not executing it again")
+                return
+            # A large override was stored in Redis and the task carries a reference to it
+            override_payload = resolve_payload(override_payload)
             
-            # Get job run
-            job_run = repo_factory.job_run.get(UUID(run_id))
-            if not job_run:
-                raise ValueError(f"Job run {run_id} not found")
-            
-            logger.info(f"Processing job: {job.job_name} (type: {job.job_type})")
+            job_name = job.job_name
+            logger.info(f"Processing job: {job_name} (type: {job.job_type})")
             logger.info(f"Target function: {job.target_function}")
             
-            # Simulate processing based on job type
-            output_summary = simulate_job_processing(job, override_payload)
+            # Buffer run logs and write them in batches to job_run_logs
+            started = time.perf_counter()
+            with JobRunLogBuffer(repo_factory.job_run_log, UUID(run_id)) as run_log:
+                run_log.log(f"Processing job {job_name}", job_type=job.job_type, target_function=job.target_function)
+                
+                # Dispatch to the handler registered for the job's target function
+                output_summary = execute_job(job, override_payload, run_log=run_log)
+                
+                run_log.log(f"Job {job_name} processing finished", timing_ms=output_summary["timing_ms"])
+            processing_seconds = time.perf_counter() - started
             
-            # Update job run as successful
-            update_data = JobRunUpdate(
-                status="success",
-                log_message={
-                    "info": f"Job {job.job_name} completed successfully",
-                    "processing_time": "45 seconds",
-                    "timestamp": datetime.now(UTC).isoformat()
-                },
-                output_summary=output_summary
+            # Run outcome and job last run time in one transaction; a run already in a
+            # terminal state is left untouched
+            completed = repo_factory.job_run.complete_runs(
+                [{
+                    "id": UUID(run_id),
+                    "status": "success",
+                    "output_summary": output_summary,
+                    "log_message": {
+                        "info": f"Job {job_name} completed successfully",
+                        "processing_time": f"{processing_seconds:.2f} seconds",
+                        "processing_time_ms": round(processing_seconds * 1000, 2),
+                        "timestamp": datetime.now(UTC).isoformat()
+                    }
+                }],
+                [UUID(job_id)]
             )
+            if not completed:
+                logger.warning(f"Job run {run_id} was no longer running; completion not recorded")
             
-            repo_factory.job_run.update(job_run, update_data)
-            
-            # Update job definition last run time
-            repo_factory.job_definition.update_last_run(UUID(job_id))
+            get_response_cache().invalidate_sync(JOBS_TAG, job_tag(job_id), job_runs_tag(job_id))
             
             logger.info(f"Job {job_id} completed successfully")
             
         except Exception as e:
             logger.error(f"Job {job_id} failed: {str(e)}")
             
-            # Update job run as failed
-            if 'job_run' in locals():
-                update_data = JobRunUpdate(
-                    status="failed",
-                    log_message={
-                        "error": str(e),
-                        "timestamp": datetime.now(UTC).isoformat()
-                    }
-                )
-                repo_factory.job_run.update(job_run, update_data)
+            # Update job run as failed, also when its job definition was not found; a run
+            # no longer running is left untouched
+            session.rollback()
+            repo_factory.job_run.mark_as_failed(UUID(run_id), str(e))
+            get_response_cache().invalidate_sync(job_runs_tag(job_id))
             
             raise
 
-def simulate_job_processing(job, override_payload=None):
-    """
-    Simulate geospatial job processing based on job type.
-    In a real implementation, this would call actual processing pipelines.
+@celery_app.task(name="tasks.job_processor.process_geospatial_job_batch")
+def process_geospatial_job_batch(task_payload: dict):
     """
-    payload = override_payload or job.payload
-    job_type = job.job_type
+    Process a batch of compatible geospatial jobs in one task.
     
-    logger.info(f"Simulating processing for job type: {job_type}")
-    logger.info(f"Processing payload with coordinates: {payload.get('coordinates', 'N/A')}")
-    logger.info(f"Satellite type: {payload.get('satellite_type', 'N/A')}")
+    Job definitions come from the worker cache (one version query, loading only
+    new or changed ones), the jobs share one scene search while each reads and
+    reduces its own window (see ``execute_job_batch``), and their runs are
+    finished in one transaction.
     
-    # Simulate different processing based on job type
-    if job_type == "fetch_data":
-        return {
-            "status": "completed",
-            "data_fetched": True,
-            "satellite_images": 3,
-            "cloud_coverage": 15.2,
-            "processing_method": "sentinel-2-data-fetch"
-        }
-    
-    elif job_type == "metric_calc":
-        return {
-            "status": "completed",
-            "metrics_calculated": {
-                "ndvi_mean": 0.65,
-                "ndvi_std": 0.12,
-                "ndwi_mean": 0.23,
-                "ndmi_mean": 0.45
-            },
-            "area_analyzed_hectares": 1250.5
-        }
-    
-    elif job_type == "anomaly_detection":
-        return {
-            "status": "completed",
-            "anomalies_detected": 2,
-            "anomaly_types": ["ndvi_drop", "seasonal_deviation"],
-            "confidence_scores": [0.87, 0.92]
-        }
+    Args:
+        task_payload: Dictionary with batch_id and jobs, a list of {job_id, run_id, override_payload}
+    """
+    batch_id = task_payload.get("batch_id")
+    entries = task_payload.get("jobs") or []
+    run_ids = {entry["job_id"]: entry["run_id"] for entry in entries}
+    overrides = {entry["job_id"]: entry["override_payload"] for entry in entries if entry.get("override_payload")}
     
-    elif job_type == "change_analysis":
-        return {
-            "status": "completed",
-            "change_percentage": 12.3,
-            "change_type": "vegetation_loss",
-            "affected_area_hectares": 45.2
-        }
+    logger.info(f"Starting geospatial job batch {batch_id} with {len(entries)} jobs")
     
-    else:
-        return {
-            "status": "completed",
-            "message": f"Generic processing completed for {job_type}",
-            "processing_time_seconds": 42
-        }
\ No newline at end of file
+    with SessionLocal() as session:
+        repo_factory = RepositoryFactory(session)
+        
+        try:
+            jobs = get_job_definition_cache().load_many(repo_factory, [UUID(job_id) for job_id in run_ids])
+            found = {str(job.id) for job in jobs}
+            errors = {job_id: f"Job {job_id} not found" for job_id in run_ids if job_id not in found}
+            overrides = {job_id: resolve_payload(override) for job_id, override in overrides.items()}
+            
+            started = time.perf_counter()
+            with MultiRunLogBuffer(repo_factory.job_run_log) as run_log:
+                run_logs = {str(job.id): run_log.for_run(UUID(run_ids[str(job.id)])) for job in jobs}
+                for job in jobs:
+                    run_logs[str(job.id)].log(
+                        f"Processing job {job.job_name} in batch {batch_id}",
+                        job_type=job.job_type,
+                        target_function=job.target_function,
+                        batch_size=len(entries)
+                    )
+                outputs, job_errors = execute_job_batch(jobs, overrides, run_logs=run_logs)
+                errors.update(job_errors)
+            processing_seconds = time.perf_counter() - started
+            
+            finished_at = datetime.now(UTC).isoformat()
+            results = [
+                {
+                    "id": UUID(run_ids[job_id]),
+                    "status": "success",
+                    "output_summary": output,
+                    "log_message": {
+                        "info": f"Job completed successfully in batch {batch_id}",
+                        # The job's own share; the whole batch took batch_processing_time_ms
+                        "processing_time": f"{output['timing_ms']['total'] / 1000:.2f} seconds",
+                        "processing_time_ms": output["timing_ms"]["total"],
+                        "batch_processing_time_ms": round(processing_seconds * 1000, 2),
+                        "timestamp": finished_at
+                    }
+                }
+                for job_id, output in outputs.items()
+            ]
+            results += [
+                {
+                    "id": UUID(run_ids[job_id]),
+                    "status": "failed",
+                    "log_message": {"error": error, "timestamp": finished_at}
+                }
+                for job_id, error in errors.items()
+            ]
+            # Every run's own outcome and the jobs' last run time, in one transaction
+            finished = repo_factory.job_run.complete_runs(results, [UUID(job_id) for job_id in outputs])
+            if finished < len(results):
+                logger.warning(f"Batch {batch_id}: {len(results) - finished} runs were no longer running; outcome not recorded")
+            
+            get_response_cache().invalidate_sync(
+                JOBS_TAG,
+                *[job_tag(job_id) for job_id in run_ids],
+                *[job_runs_tag(job_id) for job_id in run_ids]
+            )
+            
+            logger.info(f"Batch {batch_id} finished: {len(outputs)} succeeded, {len(errors)} failed")
+            return {"batch_id": batch_id, "succeeded": len(outputs), "failed": len(errors)}
+            
+        except Exception as e:
+            logger.error(f"Batch {batch_id} failed: {str(e)}")
+            
+            session.rollback()
+            repo_factory.job_run.mark_many_failed([UUID(run_id) for run_id in run_ids.values()], str(e))
+            get_response_cache().invalidate_sync(*[job_runs_tag(job_id) for job_id in run_ids])
+            raise
@@ -0,0 +1,98 @@
+"""
+Per-worker state reused across geospatial tasks.
+
+Job definitions rarely change between runs, so each worker process keeps
+copies of the ones it has executed, keyed by the definition's ``version``
+(bumped whenever an execution field changes). A task then checks its run
+and the job's version in one joined query and only loads the definition
+when it is new or stale.
+"""
+import logging
+import threading
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+from cachetools import LRUCache
+from config.settings import get_settings
+from database import RepositoryFactory
+
+logger = logging.getLogger(__name__)
+
+class JobSnapshot:
+    """Read-only copy of the job definition fields the executor reads."""
+
+    __slots__ = ("id", "job_name", "job_type", "target_function", "payload", "version")
+
+    def __init__(self, id: UUID, job_name: str, job_type: str, target_function: str, payload: Dict[str, Any], version: int):
+        self.id = id
+        self.job_name = job_name
+        self.job_type = job_type
+        self.target_function = target_function
+        self.payload = payload
+        self.version = version
+
+    @classmethod
+    def from_model(cls, job) -> "JobSnapshot":
+        return cls(job.id, job.job_name, job.job_type, job.target_function, job.payload, job.version)
+
+class JobDefinitionCache:
+    """LRU cache of job snapshots by job id, valid while the stored version matches."""
+
+    def __init__(self, maxsize: int):
+        self.enabled = maxsize > 0
+        self._jobs: LRUCache = LRUCache(maxsize=max(maxsize, 1))
+        # Thread-pool workers share the process's cache
+        self._lock = threading.Lock()
+
+    def get(self, job_id: UUID, version: Optional[int] = None) -> Optional[JobSnapshot]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None or (version is not None and job.version != version):
+            return None
+        return job
+
+    def put(self, job) -> JobSnapshot:
+        snapshot = JobSnapshot.from_model(job)
+        if self.enabled:
+            with self._lock:
+                self._jobs[snapshot.id] = snapshot
+        return snapshot
+
+    def clear(self) -> None:
+        with self._lock:
+            self._jobs.clear()
+
+    def load_for_run(self, repo_factory: RepositoryFactory, job_id: UUID, run_id: UUID) -> Tuple[JobSnapshot, str]:
+        """
+        A run's job definition and current status.
+
+        One joined query: with a cached definition it only reads the run
+        status and the job's version; otherwise it also loads the definition.
+        """
+        cached = self.get(job_id)
+        row = repo_factory.job_run.get_for_execution(run_id, job_id, with_definition=cached is None)
+        if row is None:
+            raise ValueError(f"Job run {run_id} of job {job_id} not found")
+        status, version, job = row
+        if job is None and cached.version != version:
+            # Changed since it was cached
+            job = repo_factory.job_definition.get(job_id)
+            if job is None:
+                raise ValueError(f"Job {job_id} not found")
+        return (self.put(job) if job is not None else cached), status
+
+    def load_many(self, repo_factory: RepositoryFactory, job_ids: List[UUID]) -> List[JobSnapshot]:
+        """Definitions of existing jobs: versions in one query, then only new or stale ones loaded."""
+        if not self.enabled:
+            return [self.put(job) for job in repo_factory.job_definition.get_many(job_ids)]
+        versions = repo_factory.job_definition.get_versions(job_ids)
+        jobs = {job_id: self.get(job_id, version) for job_id, version in versions.items()}
+        missing = [job_id for job_id, job in jobs.items() if job is None]
+        for job in repo_factory.job_definition.get_many(missing):
+            jobs[job.id] = self.put(job)
+        return [jobs[job_id] for job_id in job_ids if jobs.get(job_id) is not None]
+
+@lru_cache
+def get_job_definition_cache() -> JobDefinitionCache:
+    """This worker process's job definition cache."""
+    return JobDefinitionCache(get_settings().worker.job_cache_size)
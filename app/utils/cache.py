@@ -0,0 +1,322 @@
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from cachetools import TTLCache
+from fastapi import Request, Response, status
+from config.settings import get_settings
+from utils.serialization import dumps_json
+
+logger = logging.getLogger(__name__)
+
+CachedBody = Tuple[str, bytes]  # (etag, body)
+
+# Invalidation tags for job read endpoints
+JOBS_TAG = "jobs"
+
+def job_tag(job_id: Any) -> str:
+    return f"job:{job_id}"
+
+def job_runs_tag(job_id: Any) -> str:
+    return f"job_runs:{job_id}"
+
+class ResponseCache:
+    """
+    Two-tier cache for serialised API responses.
+
+    A short-lived in-process TTL/LRU tier sits in front of Redis. Concurrent misses
+    on the same key are coalesced into a single load. Entries are tagged (for
+    example ``job:<id>`` or ``jobs``) and every tag has a generation counter in
+    Redis that is part of the entry's Redis key: ``invalidate`` increments the
+    counters, so every instance stops finding the old entries at once, and drops
+    the tagged entries from the local tier of this process; other processes'
+    local tiers converge within ``local_ttl`` seconds. A fill that started before
+    an invalidation is stored under the old generation (unreachable in Redis) and
+    not kept locally.
+
+    Redis errors never fail a request: the cache degrades to the local tier and
+    skips Redis for ``redis_retry_after`` seconds. Invalidations that could not
+    reach Redis are replayed before Redis is read or written again.
+    """
+
+    def __init__(
+        self,
+        redis_url: str,
+        ttl: int = 3600,
+        local_ttl: int = 5,
+        local_maxsize: int = 1024,
+        prefix: str = "gds:cache",
+        redis_retry_after: int = 30
+    ):
+        self.redis_url = redis_url
+        self.ttl = ttl
+        self.prefix = prefix
+        self.redis_retry_after = redis_retry_after
+        self._local: TTLCache = TTLCache(maxsize=local_maxsize, ttl=local_ttl)
+        self._local_tags: Dict[str, Set[str]] = {}
+        # Invalidations seen by this process, per tag
+        self._local_generations: Dict[str, int] = {}
+        self._pending_invalidations: Set[str] = set()
+        # invalidate_sync runs on worker threads while the event loop reads the local tier
+        self._local_lock = threading.Lock()
+        self._inflight: Dict[Tuple[str, Tuple[int, ...]], asyncio.Future] = {}
+        self._redis = None
+        self._sync_redis = None
+        self._redis_down_until = 0.0
+
+    @staticmethod
+    def make_key(endpoint: str, **params: Any) -> str:
+        """Build a cache key from an endpoint name and its (filter) parameters."""
+        normalized = json.dumps(
+            {k: v for k, v in params.items() if v is not None},
+            sort_keys=True,
+            default=str
+        )
+        return f"{endpoint}:{hashlib.sha1(normalized.encode()).hexdigest()}"
+
+    @staticmethod
+    def make_etag(body: bytes) -> str:
+        return f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+
+    async def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[bytes]],
+        tags: Iterable[str] = ()
+    ) -> CachedBody:
+        """Return the cached (etag, body) for key, loading it once on a miss."""
+        with self._local_lock:
+            cached = self._local.get(key)
+        if cached is not None:
+            return cached
+
+        tags = sorted(set(tags))
+        local_generations = self._local_generation(tags)
+        entry_key = await self._versioned_key(key, tags)
+        # Requests after an invalidation never join a load that started before it
+        inflight_key = (entry_key or key, local_generations)
+        inflight = self._inflight.get(inflight_key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[inflight_key] = future
+        try:
+            cached = await self._redis_get(entry_key)
+            if cached is None:
+                body = await loader()
+                cached = (self.make_etag(body), body)
+                if self._local_generation(tags) == local_generations:
+                    await self._redis_set(entry_key, cached)
+            self._store_local(key, cached, tags, local_generations)
+            future.set_result(cached)
+            return cached
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so waiters-less failures do not log "never retrieved"
+            future.exception()
+            raise
+        finally:
+            del self._inflight[inflight_key]
+
+    async def invalidate(self, *tags: str) -> None:
+        """Drop every entry carrying one of the tags."""
+        self._invalidate_local(tags)
+        await self._flush_invalidations(self._get_redis())
+
+    def invalidate_sync(self, *tags: str) -> None:
+        """Blocking variant of ``invalidate`` for Celery workers."""
+        self._invalidate_local(tags)
+        client = self._get_sync_redis()
+        pending = self._pending()
+        if client is None or not pending:
+            return
+        try:
+            pipe = client.pipeline(transaction=False)
+            for tag in pending:
+                pipe.incr(self._generation_key(tag))
+            pipe.execute()
+        except Exception as e:
+            self._redis_failed(e)
+            return
+        self._flushed(pending)
+
+    async def _flush_invalidations(self, client) -> bool:
+        """Apply invalidations Redis has not seen yet; False if it is unavailable."""
+        if client is None:
+            return False
+        pending = self._pending()
+        if not pending:
+            return True
+        try:
+            pipe = client.pipeline(transaction=False)
+            for tag in pending:
+                pipe.incr(self._generation_key(tag))
+            await pipe.execute()
+        except Exception as e:
+            self._redis_failed(e)
+            return False
+        self._flushed(pending)
+        return True
+
+    async def _versioned_key(self, key: str, tags: List[str]) -> Optional[str]:
+        """Redis key of the entry under the tags' current generations; None without Redis."""
+        client = self._get_redis()
+        if not await self._flush_invalidations(client):
+            return None
+        generations = []
+        if tags:
+            try:
+                generations = await client.mget([self._generation_key(tag) for tag in tags])
+            except Exception as e:
+                self._redis_failed(e)
+                return None
+        version = ".".join(str(int(generation or 0)) for generation in generations)
+        return f"{self.prefix}:entry:{key}:{version}"
+
+    def _local_generation(self, tags: Iterable[str]) -> Tuple[int, ...]:
+        with self._local_lock:
+            return tuple(self._local_generations.get(tag, 0) for tag in tags)
+
+    def _store_local(self, key: str, cached: CachedBody, tags: List[str], generations: Tuple[int, ...]) -> None:
+        """Keep a loaded entry locally unless one of its tags was invalidated since the load started."""
+        with self._local_lock:
+            if tuple(self._local_generations.get(tag, 0) for tag in tags) != generations:
+                return
+            self._local[key] = cached
+            for tag in tags:
+                keys = self._local_tags.setdefault(tag, set())
+                keys.add(key)
+                if len(keys) > self._local.maxsize:
+                    # Forget keys the TTL/LRU tier has already evicted
+                    keys.intersection_update(self._local.keys())
+
+    def _invalidate_local(self, tags: Iterable[str]) -> None:
+        with self._local_lock:
+            for tag in tags:
+                self._local_generations[tag] = self._local_generations.get(tag, 0) + 1
+                for key in self._local_tags.pop(tag, ()):
+                    self._local.pop(key, None)
+            self._pending_invalidations.update(tags)
+
+    def _pending(self) -> Dict[str, int]:
+        """Tags awaiting a Redis invalidation, with their local generation."""
+        with self._local_lock:
+            return {tag: self._local_generations.get(tag, 0) for tag in self._pending_invalidations}
+
+    def _flushed(self, pending: Dict[str, int]) -> None:
+        # A tag invalidated again during the flush needs another increment
+        with self._local_lock:
+            for tag, generation in pending.items():
+                if self._local_generations.get(tag, 0) == generation:
+                    self._pending_invalidations.discard(tag)
+
+    def _generation_key(self, tag: str) -> str:
+        # No expiry: a counter restarting from 0 could make old entries reachable again
+        return f"{self.prefix}:generation:{tag}"
+
+    async def _redis_get(self, entry_key: Optional[str]) -> Optional[CachedBody]:
+        client = self._get_redis()
+        if client is None or entry_key is None:
+            return None
+        try:
+            raw = await client.get(entry_key)
+        except Exception as e:
+            self._redis_failed(e)
+            return None
+        if raw is None:
+            return None
+        etag, _, body = raw.partition(b"|")
+        return etag.decode(), body
+
+    async def _redis_set(self, entry_key: Optional[str], cached: CachedBody) -> None:
+        client = self._get_redis()
+        if client is None or entry_key is None:
+            return
+        etag, body = cached
+        try:
+            await client.set(entry_key, etag.encode() + b"|" + body, ex=self.ttl)
+        except Exception as e:
+            self._redis_failed(e)
+
+    def _get_redis(self):
+        if time.monotonic() < self._redis_down_until:
+            return None
+        if self._redis is None:
+            import redis.asyncio as aioredis
+            self._redis = aioredis.from_url(self.redis_url, **get_settings().redis.client_options)
+        return self._redis
+
+    def _get_sync_redis(self):
+        if time.monotonic() < self._redis_down_until:
+            return None
+        if self._sync_redis is None:
+            import redis
+            self._sync_redis = redis.Redis.from_url(self.redis_url, **get_settings().redis.client_options)
+        return self._sync_redis
+
+    def _redis_failed(self, error: Exception) -> None:
+        logger.warning(f"Response cache Redis unavailable, using local tier only: {str(error)}")
+        self._redis_down_until = time.monotonic() + self.redis_retry_after
+
+@lru_cache
+def get_response_cache() -> ResponseCache:
+    """Get the process-wide response cache."""
+    settings = get_settings()
+    return ResponseCache(
+        settings.redis.url,
+        ttl=settings.redis.default_ttl,
+        local_ttl=settings.redis.cache_local_ttl,
+        local_maxsize=settings.redis.cache_local_maxsize
+    )
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Whether an If-None-Match header lists etag, compared weakly (RFC 9110
+    13.1.2): ``W/`` prefixes are ignored, as compression marks responses weak.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for token in if_none_match.split(","):
+        token = token.strip()
+        if token.startswith("W/"):
+            token = token[2:]
+        if token == opaque:
+            return True
+    return False
+
+async def cached_response(
+    request: Request,
+    key: str,
+    loader: Callable[[], Awaitable[Any]],
+    tags: Iterable[str] = (),
+    cache: Optional[ResponseCache] = None
+) -> Response:
+    """
+    Serve a JSON response through the response cache with ETag support.
+
+    ``loader`` returns a Pydantic model or plain data; its JSON is cached. A matching
+    ``If-None-Match`` header yields an empty 304 response.
+    """
+    cache = cache or get_response_cache()
+
+    async def load_body() -> bytes:
+        return dumps_json(await loader())
+
+    if not get_settings().redis.cache_enabled:
+        body = await load_body()
+        etag = ResponseCache.make_etag(body)
+    else:
+        etag, body = await cache.get_or_load(key, load_body, tags)
+
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
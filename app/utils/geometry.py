@@ -0,0 +1,341 @@
+"""
+Polygon geometry on [lon, lat] rings (WGS84 degrees), vectorised with NumPy.
+
+Rings are (n, 2) float64 arrays without the closing point. Areas are exact
+on the authalic sphere (same surface area as the WGS84 ellipsoid), so they
+are equal-area accurate for field-sized polygons; edge lengths use Lambert's
+ellipsoidal formula, within a few metres over thousands of kilometres.
+Simplification works in a local metric projection so tolerances are metres.
+"""
+import heapq
+import math
+from typing import List, Sequence, Tuple
+import numpy as np
+
+BBox = Tuple[float, float, float, float]  # (min_lon, min_lat, max_lon, max_lat)
+
+WGS84_A = 6378137.0
+WGS84_F = 1 / 298.257223563
+WGS84_E2 = WGS84_F * (2 - WGS84_F)
+# Radius of the sphere with the surface area of the ellipsoid
+AUTHALIC_RADIUS = 6371007.180918475
+
+def planar_points(coordinates: Sequence[Sequence[float]]) -> np.ndarray:
+    """(n, 2) float64 array of the [lon, lat] of each point, dropping extra dimensions such as altitude."""
+    points = np.asarray([point[:2] for point in coordinates], dtype=np.float64)
+    if points.ndim != 2 or points.shape[1] != 2:
+        raise ValueError("Coordinates must be a list of [lon, lat] pairs")
+    return points
+
+def as_ring(coordinates: Sequence[Sequence[float]]) -> np.ndarray:
+    """(n, 2) float64 array of [lon, lat] pairs, without a repeated closing point; extra dimensions are dropped."""
+    points = planar_points(coordinates)
+    if len(points) > 1 and np.array_equal(points[0], points[-1]):
+        points = points[:-1]
+    return points
+
+def bbox(ring: np.ndarray) -> BBox:
+    """Bounding box of a ring."""
+    min_lon, min_lat = ring.min(axis=0)
+    max_lon, max_lat = ring.max(axis=0)
+    return (float(min_lon), float(min_lat), float(max_lon), float(max_lat))
+
+def _authalic_latitude(lat: np.ndarray) -> np.ndarray:
+    """Latitude on the authalic sphere (radians in, radians out)."""
+    e = math.sqrt(WGS84_E2)
+    sin_lat = np.sin(lat)
+
+    def q(sine):
+        return (1 - WGS84_E2) * (sine / (1 - WGS84_E2 * sine ** 2) - np.log((1 - e * sine) / (1 + e * sine)) / (2 * e))
+
+    return np.arcsin(np.clip(q(sin_lat) / q(np.float64(1.0)), -1.0, 1.0))
+
+def signed_area_m2(ring: np.ndarray) -> float:
+    """Signed geodesic area in m²; positive for counter-clockwise rings."""
+    if len(ring) < 3:
+        return 0.0
+    lon = np.radians(ring[:, 0])
+    lat = _authalic_latitude(np.radians(ring[:, 1]))
+    lon_next, lat_next = np.roll(lon, -1), np.roll(lat, -1)
+    # Spherical excess between each edge and the equator, taken westwards so
+    # counter-clockwise rings come out positive
+    delta = np.remainder(lon - lon_next + np.pi, 2 * np.pi) - np.pi
+    t1, t2 = np.tan(lat / 2), np.tan(lat_next / 2)
+    excess = 2 * np.arctan2(np.tan(delta / 2) * (t1 + t2), 1 + t1 * t2)
+    return float(excess.sum() * AUTHALIC_RADIUS ** 2)
+
+def area_m2(ring: np.ndarray) -> float:
+    """Geodesic area in m²."""
+    return abs(signed_area_m2(ring))
+
+def area_hectares(ring: np.ndarray) -> float:
+    return area_m2(ring) / 10_000
+
+def edge_lengths_m(ring: np.ndarray, closed: bool = True) -> np.ndarray:
+    """Ellipsoidal length of each edge in metres (Lambert's formula)."""
+    start = ring if closed else ring[:-1]
+    end = np.roll(ring, -1, axis=0) if closed else ring[1:]
+    lon1, lon2 = np.radians(start[:, 0]), np.radians(end[:, 0])
+    # Reduced latitudes
+    beta1 = np.arctan((1 - WGS84_F) * np.tan(np.radians(start[:, 1])))
+    beta2 = np.arctan((1 - WGS84_F) * np.tan(np.radians(end[:, 1])))
+    # Central angle on the sphere (haversine, stable for short edges)
+    h = np.sin((beta2 - beta1) / 2) ** 2 + np.cos(beta1) * np.cos(beta2) * np.sin((lon2 - lon1) / 2) ** 2
+    sigma = 2 * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0)))
+
+    p, q = (beta1 + beta2) / 2, (beta2 - beta1) / 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x = (sigma - np.sin(sigma)) * np.sin(p) ** 2 * np.cos(q) ** 2 / np.cos(sigma / 2) ** 2
+        y = (sigma + np.sin(sigma)) * np.cos(p) ** 2 * np.sin(q) ** 2 / np.sin(sigma / 2) ** 2
+        lengths = WGS84_A * (sigma - WGS84_F / 2 * (x + y))
+    return np.where(sigma > 0, lengths, 0.0)
+
+def perimeter_m(ring: np.ndarray) -> float:
+    """Geodesic perimeter of a ring in metres."""
+    if len(ring) < 2:
+        return 0.0
+    return float(edge_lengths_m(ring, closed=len(ring) > 2).sum())
+
+def centroid(ring: np.ndarray) -> Tuple[float, float]:
+    """Area centroid [lon, lat] of a ring (planar, fine for field-sized polygons); vertex mean if degenerate."""
+    origin = ring[0]
+    x, y = (ring - origin).T
+    x_next, y_next = np.roll(x, -1), np.roll(y, -1)
+    cross = x * y_next - x_next * y
+    twice_area = cross.sum()
+    if len(ring) < 3 or abs(twice_area) < 1e-18:
+        lon, lat = ring.mean(axis=0)
+        return (float(lon), float(lat))
+    cx = ((x + x_next) * cross).sum() / (3 * twice_area)
+    cy = ((y + y_next) * cross).sum() / (3 * twice_area)
+    return (float(origin[0] + cx), float(origin[1] + cy))
+
+def to_local_metres(ring: np.ndarray) -> np.ndarray:
+    """Equirectangular projection around the ring's mean latitude, in metres."""
+    lat0 = math.radians(float(ring[:, 1].mean()))
+    scale = np.array([111_320 * math.cos(lat0), 110_540])
+    return (ring - ring.mean(axis=0)) * scale
+
+def self_intersections(ring: np.ndarray, block: int = 1024) -> List[Tuple[int, int]]:
+    """Pairs of non-adjacent edges (i, j), i < j, that cross or touch. Edge i runs from vertex i to i + 1."""
+    count = len(ring)
+    if count < 4:
+        return []
+    p, q = ring, np.roll(ring, -1, axis=0)
+    edge_min, edge_max = np.minimum(p, q), np.maximum(p, q)
+    columns = np.arange(count)
+
+    def orientation(a, b, c):
+        return np.sign((b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0]))
+
+    pairs: List[Tuple[int, int]] = []
+    # Candidate pairs by box overlap, a block of edges at a time, then exact tests on those only
+    for first in range(0, count, block):
+        rows = np.arange(first, min(first + block, count))
+        overlap = (
+            (edge_max[rows, np.newaxis, 0] >= edge_min[np.newaxis, :, 0])
+            & (edge_max[np.newaxis, :, 0] >= edge_min[rows, np.newaxis, 0])
+            & (edge_max[rows, np.newaxis, 1] >= edge_min[np.newaxis, :, 1])
+            & (edge_max[np.newaxis, :, 1] >= edge_min[rows, np.newaxis, 1])
+        )
+        # Only pairs i < j that do not share a vertex
+        overlap &= columns[np.newaxis] >= rows[:, np.newaxis] + 2
+        if rows[0] == 0:
+            overlap[0, count - 1] = False
+        i, j = np.nonzero(overlap)
+        if not i.size:
+            continue
+        i = rows[i]
+        # Collinear edges with overlapping boxes touch, so the box test settles that case
+        crossing = (orientation(p[i], q[i], p[j]) * orientation(p[i], q[i], q[j]) <= 0) & (orientation(p[j], q[j], p[i]) * orientation(p[j], q[j], q[i]) <= 0)
+        pairs.extend(zip(i[crossing].tolist(), j[crossing].tolist()))
+    return pairs
+
+def validity_issues(ring: np.ndarray) -> List[str]:
+    """Reasons a ring is not a valid polygon; empty when valid."""
+    issues = []
+    if not np.isfinite(ring).all():
+        issues.append("non_finite_coordinates")
+        return issues
+    if (np.abs(ring[:, 0]) > 180).any() or (np.abs(ring[:, 1]) > 90).any():
+        issues.append("out_of_range")
+    distinct = len(np.unique(ring, axis=0))
+    if distinct < 3:
+        issues.append("too_few_vertices")
+        return issues
+    if (np.all(ring == np.roll(ring, -1, axis=0), axis=1)).any():
+        issues.append("duplicate_vertices")
+    if self_intersections(_without_consecutive_duplicates(ring)):
+        issues.append("self_intersection")
+    if area_m2(ring) == 0:
+        issues.append("zero_area")
+    return issues
+
+def is_valid(ring: np.ndarray) -> bool:
+    return not validity_issues(ring)
+
+def _without_consecutive_duplicates(ring: np.ndarray) -> np.ndarray:
+    keep = ~np.all(ring == np.roll(ring, 1, axis=0), axis=1)
+    if not keep.any():
+        return ring[:1]
+    return ring[keep]
+
+def convex_hull(points: np.ndarray) -> np.ndarray:
+    """Counter-clockwise convex hull (monotone chain)."""
+    unique = np.unique(points, axis=0)
+    if len(unique) < 3:
+        return unique
+
+    def cross(o, a, b):
+        return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+    lower: List[np.ndarray] = []
+    for point in unique:
+        while len(lower) >= 2 and cross(lower[-2], lower[-1], point) <= 0:
+            lower.pop()
+        lower.append(point)
+    upper: List[np.ndarray] = []
+    for point in unique[::-1]:
+        while len(upper) >= 2 and cross(upper[-2], upper[-1], point) <= 0:
+            upper.pop()
+        upper.append(point)
+    return np.array(lower[:-1] + upper[:-1])
+
+def repair(ring: np.ndarray) -> Tuple[np.ndarray, List[str]]:
+    """
+    Make a ring a valid polygon where possible. Returns (ring, applied fixes).
+
+    Drops non-finite and repeated vertices and zero-width spikes, and orients
+    the ring counter-clockwise. A ring that still crosses itself is replaced by
+    its convex hull, the only repair that keeps every original vertex covered
+    without splitting the polygon.
+    """
+    fixes = []
+    finite = np.isfinite(ring).all(axis=1)
+    if not finite.all():
+        ring = ring[finite]
+        fixes.append("dropped_non_finite")
+    deduplicated = _without_consecutive_duplicates(ring)
+    if len(deduplicated) != len(ring):
+        ring = deduplicated
+        fixes.append("dropped_duplicates")
+
+    # Spikes: a vertex whose neighbours coincide adds no area
+    while len(ring) > 3:
+        spikes = np.all(np.roll(ring, 1, axis=0) == np.roll(ring, -1, axis=0), axis=1)
+        if not spikes.any():
+            break
+        ring = _without_consecutive_duplicates(ring[~spikes])
+        fixes.append("dropped_spikes")
+
+    if len(ring) < 3:
+        return ring, fixes + ["too_few_vertices"]
+    if self_intersections(ring):
+        ring = convex_hull(ring)
+        fixes.append("convex_hull")
+    if signed_area_m2(ring) < 0:
+        ring = ring[::-1].copy()
+        fixes.append("reoriented")
+    return ring, fixes
+
+def quantize(ring: np.ndarray, decimals: int = 6) -> np.ndarray:
+    """Round coordinates (6 decimals is ~0.1 m) and drop vertices that collapse together."""
+    return _without_consecutive_duplicates(np.round(ring, decimals))
+
+def _segment_distances(points: np.ndarray, start: np.ndarray, end: np.ndarray) -> np.ndarray:
+    """Distance of each point to the segment start-end."""
+    direction = end - start
+    length_sq = float(direction @ direction)
+    if length_sq == 0:
+        return np.hypot(*(points - start).T)
+    t = np.clip(((points - start) @ direction) / length_sq, 0.0, 1.0)
+    projection = start + t[:, np.newaxis] * direction
+    return np.hypot(*(points - projection).T)
+
+def douglas_peucker(ring: np.ndarray, tolerance_m: float) -> np.ndarray:
+    """
+    Douglas–Peucker simplification of a ring, keeping vertices farther than
+    tolerance_m from the simplified outline. Keeps at least three vertices.
+    """
+    if len(ring) <= 3 or tolerance_m <= 0:
+        return ring
+    metres = to_local_metres(ring)
+    # Close the ring on the vertex farthest from the first, so both halves are open polylines
+    far = int(np.argmax(np.hypot(*(metres - metres[0]).T)))
+    path = np.vstack([metres, metres[:1]])
+    keep = np.zeros(len(path), dtype=bool)
+    keep[[0, far, len(path) - 1]] = True
+
+    stack = [(0, far), (far, len(path) - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        distances = _segment_distances(path[first + 1:last], path[first], path[last])
+        index = int(np.argmax(distances))
+        if distances[index] > tolerance_m:
+            split = first + 1 + index
+            keep[split] = True
+            stack.append((first, split))
+            stack.append((split, last))
+
+    kept = np.nonzero(keep[:-1])[0]
+    if len(kept) < 3:
+        # Add back the vertex farthest from the kept chord
+        distances = _segment_distances(metres, metres[kept[0]], metres[kept[-1]])
+        kept = np.sort(np.append(kept, int(np.argmax(distances))))
+    return ring[kept]
+
+def visvalingam_whyatt(ring: np.ndarray, tolerance_m2: float) -> np.ndarray:
+    """
+    Visvalingam–Whyatt simplification of a ring: repeatedly drop the vertex
+    whose triangle with its neighbours is smallest, while that area is below
+    tolerance_m2. Keeps at least three vertices.
+    """
+    count = len(ring)
+    if count <= 3 or tolerance_m2 <= 0:
+        return ring
+    metres = to_local_metres(ring)
+    previous = np.roll(np.arange(count), 1)
+    following = np.roll(np.arange(count), -1)
+
+    def triangle_area(index: int) -> float:
+        a, b, c = metres[previous[index]], metres[index], metres[following[index]]
+        return abs((b[0] - a[0]) * (c[1] - a[1]) - (c[0] - a[0]) * (b[1] - a[1])) / 2
+
+    # Initial areas vectorised; the heap then updates neighbours of each removal
+    a, c = metres[previous], metres[following]
+    areas = np.abs((metres[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (c[:, 0] - a[:, 0]) * (metres[:, 1] - a[:, 1])) / 2
+    current = areas.copy()
+    heap = [(float(area), index) for index, area in enumerate(areas)]
+    heapq.heapify(heap)
+    removed = np.zeros(count, dtype=bool)
+    remaining = count
+
+    while heap and remaining > 3:
+        area, index = heapq.heappop(heap)
+        if removed[index] or area != current[index]:
+            continue  # stale entry
+        if area >= tolerance_m2:
+            break
+        removed[index] = True
+        remaining -= 1
+        before, after = previous[index], following[index]
+        following[before], previous[after] = after, before
+        for neighbour in (before, after):
+            # A neighbour's area never drops below the removed one, so removal order stays monotonic
+            current[neighbour] = max(triangle_area(neighbour), area)
+            heapq.heappush(heap, (float(current[neighbour]), neighbour))
+
+    return ring[~removed]
+
+def simplify(ring: np.ndarray, tolerance_m: float, method: str = "douglas_peucker") -> np.ndarray:
+    """
+    Simplify a ring with ``douglas_peucker`` (tolerance: distance in metres) or
+    ``visvalingam`` (tolerance: triangle area of tolerance_m² / 2).
+    """
+    if method == "douglas_peucker":
+        return douglas_peucker(ring, tolerance_m)
+    if method == "visvalingam":
+        return visvalingam_whyatt(ring, tolerance_m * tolerance_m / 2)
+    raise ValueError(f"Unknown simplification method: {method}")
@@ -0,0 +1,122 @@
+import logging
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+from cachetools import TTLCache
+from config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Refill and take one token atomically; state is {tokens, ts} using the Redis clock
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return {allowed, tostring(retry_after)}
+"""
+
+class TokenBucketLimiter:
+    """
+    Token buckets shared by all API instances through Redis.
+
+    Each key refills at ``rate`` tokens per second up to ``burst``. If Redis is
+    unreachable the limiter falls back to per-process buckets and retries Redis
+    after ``redis_retry_after`` seconds, so limiting never fails a request.
+    """
+
+    def __init__(self, redis_url: str, prefix: str = "gds:ratelimit", local_maxsize: int = 10000, redis_retry_after: int = 30):
+        self.redis_url = redis_url
+        self.prefix = prefix
+        self.redis_retry_after = redis_retry_after
+        self._local: TTLCache = TTLCache(maxsize=local_maxsize, ttl=3600)
+        # Worker threads take tokens concurrently; TTLCache is not thread-safe
+        self._local_lock = threading.Lock()
+        self._redis = None
+        self._script = None
+        self._sync_script = None
+        self._redis_down_until = 0.0
+
+    async def hit(self, key: str, rate: float, burst: int) -> Tuple[bool, float]:
+        """Take one token for key. Returns (allowed, seconds until a token is available)."""
+        script = self._get_script()
+        if script is not None:
+            try:
+                allowed, retry_after = await script(keys=[f"{self.prefix}:{key}"], args=[rate, burst])
+                return bool(allowed), float(retry_after)
+            except Exception as e:
+                logger.warning(f"Rate limiter Redis unavailable, using local buckets: {str(e)}")
+                self._redis_down_until = time.monotonic() + self.redis_retry_after
+        return self._local_hit(key, rate, burst)
+
+    def hit_sync(self, key: str, rate: float, burst: int) -> Tuple[bool, float]:
+        """Blocking variant of ``hit`` for Celery workers."""
+        script = self._get_sync_script()
+        if script is not None:
+            try:
+                allowed, retry_after = script(keys=[f"{self.prefix}:{key}"], args=[rate, burst])
+                return bool(allowed), float(retry_after)
+            except Exception as e:
+                logger.warning(f"Rate limiter Redis unavailable, using local buckets: {str(e)}")
+                self._redis_down_until = time.monotonic() + self.redis_retry_after
+        return self._local_hit(key, rate, burst)
+
+    def acquire_sync(self, key: str, rate: float, burst: int, timeout: Optional[float] = None) -> bool:
+        """Block until a token is available; False if that would take longer than timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            allowed, retry_after = self.hit_sync(key, rate, burst)
+            if allowed:
+                return True
+            if deadline is not None and time.monotonic() + retry_after > deadline:
+                return False
+            time.sleep(retry_after)
+
+    def _local_hit(self, key: str, rate: float, burst: int) -> Tuple[bool, float]:
+        with self._local_lock:
+            now = time.monotonic()
+            tokens, ts = self._local.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - ts) * rate)
+            if tokens >= 1:
+                self._local[key] = (tokens - 1, now)
+                return True, 0.0
+            self._local[key] = (tokens, now)
+        return False, (1 - tokens) / rate
+
+    def _get_script(self):
+        if time.monotonic() < self._redis_down_until:
+            return None
+        if self._script is None:
+            import redis.asyncio as aioredis
+            self._redis = aioredis.from_url(self.redis_url, **get_settings().redis.client_options)
+            self._script = self._redis.register_script(TOKEN_BUCKET_SCRIPT)
+        return self._script
+
+    def _get_sync_script(self):
+        if time.monotonic() < self._redis_down_until:
+            return None
+        if self._sync_script is None:
+            import redis
+            client = redis.Redis.from_url(self.redis_url, **get_settings().redis.client_options)
+            self._sync_script = client.register_script(TOKEN_BUCKET_SCRIPT)
+        return self._sync_script
+
+@lru_cache
+def get_rate_limiter() -> TokenBucketLimiter:
+    """Get the process-wide rate limiter."""
+    return TokenBucketLimiter(get_settings().redis.url)
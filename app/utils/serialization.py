@@ -0,0 +1,36 @@
+from decimal import Decimal
+from typing import Any, Dict, Optional
+import orjson
+from fastapi import Response, status
+from pydantic import BaseModel
+from utils.tracing import span
+
+# Datetimes in UTC render with a "Z" suffix, matching Pydantic's JSON output
+JSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def dumps_json(content: Any) -> bytes:
+    """Serialise a Pydantic model or plain data (dicts, rows, UUIDs, datetimes) to JSON bytes."""
+    with span("response.encode", "encode"):
+        if isinstance(content, BaseModel):
+            return content.model_dump_json().encode()
+        return orjson.dumps(content, default=_default, option=JSON_OPTIONS)
+
+def json_response(
+    content: Any,
+    status_code: int = status.HTTP_200_OK,
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """
+    Build a JSON response from already validated content.
+
+    FastAPI does not re-validate a returned ``Response`` against the route's
+    ``response_model``, so the content is validated once and serialised once.
+    """
+    return Response(content=dumps_json(content), status_code=status_code, media_type="application/json", headers=headers)
@@ -0,0 +1,165 @@
+"""
+In-process spatial index over job geometries.
+
+``STRtree`` is a static R-tree bulk-loaded with Sort-Tile-Recursive packing:
+boxes are sorted into vertical slabs by x, each slab by y, and packed into
+full nodes, level by level. Queries descend one level at a time with
+vectorised box tests, so a lookup touches a few nodes per level instead of
+every box. ``GeometryIndex`` adds exact polygon intersection on top.
+
+Geometries are job ``coordinates`` ([lon, lat] pairs); like the workers, fewer
+than three points stand for their bounding box.
+"""
+import math
+from typing import Any, Hashable, List, Optional, Sequence, Tuple
+import numpy as np
+from utils.geometry import planar_points
+
+Box = Tuple[float, float, float, float]  # (min_lon, min_lat, max_lon, max_lat)
+
+# Half-size of the box standing for a single point, as in processing_service.coordinates_bbox
+POINT_HALF_SIZE = 0.0005
+
+def polygon_ring(coordinates: Sequence[Sequence[float]]) -> np.ndarray:
+    """Open ring (n, 2) of a job geometry; fewer than three points become their bbox."""
+    points = planar_points(coordinates)
+    if len(points) == 0:
+        raise ValueError("Geometry has no coordinates")
+    if len(points) > 3 and np.array_equal(points[0], points[-1]):
+        points = points[:-1]
+    if len(points) >= 3:
+        return points
+    min_lon, min_lat, max_lon, max_lat = ring_box(points)
+    if max_lon - min_lon < 1e-6:
+        min_lon, max_lon = min_lon - POINT_HALF_SIZE, max_lon + POINT_HALF_SIZE
+    if max_lat - min_lat < 1e-6:
+        min_lat, max_lat = min_lat - POINT_HALF_SIZE, max_lat + POINT_HALF_SIZE
+    return np.array([[min_lon, min_lat], [max_lon, min_lat], [max_lon, max_lat], [min_lon, max_lat]])
+
+def ring_box(ring: np.ndarray) -> Box:
+    min_lon, min_lat = ring.min(axis=0)
+    max_lon, max_lat = ring.max(axis=0)
+    return (float(min_lon), float(min_lat), float(max_lon), float(max_lat))
+
+def ring_wkt(ring: np.ndarray) -> str:
+    """WKT polygon of an open ring."""
+    closed = np.vstack([ring, ring[:1]])
+    return "POLYGON((" + ", ".join(f"{lon!r} {lat!r}" for lon, lat in closed.tolist()) + "))"
+
+def points_in_ring(points: np.ndarray, ring: np.ndarray) -> np.ndarray:
+    """Even-odd test of (n, 2) points against a ring."""
+    x1, y1 = ring[:, 0], ring[:, 1]
+    x0, y0 = np.roll(x1, 1), np.roll(y1, 1)
+    px, py = points[:, 0:1], points[:, 1:2]
+    spans = (y1 > py) != (y0 > py)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        crossing = (x0 - x1) * (py - y1) / (y0 - y1) + x1
+    return np.count_nonzero(spans & (px < crossing), axis=1) % 2 == 1
+
+def rings_intersect(a: np.ndarray, b: np.ndarray) -> bool:
+    """Whether two polygons (boundary included) share any point."""
+    # Any pair of edges crossing or touching: orientation tests over all pairs
+    a0, a1 = np.roll(a, 1, axis=0), a
+    b0, b1 = np.roll(b, 1, axis=0), b
+
+    def orientation(p, q, r):
+        return np.sign((q[..., 0] - p[..., 0]) * (r[..., 1] - p[..., 1]) - (q[..., 1] - p[..., 1]) * (r[..., 0] - p[..., 0]))
+
+    p, q = a0[:, np.newaxis], a1[:, np.newaxis]
+    r, s = b0[np.newaxis], b1[np.newaxis]
+    o1, o2 = orientation(p, q, r), orientation(p, q, s)
+    o3, o4 = orientation(r, s, p), orientation(r, s, q)
+    crossing = (o1 * o2 <= 0) & (o3 * o4 <= 0)
+    # Collinear pairs only touch when their extents overlap
+    collinear = (o1 == 0) & (o2 == 0)
+    if collinear.any():
+        overlap = (
+            (np.maximum(p[..., 0], q[..., 0]) >= np.minimum(r[..., 0], s[..., 0]))
+            & (np.maximum(r[..., 0], s[..., 0]) >= np.minimum(p[..., 0], q[..., 0]))
+            & (np.maximum(p[..., 1], q[..., 1]) >= np.minimum(r[..., 1], s[..., 1]))
+            & (np.maximum(r[..., 1], s[..., 1]) >= np.minimum(p[..., 1], q[..., 1]))
+        )
+        crossing &= ~collinear | overlap
+    if crossing.any():
+        return True
+    # No boundary contact: intersecting only if one contains the other
+    return bool(points_in_ring(a[:1], b)[0] or points_in_ring(b[:1], a)[0])
+
+class STRtree:
+    """Static packed R-tree over boxes, queried by box intersection."""
+
+    def __init__(self, boxes: np.ndarray, node_capacity: int = 16):
+        self.node_capacity = node_capacity
+        self.size = len(boxes)
+        # levels[0] holds the item boxes; children of node k of level i + 1 are
+        # children[i][k * capacity:(k + 1) * capacity], indices into level i
+        self.levels: List[np.ndarray] = [np.asarray(boxes, dtype=np.float64).reshape(-1, 4)]
+        self.children: List[np.ndarray] = []
+        while len(self.levels[-1]) > node_capacity:
+            level = self.levels[-1]
+            order = self._str_order(level)
+            starts = np.arange(0, len(order), node_capacity)
+            packed = level[order]
+            nodes = np.column_stack([
+                np.minimum.reduceat(packed[:, 0], starts),
+                np.minimum.reduceat(packed[:, 1], starts),
+                np.maximum.reduceat(packed[:, 2], starts),
+                np.maximum.reduceat(packed[:, 3], starts),
+            ])
+            self.children.append(order)
+            self.levels.append(nodes)
+
+    def _str_order(self, boxes: np.ndarray) -> np.ndarray:
+        """Sort-Tile-Recursive order: x slabs of whole nodes, each sorted by y."""
+        count = len(boxes)
+        slabs = math.ceil(math.sqrt(math.ceil(count / self.node_capacity)))
+        slab_size = math.ceil(count / slabs / self.node_capacity) * self.node_capacity
+        by_x = np.argsort(boxes[:, 0] + boxes[:, 2], kind="stable")
+        slab = np.arange(count) // slab_size
+        by_slab_y = np.lexsort(((boxes[by_x, 1] + boxes[by_x, 3]), slab))
+        return by_x[by_slab_y]
+
+    def query(self, box: Box) -> np.ndarray:
+        """Indices of the boxes intersecting box (edges touching count)."""
+        if not self.size:
+            return np.empty(0, dtype=np.intp)
+        min_lon, min_lat, max_lon, max_lat = box
+        top = self.levels[-1]
+        candidates = np.arange(len(top))
+        for level in range(len(self.levels) - 1, -1, -1):
+            boxes = self.levels[level][candidates]
+            hits = (boxes[:, 0] <= max_lon) & (boxes[:, 2] >= min_lon) & (boxes[:, 1] <= max_lat) & (boxes[:, 3] >= min_lat)
+            candidates = candidates[hits]
+            if level == 0 or not candidates.size:
+                break
+            order = self.children[level - 1]
+            slots = (candidates[:, np.newaxis] * self.node_capacity + np.arange(self.node_capacity)).ravel()
+            candidates = order[slots[slots < len(order)]]
+        return np.sort(candidates)
+
+class GeometryIndex:
+    """Polygons by key, queried for exact intersection with another polygon."""
+
+    def __init__(self, keys: Sequence[Hashable], geometries: Sequence[Sequence[Sequence[float]]], node_capacity: int = 16):
+        self.keys: List[Any] = []
+        self.rings: List[np.ndarray] = []
+        for key, coordinates in zip(keys, geometries):
+            try:
+                ring = polygon_ring(coordinates)
+            except (TypeError, ValueError):
+                continue  # jobs without usable coordinates cannot match an area
+            self.keys.append(key)
+            self.rings.append(ring)
+        boxes = np.array([ring_box(ring) for ring in self.rings]).reshape(-1, 4)
+        self.tree = STRtree(boxes, node_capacity)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def query(self, coordinates: Sequence[Sequence[float]], box_only: bool = False) -> List[Any]:
+        """Keys of the polygons intersecting the given geometry."""
+        ring = polygon_ring(coordinates)
+        candidates = self.tree.query(ring_box(ring))
+        if box_only:
+            return [self.keys[index] for index in candidates]
+        return [self.keys[index] for index in candidates if rings_intersect(self.rings[index], ring)]
@@ -0,0 +1,196 @@
+"""
+Celery task message encoding.
+
+``MSGPACK_SERIALIZER`` is a kombu serializer writing task bodies as msgpack,
+which is smaller than JSON for coordinate arrays and much cheaper to parse.
+UUIDs, datetimes and Decimals travel as msgpack extension types. Kombu's
+``task_compression`` compresses every message, so instead bodies over
+``compression_threshold`` are zlib-compressed inside the serializer and small
+ones are sent as-is; a one-byte header tells the decoder which.
+
+Override payloads too large to travel through the broker at all are stored
+in Redis by ``offload_payload`` (claim check), and the task carries only a
+reference that ``resolve_payload`` swaps back on the worker.
+"""
+import logging
+import time
+import uuid
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Dict, Optional
+import orjson
+from kombu.serialization import register
+from config.service_config import TaskTransportConfig
+from config.settings import get_settings
+
+try:
+    import msgpack
+except ImportError:  # json only
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+MSGPACK_SERIALIZER = "msgpack_z"
+MSGPACK_CONTENT_TYPE = "application/x-msgpack-z"
+
+# Body header: how the rest of the message is encoded
+_PLAIN = b"\x00"
+_ZLIB = b"\x01"
+
+# msgpack extension type codes
+_EXT_UUID = 1
+_EXT_DATETIME = 2
+_EXT_DATE = 3
+_EXT_DECIMAL = 4
+
+CLAIM_CHECK_KEY = "$claim_check"
+CLAIM_CHECK_PREFIX = "task_payload:"
+
+class ClaimCheckError(Exception):
+    """A task's offloaded payload could not be retrieved."""
+    pass
+
+def _default(obj: Any):
+    if isinstance(obj, uuid.UUID):
+        return msgpack.ExtType(_EXT_UUID, obj.bytes)
+    if isinstance(obj, datetime):
+        return msgpack.ExtType(_EXT_DATETIME, obj.isoformat().encode())
+    if isinstance(obj, date):
+        return msgpack.ExtType(_EXT_DATE, obj.isoformat().encode())
+    if isinstance(obj, Decimal):
+        return msgpack.ExtType(_EXT_DECIMAL, str(obj).encode())
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} cannot be sent in a task message")
+
+def _ext_hook(code: int, data: bytes):
+    if code == _EXT_UUID:
+        return uuid.UUID(bytes=data)
+    if code == _EXT_DATETIME:
+        return datetime.fromisoformat(data.decode())
+    if code == _EXT_DATE:
+        return date.fromisoformat(data.decode())
+    if code == _EXT_DECIMAL:
+        return Decimal(data.decode())
+    return msgpack.ExtType(code, data)
+
+def encode_msgpack(body: Any, threshold: int = 16384, level: int = 6) -> bytes:
+    """msgpack body with its header byte, zlib-compressed when at least threshold bytes."""
+    packed = msgpack.packb(body, default=_default, use_bin_type=True)
+    if threshold and len(packed) >= threshold:
+        compressed = zlib.compress(packed, level)
+        if len(compressed) < len(packed):
+            return _ZLIB + compressed
+    return _PLAIN + packed
+
+def decode_msgpack(data: bytes) -> Any:
+    if isinstance(data, str):
+        data = data.encode("latin-1")
+    header, packed = data[:1], data[1:]
+    if header == _ZLIB:
+        packed = zlib.decompress(packed)
+    elif header != _PLAIN:
+        raise ValueError("Unknown task message encoding")
+    return msgpack.unpackb(packed, ext_hook=_ext_hook, raw=False, strict_map_key=False)
+
+def register_task_serializers(config: TaskTransportConfig) -> Dict[str, Any]:
+    """
+    Register the msgpack serializer with kombu and return the Celery settings
+    choosing the configured one. Workers accept both formats, so publishers and
+    workers can switch serializer independently.
+    """
+    if msgpack is None:
+        if config.serializer == "msgpack":
+            logger.warning("TASK_SERIALIZER=msgpack but msgpack is not installed; using json")
+        return {"task_serializer": "json", "accept_content": ["json"]}
+
+    register(
+        MSGPACK_SERIALIZER,
+        lambda body: encode_msgpack(body, config.compression_threshold, config.compression_level),
+        decode_msgpack,
+        content_type=MSGPACK_CONTENT_TYPE,
+        content_encoding="binary"
+    )
+    serializer = MSGPACK_SERIALIZER if config.serializer == "msgpack" else "json"
+    return {"task_serializer": serializer, "accept_content": ["json", MSGPACK_CONTENT_TYPE]}
+
+class ClaimCheckStore:
+    """Large task payloads kept in Redis under a TTL, referenced from task messages."""
+
+    def __init__(self, redis_url: str, threshold: int, ttl: int, redis_retry_after: float = 30.0):
+        self.redis_url = redis_url
+        self.threshold = threshold
+        self.ttl = ttl
+        self.redis_retry_after = redis_retry_after
+        self._redis = None
+        self._redis_down_until = 0.0
+
+    def offload(self, payload: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """The payload, or a reference to its stored copy when larger than the threshold."""
+        if not payload or not self.threshold or is_claim_check(payload):
+            return payload
+        data = orjson.dumps(payload)
+        if len(data) < self.threshold:
+            return payload
+        client = self._get_redis()
+        if client is None:
+            return payload
+        key = f"{CLAIM_CHECK_PREFIX}{uuid.uuid4().hex}"
+        try:
+            client.set(key, data, ex=self.ttl)
+        except Exception as e:
+            # Sending inline is slower, not wrong
+            self._redis_failed(e)
+            return payload
+        return {CLAIM_CHECK_KEY: key, "bytes": len(data)}
+
+    def resolve(self, payload: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """The payload a reference points to; anything else is returned unchanged."""
+        if not is_claim_check(payload):
+            return payload
+        key = payload[CLAIM_CHECK_KEY]
+        try:
+            data = self._client().get(key)
+        except Exception as e:
+            raise ClaimCheckError(f"Could not load task payload {key}: {str(e)}") from e
+        if data is None:
+            raise ClaimCheckError(f"Task payload {key} has expired or does not exist")
+        return orjson.loads(data)
+
+    def _client(self):
+        if self._redis is None:
+            import redis
+            self._redis = redis.Redis.from_url(self.redis_url, **get_settings().redis.client_options)
+        return self._redis
+
+    def _get_redis(self):
+        if time.monotonic() < self._redis_down_until:
+            return None
+        return self._client()
+
+    def _redis_failed(self, error: Exception) -> None:
+        logger.warning(f"Claim check Redis unavailable, sending payloads inline: {str(error)}")
+        self._redis_down_until = time.monotonic() + self.redis_retry_after
+
+def is_claim_check(payload: Any) -> bool:
+    return isinstance(payload, dict) and CLAIM_CHECK_KEY in payload
+
+@lru_cache
+def get_claim_check_store() -> ClaimCheckStore:
+    """Get the process-wide claim check store."""
+    settings = get_settings()
+    return ClaimCheckStore(
+        settings.redis.url,
+        settings.task_transport.claim_check_threshold,
+        settings.task_transport.claim_check_ttl
+    )
+
+def offload_payload(payload: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Replace a large override payload by a claim check reference before publishing."""
+    return get_claim_check_store().offload(payload)
+
+def resolve_payload(payload: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Swap a claim check reference back for its payload on the worker."""
+    return get_claim_check_store().resolve(payload)
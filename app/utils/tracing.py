@@ -0,0 +1,231 @@
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Any, Dict, Iterator, List, Optional
+from prometheus_client import Histogram
+from config.service_config import TracingConfig
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "API request latency",
+    ["method", "route", "status_code"],
+    buckets=LATENCY_BUCKETS
+)
+REQUEST_PHASE_DURATION = Histogram(
+    "http_request_phase_seconds",
+    "Time spent per phase of an API request: db, celery_publish, encode, app (the rest)",
+    ["route", "phase"],
+    buckets=LATENCY_BUCKETS
+)
+
+_current_trace: ContextVar[Optional["RequestTrace"]] = ContextVar("request_trace", default=None)
+
+class Span:
+    """A timed operation within a request."""
+
+    __slots__ = ("name", "phase", "start", "duration", "attributes")
+
+    def __init__(self, name: str, phase: str, start: float, duration: float, attributes: Dict[str, Any]):
+        self.name = name
+        self.phase = phase
+        self.start = start
+        self.duration = duration
+        self.attributes = attributes
+
+class RequestTrace:
+    """
+    Spans and per-phase totals of one API request.
+
+    Phase totals are always exact; individual spans are kept up to ``max_spans``
+    so that requests issuing thousands of queries stay cheap to trace.
+    """
+
+    def __init__(self, request_id: str, method: str, path: str, max_spans: int = 500):
+        self.request_id = request_id
+        self.method = method
+        self.path = path
+        self.max_spans = max_spans
+        self.start = time.perf_counter()
+        self.start_ns = time.time_ns()
+        self.spans: List[Span] = []
+        self.phase_totals: Dict[str, float] = {}
+        self.dropped_spans = 0
+        self.publish_starts: Dict[str, float] = {}
+
+    def add_span(self, name: str, phase: str, start: float, end: float, **attributes: Any) -> None:
+        duration = end - start
+        self.phase_totals[phase] = self.phase_totals.get(phase, 0.0) + duration
+        if len(self.spans) < self.max_spans:
+            self.spans.append(Span(name, phase, start, duration, attributes))
+        else:
+            self.dropped_spans += 1
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+    def breakdown(self, total: Optional[float] = None) -> Dict[str, float]:
+        """Seconds per phase, with the unaccounted remainder as ``app``."""
+        total = self.elapsed() if total is None else total
+        phases = dict(self.phase_totals)
+        phases["app"] = max(total - sum(phases.values()), 0.0)
+        return phases
+
+    def server_timing(self) -> str:
+        """Server-Timing header value (milliseconds) for the time spent so far."""
+        total = self.elapsed()
+        parts = [f"{phase};dur={seconds * 1000:.1f}" for phase, seconds in self.breakdown(total).items()]
+        parts.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(parts)
+
+def current_trace() -> Optional[RequestTrace]:
+    return _current_trace.get()
+
+def start_trace(trace: RequestTrace) -> Token:
+    return _current_trace.set(trace)
+
+def end_trace(token: Token) -> None:
+    _current_trace.reset(token)
+
+@contextmanager
+def span(name: str, phase: str, **attributes: Any) -> Iterator[None]:
+    """Record the enclosed block as a span of the current request, if any."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add_span(name, phase, start, time.perf_counter(), **attributes)
+
+def record_request(trace: RequestTrace, route: str, status_code: int, config: TracingConfig) -> None:
+    """Export a finished request: latency histograms, slow request log and OTLP spans."""
+    total = trace.elapsed()
+    breakdown = trace.breakdown(total)
+
+    REQUEST_DURATION.labels(method=trace.method, route=route, status_code=str(status_code)).observe(total)
+    for phase, seconds in breakdown.items():
+        REQUEST_PHASE_DURATION.labels(route=route, phase=phase).observe(seconds)
+
+    if total * 1000 >= config.slow_request_ms:
+        phases = ", ".join(f"{phase}={seconds * 1000:.1f}ms" for phase, seconds in breakdown.items())
+        logger.warning(
+            f"Slow request {trace.request_id} {trace.method} {route} -> {status_code} "
+            f"in {total * 1000:.1f}ms ({phases}, spans={len(trace.spans)}, dropped={trace.dropped_spans})"
+        )
+
+    if config.otlp_endpoint:
+        _export_otlp(trace, route, status_code, total, config)
+
+# Database queries (sync engines and the sync side of async engines)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_trace.get() is not None:
+        conn.info.setdefault("trace_query_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    trace = _current_trace.get()
+    starts = conn.info.get("trace_query_start")
+    if trace is None or not starts:
+        return
+    trace.add_span("db.query", "db", starts.pop(), time.perf_counter(), statement=statement[:200])
+
+def _handle_error(context):
+    # after_cursor_execute does not run for a failed statement; drop its start here
+    connection = context.connection
+    starts = connection.info.get("trace_query_start") if connection is not None else None
+    if not starts:
+        return
+    start = starts.pop()
+    trace = _current_trace.get()
+    if trace is not None and context.statement is not None:
+        trace.add_span("db.query", "db", start, time.perf_counter(), statement=context.statement[:200], error=type(context.original_exception).__name__)
+
+# Celery publishes
+
+def _before_task_publish(sender=None, headers=None, **kwargs):
+    trace = _current_trace.get()
+    if trace is not None and headers:
+        trace.publish_starts[headers.get("id")] = time.perf_counter()
+
+def _after_task_publish(sender=None, headers=None, **kwargs):
+    trace = _current_trace.get()
+    if trace is None or not headers:
+        return
+    start = trace.publish_starts.pop(headers.get("id"), None)
+    if start is not None:
+        trace.add_span("celery.publish", "celery_publish", start, time.perf_counter(), task=sender)
+
+_installed = False
+
+def install_tracing() -> None:
+    """Hook database and Celery publish timing into request traces. Idempotent."""
+    global _installed
+    if _installed:
+        return
+    from celery.signals import after_task_publish, before_task_publish
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+    before_task_publish.connect(_before_task_publish, weak=False)
+    after_task_publish.connect(_after_task_publish, weak=False)
+    _installed = True
+
+# Optional OpenTelemetry export
+
+_otel_tracer = None
+_otel_unavailable = False
+
+def _get_otel_tracer(config: TracingConfig):
+    """Create the OTLP tracer on first use in this process; None if OpenTelemetry is not installed."""
+    global _otel_tracer, _otel_unavailable
+    if _otel_tracer is not None or _otel_unavailable:
+        return _otel_tracer
+    try:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError:
+        logger.warning("TRACING_OTLP_ENDPOINT is set but opentelemetry-sdk / otlp exporter are not installed")
+        _otel_unavailable = True
+        return None
+
+    provider = TracerProvider(resource=Resource.create({"service.name": config.service_name}))
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=config.otlp_endpoint)))
+    _otel_tracer = provider.get_tracer(__name__)
+    return _otel_tracer
+
+def _export_otlp(trace: RequestTrace, route: str, status_code: int, total: float, config: TracingConfig) -> None:
+    tracer = _get_otel_tracer(config)
+    if tracer is None:
+        return
+    from opentelemetry import trace as otel_trace
+
+    def to_ns(perf_time: float) -> int:
+        return trace.start_ns + int((perf_time - trace.start) * 1e9)
+
+    root = tracer.start_span(
+        f"{trace.method} {route}",
+        start_time=trace.start_ns,
+        attributes={
+            "http.method": trace.method,
+            "http.route": route,
+            "http.status_code": status_code,
+            "request.id": trace.request_id,
+        },
+    )
+    context = otel_trace.set_span_in_context(root)
+    for child in trace.spans:
+        otel_span = tracer.start_span(child.name, context=context, start_time=to_ns(child.start), attributes=child.attributes)
+        otel_span.end(end_time=to_ns(child.start + child.duration))
+    root.end(end_time=to_ns(trace.start + total))
@@ -0,0 +1,24 @@
+import math
+from typing import Any, List
+
+def validate_coordinates(coordinates: Any) -> List[List[float]]:
+    """
+    Check job coordinates are a non-empty list of points starting with finite
+    [lon, lat] in WGS84 range; extra dimensions such as altitude are ignored.
+    Returns [lon, lat] floats; raises ValueError otherwise.
+    """
+    if not isinstance(coordinates, list) or not coordinates:
+        raise ValueError("coordinates must be a non-empty list of [lon, lat] pairs")
+    points = []
+    for index, point in enumerate(coordinates):
+        if not isinstance(point, (list, tuple)) or len(point) < 2:
+            raise ValueError(f"coordinates[{index}] must start with [lon, lat]")
+        if any(isinstance(value, bool) or not isinstance(value, (int, float)) for value in point[:2]):
+            raise ValueError(f"coordinates[{index}] must contain numbers")
+        lon, lat = float(point[0]), float(point[1])
+        if not (math.isfinite(lon) and math.isfinite(lat)):
+            raise ValueError(f"coordinates[{index}] must be finite")
+        if not (-180 <= lon <= 180 and -90 <= lat <= 90):
+            raise ValueError(f"coordinates[{index}] is outside longitude [-180, 180] / latitude [-90, 90]")
+        points.append([lon, lat])
+    return points
@@ -1 +1 @@
-celery -A config.celery_config worker -l info -Q celery,geospatial,monitoring,scheduler -E
\ No newline at end of file
+DB_PROCESS_ROLE=worker celery -A config.celery_config worker -l info -Q celery,geospatial,fetch,monitoring,scheduler -E
\ No newline at end of file
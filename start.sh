@@ -105,21 +105,26 @@ else
     done
 fi
 
-# Celery Worker
-echo -e "${YELLOW}🧩 Checking for Celery worker...${NC}"
-if pgrep -f "celery.*worker" > /dev/null; then
-    echo -e "${GREEN}✅ Celery worker already running${NC}"
-else
-    echo -e "${YELLOW}⚙️  Launching Celery worker...${NC}"
-    run_in_new_tab "source env/bin/activate && cd app && celery -A config.celery_config worker --loglevel=info --concurrency=2 -E -Q celery,geospatial,monitoring,scheduler >> ../logs/celery.log 2>&1" "Celery Worker"
-    for i in {1..10}; do
-        if pgrep -f "celery.*worker" > /dev/null; then
-            echo -e "${GREEN}✅ Celery worker started${NC}"
-            break
-        fi
-        sleep 2
-    done
-fi
+# Celery Workers: one per execution profile (app/config/worker_profiles.py)
+#   geospatial - CPU-bound index computation, prefork autoscaled on queue depth
+#   fetch      - I/O-bound Earth Engine / scene fetches, thread pool
+#   monitoring - health checks, discovery and monitoring jobs, small low-latency pool
+for profile in geospatial fetch monitoring; do
+    echo -e "${YELLOW}🧩 Checking for Celery ${profile} worker...${NC}"
+    if pgrep -f "celery.*worker.*-n ${profile}@" > /dev/null; then
+        echo -e "${GREEN}✅ Celery ${profile} worker already running${NC}"
+    else
+        echo -e "${YELLOW}⚙️  Launching Celery ${profile} worker...${NC}"
+        run_in_new_tab "source env/bin/activate && cd app && python -m config.worker_profiles ${profile} >> ../logs/celery-${profile}.log 2>&1" "Celery ${profile} Worker"
+        for i in {1..10}; do
+            if pgrep -f "celery.*worker.*-n ${profile}@" > /dev/null; then
+                echo -e "${GREEN}✅ Celery ${profile} worker started${NC}"
+                break
+            fi
+            sleep 2
+        done
+    fi
+done
 
 # Flower
 echo -e "${YELLOW}🌸 Checking for Flower monitoring...${NC}"
@@ -152,4 +157,4 @@ echo "  🏥 Health: curl http://localhost:8000/api/v1/health"
 echo "  📋 Jobs: curl http://localhost:8000/api/v1/jobs/"
 echo ""
 echo -e "${YELLOW}💡 Check the new terminal tabs for server logs${NC}"
-echo -e "${YELLOW}💡 Celery worker logs are being saved to logs/celery.log${NC}"
\ No newline at end of file
+echo -e "${YELLOW}💡 Celery worker logs are being saved to logs/celery-<profile>.log${NC}"
\ No newline at end of file
@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+# Application modules import each other from app/ (e.g. ``from services...``)
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root / "app"))
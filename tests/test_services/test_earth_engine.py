@@ -0,0 +1,165 @@
+import math
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, List
+import pytest
+from config.service_config import EarthEngineConfig
+from services import earth_engine_service
+from services.earth_engine_service import (
+    EarthEngineError,
+    EarthEngineQuotaError,
+    EarthEngineService,
+    EarthEngineTransport,
+    RecordedTransport,
+    RecordingTransport,
+    build_reduce_request,
+    request_key,
+)
+
+RECORDED_RESPONSES = Path(__file__).parent / "fixtures" / "earth_engine_responses.json"
+
+START, END = date(2026, 6, 1), date(2026, 6, 30)
+
+def square(lon: float, lat: float, size: float = 0.01) -> List[List[float]]:
+    return [[lon, lat], [lon + size, lat], [lon + size, lat + size], [lon, lat + size]]
+
+class StubTransport(EarthEngineTransport):
+    """Answers every region with statistics derived from its position; can fail the first calls."""
+
+    name = "stub"
+
+    def __init__(self, failures: List[Exception] = ()):
+        self.requests: List[Dict[str, Any]] = []
+        self.failures = list(failures)
+
+    def reduce_regions(self, request: Dict[str, Any]) -> List[Dict[str, Any]]:
+        self.requests.append(request)
+        if self.failures:
+            raise self.failures.pop(0)
+        return [
+            {"region_index": index, "ndvi_mean": ring[0][0] / 10, "ndvi_count": len(ring)}
+            for index, ring in enumerate(request["regions"])
+        ]
+
+class StubLimiter:
+    """Grants quota (or refuses it when allow is False) and counts the tokens asked for."""
+
+    def __init__(self, allow: bool = True):
+        self.allow = allow
+        self.taken = 0
+
+    def acquire_sync(self, key: str, rate: float, burst: int, timeout: float = None) -> bool:
+        self.taken += 1
+        return self.allow
+
+def make_service(transport: EarthEngineTransport, limiter: StubLimiter = None, **config: Any) -> EarthEngineService:
+    config = {"batch_size": 2, "max_retries": 3, "backoff_base": 1, "backoff_max": 8, **config}
+    return EarthEngineService(EarthEngineConfig(**config), transport, limiter=limiter or StubLimiter())
+
+@pytest.fixture
+def sleeps(monkeypatch) -> List[float]:
+    """Backoff delays requested by the service, without sleeping; jitter takes its upper bound."""
+    delays: List[float] = []
+    monkeypatch.setattr(earth_engine_service.time, "sleep", delays.append)
+    monkeypatch.setattr(earth_engine_service.random, "uniform", lambda low, high: high)
+    return delays
+
+class ThrottledError(Exception):
+    def __init__(self):
+        super().__init__("HttpError 429: Too Many Requests")
+
+@pytest.mark.parametrize("region_count", [1, 2, 3, 5, 8])
+def test_reduce_regions_sends_one_request_per_batch(region_count):
+    transport = StubTransport()
+    limiter = StubLimiter()
+    service = make_service(transport, limiter)
+    regions = [square(5 + index, 52) for index in range(region_count)]
+
+    results = service.reduce_regions("Sentinel-2", regions, START, END, ["ndvi"], 40.0)
+
+    assert len(transport.requests) == math.ceil(region_count / 2)
+    assert limiter.taken == len(transport.requests)
+    assert [len(request["regions"]) for request in transport.requests] == [
+        min(2, region_count - offset) for offset in range(0, region_count, 2)
+    ]
+    # Results come back in the order the regions were given
+    assert [result["ndvi"]["mean"] for result in results] == [round((5 + index) / 10, 4) for index in range(region_count)]
+
+def test_reduce_regions_without_regions_sends_nothing():
+    transport = StubTransport()
+    assert make_service(transport).reduce_regions("Sentinel-2", [], START, END, ["ndvi"], 40.0) == []
+    assert transport.requests == []
+
+def test_reduce_regions_rejects_a_short_response():
+    class ShortTransport(StubTransport):
+        def reduce_regions(self, request):
+            return super().reduce_regions(request)[:-1]
+
+    with pytest.raises(EarthEngineError, match="Expected 2 reduced regions"):
+        make_service(ShortTransport()).reduce_regions("Sentinel-2", [square(5, 52), square(6, 52)], START, END, ["ndvi"], 40.0)
+
+def test_throttled_requests_back_off_exponentially(sleeps):
+    transport = StubTransport(failures=[ThrottledError(), ThrottledError(), ThrottledError()])
+    limiter = StubLimiter()
+
+    results = make_service(transport, limiter).reduce_regions("Sentinel-2", [square(5, 52)], START, END, ["ndvi"], 40.0)
+
+    assert results[0]["ndvi"]["mean"] == 0.5
+    assert len(transport.requests) == 4
+    # Every attempt, retries included, takes a quota token
+    assert limiter.taken == 4
+    assert sleeps == [1, 2, 4]
+
+def test_backoff_is_capped(sleeps):
+    transport = StubTransport(failures=[ThrottledError() for _ in range(5)])
+    make_service(transport, max_retries=5, backoff_max=3).reduce_regions("Sentinel-2", [square(5, 52)], START, END, ["ndvi"], 40.0)
+    assert sleeps == [1, 2, 3, 3, 3]
+
+def test_throttling_past_max_retries_raises_quota_error(sleeps):
+    transport = StubTransport(failures=[ThrottledError() for _ in range(4)])
+    with pytest.raises(EarthEngineQuotaError, match="after 4 attempts"):
+        make_service(transport).reduce_regions("Sentinel-2", [square(5, 52)], START, END, ["ndvi"], 40.0)
+    assert len(sleeps) == 3
+
+def test_other_errors_are_not_retried(sleeps):
+    transport = StubTransport(failures=[ValueError("Image.select: band B8 not found")])
+    with pytest.raises(EarthEngineError, match="band B8 not found"):
+        make_service(transport).reduce_regions("Sentinel-2", [square(5, 52)], START, END, ["ndvi"], 40.0)
+    assert len(transport.requests) == 1
+    assert sleeps == []
+
+def test_no_quota_in_time_raises_quota_error():
+    transport = StubTransport()
+    with pytest.raises(EarthEngineQuotaError, match="No Earth Engine quota"):
+        make_service(transport, StubLimiter(allow=False)).reduce_regions("Sentinel-2", [square(5, 52)], START, END, ["ndvi"], 40.0)
+    assert transport.requests == []
+
+def test_recorded_transport_replays_the_fixture():
+    regions = [square(5.0, 52.0), square(5.1, 52.1), [[5.2, 52.2]]]
+    service = make_service(RecordedTransport(str(RECORDED_RESPONSES)), batch_size=500)
+
+    results = service.reduce_regions("Sentinel-2", regions, START, END, ["ndvi"], 40.0)
+
+    assert results == [
+        {"ndvi": {"mean": 0.61, "std": 0.05, "min": 0.2, "max": 0.9, "pixel_count": 120}},
+        {"ndvi": {"mean": 0.62, "std": 0.05, "min": 0.2, "max": 0.9, "pixel_count": 121}},
+        {"ndvi": {"mean": 0.63, "std": 0.05, "min": 0.2, "max": 0.9, "pixel_count": 122}},
+    ]
+
+def test_recorded_transport_fails_on_unrecorded_requests():
+    service = make_service(RecordedTransport(str(RECORDED_RESPONSES)))
+    with pytest.raises(EarthEngineError, match="No recorded response"):
+        service.reduce_regions("Sentinel-2", [square(7, 50)], START, END, ["ndvi"], 40.0)
+
+def test_recording_transport_output_replays_identically(tmp_path):
+    path = str(tmp_path / "recorded.json")
+    regions = [square(5, 52), square(6, 52), square(7, 52)]
+    recorded = make_service(RecordingTransport(StubTransport(), path)).reduce_regions("Landsat-8", regions, START, END, ["ndvi", "ndwi"], 20.0)
+
+    replayed = make_service(RecordedTransport(path)).reduce_regions("Landsat-8", regions, START, END, ["ndvi", "ndwi"], 20.0)
+
+    assert replayed == recorded
+
+def test_request_key_ignores_key_order():
+    request = build_reduce_request("MODIS", [square(5, 52)], START, END, ["ndvi"], 40.0)
+    assert request_key(request) == request_key(dict(reversed(list(request.items()))))
@@ -0,0 +1,158 @@
+import importlib.util
+import math
+from pathlib import Path
+import numpy as np
+import pytest
+from services.geospatial_utils import GEOMETRY_COLUMNS, geometry_columns, geometry_summary, prepare_coordinates
+from utils import geometry
+
+GEOMETRY_MIGRATION = (
+    Path(__file__).parents[2] / "app" / "alembic" / "versions"
+    / "2026_10_19_1200-a7c3e91d5b28_add_job_definitions_geometry_metrics.py"
+)
+
+def load_migration():
+    spec = importlib.util.spec_from_file_location("geometry_metrics_migration", GEOMETRY_MIGRATION)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def cell_area_m2(min_lon: float, min_lat: float, max_lon: float, max_lat: float) -> float:
+    """Closed-form area of a lon/lat cell on the authalic sphere."""
+    sines = [math.sin(geometry._authalic_latitude(np.radians(lat))) for lat in (min_lat, max_lat)]
+    return geometry.AUTHALIC_RADIUS ** 2 * math.radians(max_lon - min_lon) * (sines[1] - sines[0])
+
+def cell(min_lon: float, min_lat: float, max_lon: float, max_lat: float):
+    return [[min_lon, min_lat], [max_lon, min_lat], [max_lon, max_lat], [min_lon, max_lat]]
+
+SQUARE = cell(5.1, 52.1, 5.2, 52.2)
+
+# Polygons the migration's inline copy must measure exactly as the application does
+POLYGONS = [
+    SQUARE,
+    SQUARE + [SQUARE[0]],
+    cell(-10, -30, 20, 10),
+    [[5, 52]],
+    [[5, 52], [5.01, 52]],
+    [[5, 52], [5, 52.01]],
+    [[5, 52, 10.0], [5.01, 52, 12.5], [5.005, 52.01, 11.0]],
+    [[-0.2, 51.4], [0.1, 51.45], [0.05, 51.6], [-0.15, 51.62], [-0.25, 51.5]],
+    list(reversed(SQUARE)),
+]
+
+@pytest.mark.parametrize("ring, fraction", [
+    ([[0, 0], [90, 0], [0, 90]], 1 / 8),
+    ([[0, 0], [30, 0], [0, 90]], 1 / 24),
+    ([[60, 0], [0, 90], [-60, 0]], 1 / 6),
+])
+def test_area_of_triangles_bounded_by_meridians_and_the_equator(ring, fraction):
+    # Meridians and the equator are geodesics, so these areas are exact fractions of the globe
+    globe = 4 * math.pi * geometry.AUTHALIC_RADIUS ** 2
+    assert geometry.area_m2(geometry.as_ring(ring)) == pytest.approx(globe * fraction, rel=1e-12)
+
+@pytest.mark.parametrize("bounds", [(5.1, 52.1, 5.2, 52.2), (-47.01, -15.8, -47.0, -15.79), (100, 60, 100.001, 60.001)])
+def test_field_sized_cell_area_matches_closed_form(bounds):
+    # Geodesic edges bulge from parallels by well under a millionth over field-sized cells
+    ring = geometry.as_ring(cell(*bounds))
+    assert geometry.area_m2(ring) == pytest.approx(cell_area_m2(*bounds), rel=1e-6)
+
+def test_counter_clockwise_rings_have_positive_area():
+    ring = geometry.as_ring(SQUARE)
+    assert geometry.signed_area_m2(ring) > 0
+    assert geometry.repair(ring)[1] == []
+    repaired, fixes = geometry.repair(ring[::-1])
+    assert fixes == ["reoriented"]
+    assert geometry.signed_area_m2(repaired) > 0
+    assert geometry.signed_area_m2(ring[::-1]) == pytest.approx(-geometry.signed_area_m2(ring))
+    assert geometry.area_m2(ring[::-1]) == pytest.approx(geometry.area_m2(ring))
+
+def test_as_ring_drops_closing_point_and_altitude():
+    ring = geometry.as_ring([[5, 52, 3], [6, 52, 4], [6, 53, 5], [5, 52, 3]])
+    assert ring.tolist() == [[5, 52], [6, 52], [6, 53]]
+
+def test_bbox():
+    assert geometry.bbox(geometry.as_ring([[5, 52], [6.5, 51], [6, 53.25]])) == (5.0, 51.0, 6.5, 53.25)
+
+def test_perimeter_of_equator_edge():
+    # One degree along the equator is a / 180 * pi on the ellipsoid
+    edge = geometry.as_ring([[0, 0], [1, 0]])
+    assert geometry.perimeter_m(edge) == pytest.approx(geometry.WGS84_A * math.pi / 180, rel=1e-9)
+
+def test_geometry_columns_of_a_square():
+    columns = geometry_columns({"coordinates": SQUARE})
+    assert columns == {
+        "bbox_min_lon": 5.1,
+        "bbox_min_lat": 52.1,
+        "bbox_max_lon": 5.2,
+        "bbox_max_lat": 52.2,
+        "area_ha": pytest.approx(cell_area_m2(5.1, 52.1, 5.2, 52.2) / 10_000, abs=0.01),
+        "vertex_count": 4,
+    }
+
+def test_geometry_columns_of_a_point_use_its_box():
+    columns = geometry_columns({"coordinates": [[5, 52]]})
+    assert (columns["bbox_min_lon"], columns["bbox_max_lon"]) == pytest.approx((4.9995, 5.0005))
+    assert (columns["bbox_min_lat"], columns["bbox_max_lat"]) == pytest.approx((51.9995, 52.0005))
+    assert columns["area_ha"] == pytest.approx(cell_area_m2(4.9995, 51.9995, 5.0005, 52.0005) / 10_000, abs=1e-4)
+    assert columns["vertex_count"] == 1
+
+@pytest.mark.parametrize("payload", [None, {}, {"coordinates": []}, {"coordinates": "5,52"}, {"coordinates": [[5, float("nan")]]}])
+def test_geometry_columns_without_usable_coordinates(payload):
+    assert geometry_columns(payload) == dict.fromkeys(GEOMETRY_COLUMNS)
+
+@pytest.mark.parametrize("coordinates", POLYGONS)
+def test_migration_backfill_matches_geometry_columns(coordinates):
+    migration = load_migration()
+    assert migration.GEOMETRY_COLUMNS == GEOMETRY_COLUMNS
+    expected = geometry_columns({"coordinates": coordinates})
+    backfilled = migration._geometry_columns({"coordinates": coordinates})
+    assert backfilled.keys() == expected.keys()
+    for column in GEOMETRY_COLUMNS:
+        assert backfilled[column] == pytest.approx(expected[column], abs=1e-9), column
+
+@pytest.mark.parametrize("payload", [{}, {"coordinates": []}, {"coordinates": [[5, float("inf")]]}, {"coordinates": [["a"]]}])
+def test_migration_backfill_without_usable_coordinates(payload):
+    assert load_migration()._geometry_columns(payload) == dict.fromkeys(GEOMETRY_COLUMNS)
+
+def test_summary_reports_self_intersection_and_measures_the_hull():
+    bowtie = [[0, 0], [1, 1], [1, 0], [0, 1]]
+    summary = geometry_summary(bowtie)
+    assert not summary["is_valid"]
+    assert summary["repairs"] == ["convex_hull"]
+    assert summary["area_ha"] == round(geometry.area_hectares(geometry.as_ring(cell(0, 0, 1, 1))), 4)
+
+def test_repair_drops_duplicates_and_spikes():
+    ring, fixes = geometry.repair(geometry.as_ring([[0, 0], [1, 0], [1, 0], [2, 0], [1, 0], [1, 1], [0, 1]]))
+    assert fixes[:2] == ["dropped_duplicates", "dropped_spikes"]
+    assert geometry.is_valid(ring)
+    assert geometry.area_m2(ring) == pytest.approx(geometry.area_m2(geometry.as_ring(cell(0, 0, 1, 1))))
+
+def test_douglas_peucker_drops_vertices_within_tolerance():
+    # A square with a ~1 m bump halfway along each edge
+    bumped = []
+    for (lon, lat), (lon_next, lat_next) in zip(SQUARE, SQUARE[1:] + SQUARE[:1]):
+        bumped += [[lon, lat], [(lon + lon_next) / 2 + 0.00001, (lat + lat_next) / 2 + 0.00001]]
+    ring = geometry.as_ring(bumped)
+    assert geometry.simplify(ring, 5).tolist() == geometry.as_ring(SQUARE).tolist()
+    assert len(geometry.simplify(ring, 0.5)) == len(ring)
+
+def test_visvalingam_drops_vertices_below_tolerance_area():
+    # Midpoints on each edge add no area; one corner is cut by a small triangle
+    ring = geometry.as_ring([[5.1, 52.1], [5.15, 52.1], [5.2, 52.1], [5.2, 52.15], [5.2, 52.2], [5.1001, 52.2], [5.1, 52.1999]])
+    simplified = geometry.simplify(ring, 5, "visvalingam")
+    assert simplified.tolist() == [[5.1, 52.1], [5.2, 52.1], [5.2, 52.2], [5.1001, 52.2], [5.1, 52.1999]]
+    assert len(geometry.simplify(ring, 300, "visvalingam")) == 4
+
+def test_simplify_keeps_three_vertices():
+    triangle = geometry.as_ring([[0, 0], [0.001, 0], [0.0005, 0.001]])
+    assert len(geometry.simplify(triangle, 10_000)) == 3
+    assert len(geometry.simplify(triangle, 10_000, "visvalingam")) == 3
+
+def test_simplify_rejects_unknown_method():
+    with pytest.raises(ValueError, match="Unknown simplification method"):
+        geometry.simplify(geometry.as_ring(SQUARE), 1, "radial")
+
+def test_prepare_coordinates_quantizes_counter_clockwise_ring():
+    prepared = prepare_coordinates([[5.1, 52.2], [5.2, 52.2], [5.2, 52.1], [5.1000001, 52.1]], decimals=6)
+    assert geometry.signed_area_m2(np.array(prepared)) > 0
+    assert sorted(map(tuple, prepared)) == [(5.1, 52.1), (5.1, 52.2), (5.2, 52.1), (5.2, 52.2)]
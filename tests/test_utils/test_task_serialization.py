@@ -0,0 +1,187 @@
+import uuid
+import zlib
+from datetime import UTC, date, datetime
+from decimal import Decimal
+from typing import Any, Dict
+import orjson
+import pytest
+from utils import task_serialization
+from utils.task_serialization import (
+    CLAIM_CHECK_KEY,
+    CLAIM_CHECK_PREFIX,
+    ClaimCheckError,
+    ClaimCheckStore,
+    decode_msgpack,
+    encode_msgpack,
+    is_claim_check,
+)
+
+requires_msgpack = pytest.mark.skipif(task_serialization.msgpack is None, reason="msgpack is not installed")
+
+class FakeRedis:
+    """In-memory stand-in for the SET/GET the claim check store uses; expire() drops a key like its TTL would."""
+
+    def __init__(self, fail: bool = False):
+        self.values: Dict[str, bytes] = {}
+        self.ttls: Dict[str, int] = {}
+        self.fail = fail
+
+    def set(self, key: str, value: bytes, ex: int = None):
+        if self.fail:
+            raise ConnectionError("Connection refused")
+        self.values[key] = value
+        self.ttls[key] = ex
+
+    def get(self, key: str):
+        if self.fail:
+            raise ConnectionError("Connection refused")
+        return self.values.get(key)
+
+    def expire(self, key: str) -> None:
+        del self.values[key]
+
+def make_store(client: FakeRedis, threshold: int = 100, ttl: int = 3600) -> ClaimCheckStore:
+    store = ClaimCheckStore("redis://localhost:6379/0", threshold, ttl)
+    store._redis = client
+    return store
+
+def large_payload(points: int = 50) -> Dict[str, Any]:
+    return {"coordinates": [[5 + index / 1000, 52.0] for index in range(points)], "indices": ["ndvi"]}
+
+@requires_msgpack
+def test_round_trip_keeps_extension_types():
+    body = {
+        "job_id": uuid.UUID("7d2c5a0e-4b1f-4c8e-9a3d-2f6b8e1c0a57"),
+        "requested_at": datetime(2026, 10, 19, 12, 30, 15, 250000, tzinfo=UTC),
+        "naive_at": datetime(2026, 10, 19, 12, 30),
+        "start_date": date(2026, 6, 1),
+        "threshold": Decimal("0.3500"),
+        "coordinates": [[5.1, 52.1], [5.2, 52.1], [5.2, 52.2]],
+        "nested": {"run_ids": [uuid.UUID(int=1), uuid.UUID(int=2)], 1: "int key"},
+        "flag": True,
+        "missing": None,
+        "raw": b"\x00\xff",
+    }
+
+    decoded = decode_msgpack(encode_msgpack(body))
+
+    assert decoded == body
+    assert type(decoded["requested_at"]) is datetime and type(decoded["start_date"]) is date
+    assert decoded["requested_at"].tzinfo is not None
+    assert str(decoded["threshold"]) == "0.3500"
+
+@requires_msgpack
+def test_sets_and_tuples_travel_as_lists():
+    assert decode_msgpack(encode_msgpack({"bands": ("B4", "B8"), "ids": {3}})) == {"bands": ["B4", "B8"], "ids": [3]}
+
+@requires_msgpack
+def test_unsupported_types_are_rejected():
+    with pytest.raises(TypeError, match="object cannot be sent"):
+        encode_msgpack({"value": object()})
+
+@requires_msgpack
+def test_small_bodies_are_sent_plain():
+    encoded = encode_msgpack(large_payload(), threshold=100_000)
+    assert encoded[:1] == task_serialization._PLAIN
+    assert task_serialization.msgpack.unpackb(encoded[1:], raw=False) == large_payload()
+
+@requires_msgpack
+def test_bodies_at_the_threshold_are_compressed():
+    packed_size = len(task_serialization.msgpack.packb(large_payload(), use_bin_type=True))
+
+    encoded = encode_msgpack(large_payload(), threshold=packed_size)
+
+    assert encoded[:1] == task_serialization._ZLIB
+    assert len(encoded) < packed_size
+    assert decode_msgpack(encoded) == large_payload()
+    assert encode_msgpack(large_payload(), threshold=packed_size + 1)[:1] == task_serialization._PLAIN
+
+@requires_msgpack
+def test_incompressible_bodies_stay_plain():
+    body = {"noise": bytes(range(256))}
+    assert encode_msgpack(body, threshold=1, level=9)[:1] == task_serialization._PLAIN
+
+@requires_msgpack
+def test_threshold_zero_disables_compression():
+    assert encode_msgpack(large_payload(500), threshold=0)[:1] == task_serialization._PLAIN
+
+@requires_msgpack
+def test_decode_accepts_latin1_strings():
+    encoded = encode_msgpack({"job_id": uuid.UUID(int=7)}, threshold=1)
+    assert decode_msgpack(encoded.decode("latin-1")) == {"job_id": uuid.UUID(int=7)}
+
+def test_decode_rejects_unknown_header():
+    with pytest.raises(ValueError, match="Unknown task message encoding"):
+        decode_msgpack(b"\x02" + zlib.compress(b"{}"))
+
+def test_offload_stores_large_payloads_under_a_ttl():
+    client = FakeRedis()
+    payload = large_payload()
+
+    reference = make_store(client, ttl=600).offload(payload)
+
+    assert is_claim_check(reference)
+    key = reference[CLAIM_CHECK_KEY]
+    assert key.startswith(CLAIM_CHECK_PREFIX)
+    assert reference["bytes"] == len(orjson.dumps(payload))
+    assert orjson.loads(client.values[key]) == payload
+    assert client.ttls[key] == 600
+
+def test_resolve_returns_the_offloaded_payload():
+    store = make_store(FakeRedis())
+    payload = large_payload()
+    assert store.resolve(store.offload(payload)) == payload
+
+@pytest.mark.parametrize("payload", [None, {}, {"indices": ["ndvi"]}])
+def test_payloads_below_the_threshold_pass_through(payload):
+    client = FakeRedis()
+    store = make_store(client)
+    assert store.offload(payload) is payload
+    assert store.resolve(payload) is payload
+    assert client.values == {}
+
+def test_threshold_zero_disables_offloading():
+    client = FakeRedis()
+    payload = large_payload()
+    assert make_store(client, threshold=0).offload(payload) is payload
+    assert client.values == {}
+
+def test_references_are_not_offloaded_again():
+    store = make_store(FakeRedis(), threshold=1)
+    reference = store.offload(large_payload())
+    assert store.offload(reference) is reference
+
+def test_expired_payload_raises_claim_check_error():
+    client = FakeRedis()
+    store = make_store(client)
+    reference = store.offload(large_payload())
+    client.expire(reference[CLAIM_CHECK_KEY])
+
+    with pytest.raises(ClaimCheckError, match="has expired or does not exist"):
+        store.resolve(reference)
+
+def test_unreachable_redis_on_resolve_raises_claim_check_error():
+    reference = {CLAIM_CHECK_KEY: f"{CLAIM_CHECK_PREFIX}missing", "bytes": 10}
+    with pytest.raises(ClaimCheckError, match="Could not load task payload"):
+        make_store(FakeRedis(fail=True)).resolve(reference)
+
+def test_unreachable_redis_on_offload_sends_inline_and_backs_off():
+    client = FakeRedis(fail=True)
+    store = make_store(client)
+    payload = large_payload()
+
+    assert store.offload(payload) is payload
+    # Redis is not tried again until redis_retry_after has passed
+    client.fail = False
+    assert store.offload(payload) is payload
+    assert client.values == {}
+
+@pytest.mark.parametrize("payload, expected", [
+    ({CLAIM_CHECK_KEY: "task_payload:abc", "bytes": 1}, True),
+    ({"coordinates": []}, False),
+    (None, False),
+    ([CLAIM_CHECK_KEY], False),
+    (CLAIM_CHECK_KEY, False),
+])
+def test_is_claim_check(payload, expected):
+    assert is_claim_check(payload) is expected
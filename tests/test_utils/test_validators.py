@@ -0,0 +1,39 @@
+import pytest
+from utils.validators import validate_coordinates
+
+def test_returns_lon_lat_floats():
+    assert validate_coordinates([[5, 52], (5.5, 52.25)]) == [[5.0, 52.0], [5.5, 52.25]]
+
+def test_ignores_extra_dimensions():
+    assert validate_coordinates([[5, 52, 10.5], [6, 53, 11, 0]]) == [[5.0, 52.0], [6.0, 53.0]]
+
+def test_accepts_range_limits():
+    assert validate_coordinates([[-180, -90], [180, 90]]) == [[-180.0, -90.0], [180.0, 90.0]]
+
+@pytest.mark.parametrize("coordinates", [None, [], (), "5,52", {"lon": 5, "lat": 52}])
+def test_rejects_non_lists(coordinates):
+    with pytest.raises(ValueError, match="non-empty list"):
+        validate_coordinates(coordinates)
+
+@pytest.mark.parametrize("point", [[5], [], 5, "5,52", None])
+def test_rejects_points_without_lon_lat(point):
+    with pytest.raises(ValueError, match=r"coordinates\[1\] must start with \[lon, lat\]"):
+        validate_coordinates([[5, 52], point])
+
+@pytest.mark.parametrize("point", [["5", 52], [5, None], [True, 52], [5, [52]]])
+def test_rejects_non_numbers(point):
+    with pytest.raises(ValueError, match=r"coordinates\[0\] must contain numbers"):
+        validate_coordinates([point])
+
+def test_only_checks_lon_lat_for_numbers():
+    assert validate_coordinates([[5, 52, "ground"]]) == [[5.0, 52.0]]
+
+@pytest.mark.parametrize("point", [[float("nan"), 52], [5, float("inf")], [float("-inf"), 52]])
+def test_rejects_non_finite(point):
+    with pytest.raises(ValueError, match="must be finite"):
+        validate_coordinates([point])
+
+@pytest.mark.parametrize("point", [[180.5, 52], [-181, 52], [5, 90.01], [5, -91]])
+def test_rejects_out_of_range(point):
+    with pytest.raises(ValueError, match="outside longitude"):
+        validate_coordinates([point])